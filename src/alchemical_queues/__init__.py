@@ -1,6 +1,25 @@
 """Alchemical Queues: safe distributed queues built on SQLAlchemy."""
 
-from .main import AlchemicalQueues, AlchemicalQueue, AlchemicalEntry, AlchemicalResponse
+from .main import AlchemicalQueues, AlchemicalQueue
+from .entry import AlchemicalEntry, AlchemicalResponse
+from .wait import WaitStrategy, FixedWait, ExponentialBackoff
+from .aio import AsyncAlchemicalQueues, AsyncAlchemicalQueue
+from .group import AlchemicalQueueGroup
+from .claimcheck import ClaimCheck
+from .retry import RetryPolicy
+from .stats import QueueStatistics
+from .metrics import Metrics, MetricsRegistry
+from .wheel import TimingWheel
+from .sqlite import configure_sqlite
+from .notify import Notifier, InProcessNotifier, UnixSocketNotifier, PostgresNotifier
+from .serialize import (
+    Serializer,
+    PickleSerializer,
+    PickleBufferSerializer,
+    JSONSerializer,
+    MsgpackSerializer,
+    CompressedSerializer,
+)
 from . import tasks
 
 __title__ = "Alchemical Queues"
@@ -11,5 +30,28 @@ __all__ = [
     "AlchemicalQueue",
     "AlchemicalEntry",
     "AlchemicalResponse",
+    "AlchemicalQueueGroup",
+    "AsyncAlchemicalQueues",
+    "AsyncAlchemicalQueue",
+    "ClaimCheck",
+    "RetryPolicy",
+    "QueueStatistics",
+    "Metrics",
+    "MetricsRegistry",
+    "TimingWheel",
+    "configure_sqlite",
+    "WaitStrategy",
+    "FixedWait",
+    "ExponentialBackoff",
+    "Notifier",
+    "InProcessNotifier",
+    "UnixSocketNotifier",
+    "PostgresNotifier",
+    "Serializer",
+    "PickleSerializer",
+    "PickleBufferSerializer",
+    "JSONSerializer",
+    "MsgpackSerializer",
+    "CompressedSerializer",
     "tasks",
 ]
@@ -0,0 +1,425 @@
+"""Asyncio interface of Alchemical Queues, on top of the SQLAlchemy asyncio extension."""
+
+# The async classes drive the statement logic of their synchronous counterparts
+# through AsyncConnection.run_sync, so both always behave the same.
+# pylint: disable=protected-access
+
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+from types import SimpleNamespace
+from typing import (
+    Any,
+    AsyncContextManager,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    cast,
+)
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from .main import AlchemicalQueues, AlchemicalQueue, AlchemicalEntry, AlchemicalResponse
+from .claimcheck import ClaimCheck
+from .metrics import Metrics, _count_pop
+from .retry import RetryPolicy
+from .sqlite import _BEGIN, _own_engine
+from .stats import QueueStatistics, _statistics
+from .serialize import Serializer
+from .wait import WaitStrategy, ExponentialBackoff
+from .wheel import TimingWheel
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@asynccontextmanager
+async def _immediate_transaction(engine: AsyncEngine) -> AsyncIterator[AsyncConnection]:
+    """The asyncio version of the transaction pops run in, see alchemical_queues.main."""
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(**{_BEGIN: "IMMEDIATE"})
+        async with conn.begin():
+            yield conn
+
+
+class AsyncAlchemicalQueues:
+    """The asyncio entrypoint to Alchemical Queues, mirroring [AlchemicalQueues][alchemical_queues.AlchemicalQueues]."""
+
+    def __init__(  # pylint: disable=R0913
+        self,
+        engine: Union[AsyncEngine, None] = None,
+        queue_tablename: str = "AlchemicalQueue",
+        response_tablename: str = "AlchemicalResult",
+        *,
+        serializer: Optional[Serializer] = None,
+        claim_check: Optional[ClaimCheck] = None,
+        retry: Optional[RetryPolicy] = None,
+        timing_wheel: Optional[TimingWheel] = None,
+        metrics: Optional[Metrics] = None,
+    ) -> None:
+        """Create the main asyncio queue entrypoint object.
+
+        Args:
+            engine (sqlalchemy.ext.asyncio.AsyncEngine | None): The SQLAlchemy async engine you want to use. May be left None and initialized later.
+            queue_tablename (str): The name of the table AlchemicalQueues uses for queues.
+            queue_tablename (str): The name of the table AlchemicalQueues uses for task results.
+            serializer (Serializer | None): The default serializer of the queues, pickle if None.
+            claim_check (ClaimCheck | None): Store large payloads apart from the queue tables.
+            retry (RetryPolicy | None): When to retry transactions that failed on a lock conflict, a default `RetryPolicy` if None.
+            timing_wheel (TimingWheel | None): Keep entries scheduled far ahead out of the queue table until they are nearly due.
+            metrics (Metrics | None): Measure the operations of the queues, for example with a `MetricsRegistry`.
+        """
+
+        self._engine: Optional[AsyncEngine] = None
+        self._sync = AlchemicalQueues(
+            queue_tablename=queue_tablename,
+            response_tablename=response_tablename,
+            serializer=serializer,
+            claim_check=claim_check,
+            retry=retry,
+            timing_wheel=timing_wheel,
+            metrics=metrics,
+        )
+        self._queues: Dict[str, "AsyncAlchemicalQueue"] = {}
+
+        if engine is not None:
+            self.set_engine(engine)
+
+    def set_engine(self, engine: AsyncEngine) -> None:
+        """Set the SQLAlchemy async engine post-initialization
+
+        Args:
+            engine (sqlalchemy.ext.asyncio.AsyncEngine): The SQLAlchemy async engine you want to use.
+
+        Raises:
+            Exception: when the engine was already set.
+        """
+
+        engine = _own_engine(engine)
+        self._sync.set_engine(engine.sync_engine)
+        self._engine = engine
+
+    async def create_all(self) -> None:
+        """Create the needed SQLAlchemy tables."""
+
+        assert self._engine
+        async with self._engine.begin() as conn:
+            await conn.run_sync(self._sync._metadata.create_all)
+
+    @property
+    def retry(self) -> RetryPolicy:
+        """Retries the transactions of all queues that conflicted with another one."""
+        return self._sync.retry
+
+    @property
+    def metrics(self) -> Metrics:
+        """Receives the measurements of all queues."""
+        return self._sync.metrics
+
+    async def clear(self) -> None:
+        """Clear all entries from all queues and task results. Might fail-silent an update call."""
+
+        assert self._engine
+
+        async def clear() -> None:
+            assert self._engine
+            async with self._engine.begin() as conn:
+                await conn.execute(delete(self._sync._qtable))
+                await conn.execute(delete(self._sync._rtable))
+                await conn.execute(delete(self._sync._dtable))
+
+        await self.retry.run_async(clear, self._engine.dialect)
+
+    async def stats(
+        self, names: Optional[Iterable[str]] = None
+    ) -> Dict[str, QueueStatistics]:
+        """Take a snapshot of all queues in a single query, see
+        [AlchemicalQueues.stats][alchemical_queues.AlchemicalQueues.stats]."""
+
+        assert self._engine
+        engine = self._engine
+        selected = None if names is None else list(names)
+
+        async def stats() -> Dict[str, QueueStatistics]:
+            async with engine.connect() as conn:
+                return await conn.run_sync(
+                    _statistics, self._sync._qtable, self._sync._dtable, selected
+                )
+
+        return await self.retry.run_async(stats, engine.dialect)
+
+    def get(
+        self, key: str, serializer: Optional[Serializer] = None
+    ) -> "AsyncAlchemicalQueue[Any]":
+        """Get a Queue instance
+
+        Args:
+            key (str): The name of the queue you wish to access.
+            serializer (Serializer | None): Use this serializer for the queue from now on, instead of the default.
+
+        Returns:
+            AsyncAlchemicalQueue
+        """
+
+        queue = self._sync.get(key, serializer)
+        assert self._engine
+
+        if key not in self._queues:
+            self._queues[key] = AsyncAlchemicalQueue(self._engine, queue)
+
+        return self._queues[key]
+
+    def get_typed(self, key: str, typeof: Type[T]) -> "AsyncAlchemicalQueue[T]":
+        """Get a typed Queue instance
+
+        Args:
+            key (str): The name of the queue you wish to access.
+            typeof (Type[T]): The type of the queue you wish to use
+
+        Returns:
+            AsyncAlchemicalQueue[T]
+        """
+        # pylint: disable=unused-argument
+        return cast(AsyncAlchemicalQueue[T], self.get(key))
+
+
+class AsyncAlchemicalQueue(Generic[T]):
+    """The asyncio version of [AlchemicalQueue][alchemical_queues.AlchemicalQueue]. It is not intended to be
+    initialized by a user, go through [AsyncAlchemicalQueues][alchemical_queues.AsyncAlchemicalQueues] instead.
+
+    Iterating over it with `async for` yields entries forever, waiting for new ones when the queue is empty.
+    """
+
+    def __init__(self, engine: AsyncEngine, queue: AlchemicalQueue[T]):
+        self._engine = engine
+        self._queue = queue
+
+    @property
+    def name(self) -> str:
+        """The name of the queue"""
+        return self._queue.name
+
+    async def _run(
+        self,
+        transaction: Callable[[AsyncEngine], AsyncContextManager[AsyncConnection]],
+        operation: Callable[..., R],
+        *args: Any,
+    ) -> R:
+        """Run `operation(conn, *args)` in a transaction, retried when it conflicts with another one."""
+
+        async def attempt() -> R:
+            async with transaction(self._engine) as conn:
+                return await conn.run_sync(operation, *args)
+
+        return await self._queue._retry.run_async(
+            attempt, self._engine.dialect, self._queue._count_retry
+        )
+
+    async def put(
+        self,
+        item: T,
+        *,
+        schedule_at: Union[datetime, None] = None,
+        priority: int = 0,
+    ) -> AlchemicalEntry[T]:
+        """Put an entry into the queue, see [AlchemicalQueue.put][alchemical_queues.AlchemicalQueue.put]."""
+
+        rows = self._queue._entry_rows([item], schedule_at, priority)
+
+        with self._queue._metrics.timer("put_seconds", self.name):
+            (entry_id,) = await self._run(AsyncEngine.begin, self._queue._insert, rows)
+        self._queue._metrics.increment("entries_put", self.name)
+
+        self._queue._notify(rows)
+        return AlchemicalEntry(SimpleNamespace(entry_id=entry_id, **rows[0]), item)
+
+    async def put_many(
+        self,
+        items: Iterable[T],
+        *,
+        schedule_at: Union[datetime, None, Sequence[Optional[datetime]]] = None,
+        priority: Union[int, Sequence[int]] = 0,
+    ) -> List[int]:
+        """Put many entries into the queue in a single transaction, see
+        [AlchemicalQueue.put_many][alchemical_queues.AlchemicalQueue.put_many]."""
+
+        rows = self._queue._entry_rows(items, schedule_at, priority)
+        if not rows:
+            return []
+
+        with self._queue._metrics.timer("put_seconds", self.name):
+            entry_ids = await self._run(AsyncEngine.begin, self._queue._insert, rows)
+        self._queue._metrics.increment("entries_put", self.name, len(rows))
+
+        self._queue._notify(rows)
+        return entry_ids
+
+    async def get(
+        self,
+        block: bool = False,
+        timeout: Optional[float] = None,
+        wait: Optional[WaitStrategy] = None,
+    ) -> Union[AlchemicalEntry[T], None]:
+        """Get the highest priority entry out from the queue, see [AlchemicalQueue.get][alchemical_queues.AlchemicalQueue.get]."""
+
+        wait = wait or ExponentialBackoff()
+
+        entries = await self.get_many(1)
+        if entries:
+            wait.reset()
+            return entries[0]
+        if not block:
+            return None
+
+        for delay in wait.delays(timeout):
+            await asyncio.sleep(delay)
+
+            entries = await self.get_many(1)
+            if entries:
+                wait.reset()
+                return entries[0]
+
+        return None
+
+    async def get_many(self, max_items: int) -> List[AlchemicalEntry[T]]:
+        """Get up to `max_items` entries out from the queue in a single transaction, see
+        [AlchemicalQueue.get_many][alchemical_queues.AlchemicalQueue.get_many]."""
+
+        if max_items < 1:
+            return []
+
+        # Claim-checked payloads are fetched right away, the connection
+        # is not usable outside of the event loop later on.
+        with self._queue._metrics.timer("get_seconds", self.name):
+            entries = await self._run(
+                _immediate_transaction, self._queue._pop, max_items, True
+            )
+        _count_pop(self._queue._metrics, (self.name,), entries)
+        return entries
+
+    def __aiter__(self) -> AsyncIterator[AlchemicalEntry[T]]:
+        return self._stream()
+
+    async def _stream(self) -> AsyncIterator[AlchemicalEntry[T]]:
+        wait = ExponentialBackoff()
+        while True:
+            entry = await self.get(block=True, wait=wait)
+            if entry is not None:
+                yield entry
+
+    async def qsize(self, approximate: bool = False) -> int:
+        """Return the approximate size of this queue, see [AlchemicalQueue.qsize][alchemical_queues.AlchemicalQueue.qsize].
+
+        Returns:
+            int: Queue size.
+        """
+        return await self._run(AsyncEngine.connect, self._queue._size, approximate)
+
+    async def empty(self) -> bool:
+        """Return `True` if the Queue is emtpy, `False` otherwise.
+
+        Returns:
+            bool: wether the Queue is empty.
+        """
+        return await self._run(AsyncEngine.connect, self._queue._empty)
+
+    async def promote(self) -> int:
+        """Move the nearly due entries from the timing wheel to the queue, see
+        [AlchemicalQueue.promote][alchemical_queues.AlchemicalQueue.promote]."""
+
+        if self._queue._wheel is None:
+            return 0
+        return await self._run(
+            _immediate_transaction, self._queue._wheel.promote, self._queue._stmts
+        )
+
+    async def clear(self) -> None:
+        """Clear all entries from this queue. Might fail-silent an update call."""
+
+        await self._run(AsyncEngine.begin, self._queue._clear)
+
+    async def respond(
+        self, entry_id: int, response: Any, cleanup_at: Union[datetime, None] = None
+    ) -> AlchemicalResponse:
+        """Send a response to a queue entry, see [AlchemicalQueue.respond][alchemical_queues.AlchemicalQueue.respond]."""
+
+        row = self._queue._response_row(entry_id, response, cleanup_at)
+
+        with self._queue._metrics.timer("respond_seconds", self.name):
+            (response_id,) = await self._run(
+                AsyncEngine.begin, self._queue._insert_responses, [row]
+            )
+        self._queue._metrics.increment("responses", self.name)
+
+        self._queue._notify_responses()
+
+        return AlchemicalResponse(
+            SimpleNamespace(response_id=response_id, **row), response
+        )
+
+    async def respond_many(
+        self, responses: Iterable[Tuple[int, Any, Union[datetime, None]]]
+    ) -> List[AlchemicalResponse]:
+        """Send many responses in a single transaction, see
+        [AlchemicalQueue.respond_many][alchemical_queues.AlchemicalQueue.respond_many].
+        """
+
+        responses = list(responses)
+        rows = [self._queue._response_row(*response) for response in responses]
+        if not rows:
+            return []
+
+        with self._queue._metrics.timer("respond_seconds", self.name):
+            response_ids = await self._run(
+                AsyncEngine.begin, self._queue._insert_responses, rows
+            )
+        self._queue._metrics.increment("responses", self.name, len(rows))
+
+        self._queue._notify_responses()
+
+        return [
+            AlchemicalResponse(SimpleNamespace(response_id=response_id, **row), data)
+            for response_id, row, (_, data, _) in zip(response_ids, rows, responses)
+        ]
+
+    async def responses(self, entry_id: int) -> List[AlchemicalResponse]:
+        """Obtain the response(s) to a specific queue entry.
+
+        Returns:
+            List[AlchemicalResponse]: A list of responses, in the order they were sent.
+        """
+        return await self._run(
+            AsyncEngine.connect, self._queue._responses, entry_id, False, True
+        )
+
+    async def responses_many(
+        self, entry_ids: Iterable[int]
+    ) -> Dict[int, List[AlchemicalResponse]]:
+        """Obtain the responses to many queue entries at once, see
+        [AlchemicalQueue.responses_many][alchemical_queues.AlchemicalQueue.responses_many].
+        """
+
+        return await self._run(
+            AsyncEngine.connect, self._queue._responses_many, list(entry_ids), True
+        )
+
+    async def response(self, entry_id: int) -> Union[AlchemicalResponse, None]:
+        """Obtain the first response to a specific queue entry, without fetching the others.
+
+        Returns:
+            (AlchemicalResponse | None): The first response, or None if there is none.
+        """
+        responses = await self._run(
+            AsyncEngine.connect, self._queue._responses, entry_id, True, True
+        )
+        return responses[0] if responses else None
@@ -0,0 +1,218 @@
+"""Claim-check storage, keeping large payloads out of the queue and response tables."""
+
+import hashlib
+import os
+import tempfile
+import uuid
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+from sqlalchemy import bindparam, delete, insert, select, update, Table
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
+
+
+class ClaimCheck:
+    """Store payloads of at least `threshold` bytes apart from their queue entries and responses,
+    which then only hold a reference to it. Payloads are keyed by their content hash, so identical
+    payloads are stored once. Stored payloads are removed by
+    [AlchemicalQueues.collect_blobs][alchemical_queues.AlchemicalQueues.collect_blobs] once no entry
+    or response refers to them anymore.
+
+    Attributes:
+        threshold (int): the size in bytes, after serialization, from which payloads are stored apart.
+        directory (str | None): store payloads as files in this directory instead of in a database table.
+                                All producers and consumers must be able to access it.
+    """
+
+    def __init__(self, threshold: int = 1 << 20, directory: Optional[str] = None):
+        self.threshold = threshold
+        self.directory = directory
+
+    def store(self, table: Table) -> "BlobStore":
+        """The store for payloads of this claim check.
+
+        Args:
+            table (Table): the blob table, used when no directory was given.
+
+        Returns:
+            BlobStore: the store.
+        """
+        if self.directory is None:
+            return TableBlobStore(table)
+        return FileBlobStore(self.directory)
+
+    @staticmethod
+    def key(data: bytes) -> str:
+        """The key a payload is stored under.
+
+        Args:
+            data (bytes): the serialized payload.
+
+        Returns:
+            str: the key.
+        """
+        return hashlib.sha256(data).hexdigest()
+
+
+class BlobStore:
+    """Where claim-checked payloads are kept. Every method runs on the connection of the
+    transaction that uses the payload, so a database store stays consistent with the queue.
+    """
+
+    def put(self, conn: Connection, key: str, data: bytes, now: datetime) -> None:
+        """Store a payload, or mark an existing one with the same key as stored at `now`."""
+        raise NotImplementedError()
+
+    def get(self, conn: Connection, key: str) -> bytes:
+        """Fetch a payload, raising LookupError if it does not exist."""
+        raise NotImplementedError()
+
+    def keys(self, conn: Connection, before: datetime) -> List[str]:
+        """The keys of all payloads stored before `before`."""
+        raise NotImplementedError()
+
+    def delete(self, conn: Connection, keys: Sequence[str], before: datetime) -> int:
+        """Remove payloads that are still stored before `before`, returning how many were removed.
+        A payload that was stored again in the meantime is in use by a new entry and must be kept.
+        """
+        raise NotImplementedError()
+
+
+class TableBlobStore(BlobStore):
+    """Payloads in a database table next to the queue tables."""
+
+    def __init__(self, table: Table):
+        self._table = table
+        bt = table.c
+        self._touch = (
+            update(table)
+            .where(bt.blob_key == bindparam("key"))
+            .values(stored_at=bindparam("now"))
+        )
+        self._insert = insert(table)
+        self._get = select(bt.data).where(bt.blob_key == bindparam("key"))
+        self._keys = select(bt.blob_key).where(bt.stored_at < bindparam("before"))
+        self._delete = delete(table).where(
+            bt.blob_key.in_(bindparam("keys", expanding=True)),
+            bt.stored_at < bindparam("before"),
+        )
+
+    def put(self, conn: Connection, key: str, data: bytes, now: datetime) -> None:
+        # Touching first locks a stored payload, so a concurrent collect_blobs keeps it.
+        # When there is none, or it was just collected, it is stored anew.
+        if conn.execute(self._touch, {"key": key, "now": now}).rowcount:
+            return
+
+        try:
+            with conn.begin_nested():
+                conn.execute(
+                    self._insert, {"blob_key": key, "stored_at": now, "data": data}
+                )
+        except IntegrityError:
+            # Stored by a concurrent transaction in the meantime
+            conn.execute(self._touch, {"key": key, "now": now})
+
+    def get(self, conn: Connection, key: str) -> bytes:
+        data = conn.execute(self._get, {"key": key}).scalar()
+        if data is None:
+            raise LookupError(f"Payload {key} is missing from the claim check table")
+        return bytes(data)
+
+    def keys(self, conn: Connection, before: datetime) -> List[str]:
+        return list(conn.execute(self._keys, {"before": before}).scalars())
+
+    def delete(self, conn: Connection, keys: Sequence[str], before: datetime) -> int:
+        deleted = 0
+        # Chunked to stay below the bound parameter limit of SQLite
+        for start in range(0, len(keys), 500):
+            deleted += conn.execute(
+                self._delete,
+                {"keys": list(keys[start : start + 500]), "before": before},
+            ).rowcount
+        return deleted
+
+
+class FileBlobStore(BlobStore):
+    """Payloads as files in a directory, in subdirectories by the first two characters of their key."""
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def put(self, conn: Connection, key: str, data: bytes, now: datetime) -> None:
+        path = self._path(key)
+        timestamp = now.timestamp()
+
+        try:
+            os.utime(path, (timestamp, timestamp))
+            return
+        except FileNotFoundError:
+            # Never stored, or collected in the meantime
+            pass
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.utime(temp, (timestamp, timestamp))
+            # Atomic, so readers never see a partially written payload
+            os.replace(temp, path)
+        except BaseException:
+            os.unlink(temp)
+            raise
+
+    def get(self, conn: Connection, key: str) -> bytes:
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError as e:
+            raise LookupError(
+                f"Payload {key} is missing from the claim check directory"
+            ) from e
+
+    def keys(self, conn: Connection, before: datetime) -> List[str]:
+        cutoff = before.timestamp()
+        keys = []
+
+        for prefix in os.listdir(self.directory):
+            subdirectory = os.path.join(self.directory, prefix)
+            if not os.path.isdir(subdirectory):
+                continue
+            for name in os.listdir(subdirectory):
+                if name.endswith(".tmp"):
+                    continue
+                try:
+                    if os.stat(os.path.join(subdirectory, name)).st_mtime < cutoff:
+                        keys.append(name)
+                except FileNotFoundError:
+                    pass
+
+        return keys
+
+    def delete(self, conn: Connection, keys: Sequence[str], before: datetime) -> int:
+        cutoff = before.timestamp()
+        deleted = 0
+
+        for key in keys:
+            path = self._path(key)
+            # Moved aside first, so a put either touched it before and it is checked below,
+            # or finds it missing afterwards and writes it again.
+            aside = f"{path}.{uuid.uuid4().hex}.tmp"
+            try:
+                os.rename(path, aside)
+            except FileNotFoundError:
+                continue
+
+            if os.stat(aside).st_mtime >= cutoff:
+                # A put of the same payload since listing the keys touched the file
+                os.replace(aside, path)
+            else:
+                os.unlink(aside)
+                deleted += 1
+
+        return deleted
@@ -0,0 +1,113 @@
+"""Queue entries and responses, as returned by the queues."""
+
+from datetime import datetime
+from typing import Any, Callable, Generic, Optional, TypeVar, Union, cast
+
+T = TypeVar("T")
+
+
+class AlchemicalEntry(Generic[T]):
+    """An entry in a queue.
+
+    Attributes:
+        entry_id (int): the identifier of the entry. Guaranteed unique per [AlchemicalQueues][alchemical_queues.AlchemicalQueues] instance.
+            Negative for entries that went through a [TimingWheel][alchemical_queues.TimingWheel].
+        queue_name (str): the name of the queue the entry was put on.
+        enqueued_at (datetime): when the entry was added to the queue.
+        schedule_at (datetime | None): do not remove the entry from the queue before this time.
+        priority (int): the priority of the entry.
+        data (T): the data stored in this entry. It is deserialized on first access.
+    """
+
+    __slots__ = (
+        "_data",
+        "_load",
+        "entry_id",
+        "queue_name",
+        "enqueued_at",
+        "schedule_at",
+        "priority",
+    )
+
+    def __init__(
+        self,
+        entry,
+        data: Optional[T] = None,
+        *,
+        load: Optional[Callable[[], T]] = None,
+    ):
+        assert isinstance(entry.entry_id, int)
+
+        self.entry_id: int = entry.entry_id
+        self.queue_name: str = entry.queue_name
+        self.enqueued_at: datetime = entry.enqueued_at
+        self.schedule_at: Union[datetime, None] = entry.schedule_at
+        self.priority: int = entry.priority
+        self._data = data
+        # Produces the data on first access instead, when given
+        self._load = load
+
+    @property
+    def data(self) -> T:
+        """The data stored in this entry."""
+        if self._load is not None:
+            self._data, self._load = self._load(), None
+        return cast(T, self._data)
+
+    @data.setter
+    def data(self, data: T) -> None:
+        self._data, self._load = data, None
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__module__}.{self.__class__.__name__} "
+            f"entry_id={self.entry_id} enqueued_at={self.enqueued_at} "
+            f"schedule_at={self.schedule_at} priority={self.priority}>"
+        )
+
+
+class AlchemicalResponse:
+    """An response to a queue item. While you can use this as a user, it is probably most useful for the tasks submodule.
+
+    Attributes:
+        response_id (int): the identifier of the response.
+        entry_id (int): the identifier of the associated entry.
+        delivered_at (datetime): when the response was submitted.
+        cleanup_at (datetime | None): autoremove this response after this time.
+        data (Any): Response data. It is deserialized on first access.
+    """
+
+    __slots__ = [
+        "_data",
+        "_load",
+        "entry_id",
+        "response_id",
+        "delivered_at",
+        "cleanup_at",
+    ]
+
+    def __init__(
+        self,
+        response,
+        data: Any = None,
+        *,
+        load: Optional[Callable[[], Any]] = None,
+    ):
+        self.response_id = response.response_id
+        self.entry_id = response.entry_id
+        self.delivered_at = response.delivered_at
+        self.cleanup_at = response.cleanup_at
+        self._data = data
+        # Produces the data on first access instead, when given
+        self._load = load
+
+    @property
+    def data(self) -> Any:
+        """Response data."""
+        if self._load is not None:
+            self._data, self._load = self._load(), None
+        return self._data
+
+    @data.setter
+    def data(self, data: Any) -> None:
+        self._data, self._load = data, None
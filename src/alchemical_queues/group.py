@@ -0,0 +1,261 @@
+"""Consuming several queues at once."""
+
+# The group pops entries on behalf of its queues, with their tables, engine and serializers.
+# pylint: disable=protected-access
+
+import random
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union, cast
+
+from sqlalchemy import bindparam, delete, func, select, union_all, Integer
+from sqlalchemy.engine import Connection, Engine
+
+from .main import AlchemicalQueue, AlchemicalEntry
+from .metrics import Metrics, _count_pop
+from .sqlite import _immediate_transaction
+from .wait import WaitStrategy, _blocking_get
+
+
+class AlchemicalQueueGroup:
+    """Several queues of the same [AlchemicalQueues][alchemical_queues.AlchemicalQueues], consumed as one.
+    Every poll pops from all of them with a single query, so polling a group costs the same as polling
+    a single queue, no matter how many queues it holds. Pass it to a [Worker][alchemical_queues.tasks.Worker]
+    to run the tasks of all queues.
+
+    Without weights the queues take strict precedence in the given order: entries of a queue are
+    only popped while the queues before it have nothing ready. With weights, every poll draws the order
+    of the queues at random, so that each queue with ready entries comes first with a probability
+    proportional to its weight among the queues with ready entries. Entries of a single queue are
+    popped in the usual priority order, and a batch is taken from the first queue before the next.
+
+    Attributes:
+        queues (Dict[str, AlchemicalQueue]): the queues of the group by name, in order of precedence.
+        weights (Dict[str, float] | None): the weight of every queue, None for strict precedence.
+    """
+
+    def __init__(
+        self,
+        queues: Sequence[AlchemicalQueue],
+        weights: Optional[Mapping[str, float]] = None,
+    ) -> None:
+        """Group queues.
+
+        Args:
+            queues (Sequence[AlchemicalQueue]): the queues, in order of precedence.
+            weights (Mapping[str, float] | None, optional): the weight of every queue by name. Queues that
+                                                            are left out have weight 1. Strict precedence if None.
+
+        Raises:
+            ValueError: when the queues are not of the same AlchemicalQueues, or a weight is not positive
+                        or given for a queue outside the group.
+        """
+
+        if not queues:
+            raise ValueError("A queue group needs at least one queue")
+
+        first = queues[0]
+        if any(queue._table is not first._table for queue in queues):
+            raise ValueError("The queues of a group must share their AlchemicalQueues")
+
+        self.queues: Dict[str, AlchemicalQueue] = {
+            queue.name: queue for queue in queues
+        }
+        self.weights: Optional[Dict[str, float]] = None
+        if weights is not None:
+            unknown = set(weights) - set(self.queues)
+            if unknown:
+                raise ValueError(f"Weights for queues not in the group: {unknown}")
+            self.weights = {name: float(weights.get(name, 1.0)) for name in self.queues}
+            for name, weight in self.weights.items():
+                if weight <= 0:
+                    raise ValueError(f"The weight of queue {name} should be positive")
+
+        self._first = first
+        self._names = list(self.queues)
+
+        qt = first._table.c
+        # One arm per queue takes its best entries through the pop index, so that only those
+        # are sorted by the rank of their queue. The ranks are bound per poll, so the statement
+        # is compiled once.
+        arms = [
+            select(first._table, bindparam(f"rank_{i}", type_=Integer).label("rank"))
+            .with_for_update(skip_locked=True)
+            .where(qt.queue_name == name, qt.ready_at <= bindparam("now"))
+            .order_by(qt.priority.desc(), qt.ready_at.asc(), qt.entry_id.asc())
+            .limit(bindparam("limit", type_=Integer))
+            .subquery()
+            for i, name in enumerate(self._names)
+        ]
+        ready = union_all(*(select(arm) for arm in arms)).subquery("ready")
+        rc = ready.c
+        self._ready = (
+            select(*(rc[column.name] for column in first._table.c))
+            .order_by(rc.rank, rc.priority.desc(), rc.ready_at.asc(), rc.entry_id.asc())
+            .limit(bindparam("limit", type_=Integer))
+        )
+        self._next_ready = select(func.min(qt.ready_at)).where(
+            qt.queue_name.in_(self._names)
+        )
+        self._pop_ready = (
+            delete(first._table)
+            .where(qt.entry_id.in_(self._ready.with_only_columns(rc.entry_id)))
+            .returning(*first._table.c)
+        )
+
+    @property
+    def name(self) -> str:
+        """The names of the queues in the group"""
+        return ", ".join(self._names)
+
+    @property
+    def metrics(self) -> Metrics:
+        """Receives the measurements of the queues in the group"""
+        return self._first.metrics
+
+    def _ranks(self) -> Dict[str, int]:
+        if self.weights is None:
+            order = self._names
+        else:
+            # A weighted random permutation: sorting by u ** (1 / weight) puts a queue first
+            # with a probability proportional to its weight, also among any subset of queues.
+            weights = self.weights
+            order = sorted(
+                self._names,
+                key=lambda name: random.random() ** (1.0 / weights[name]),
+                reverse=True,
+            )
+        return {name: rank for rank, name in enumerate(order)}
+
+    def get_many(self, max_items: int) -> List[AlchemicalEntry[Any]]:
+        """Get up to `max_items` entries out from the queues of the group in a single transaction.
+
+        Args:
+            max_items (int): The maximum number of entries to pop.
+
+        Returns:
+            List[AlchemicalEntry]: The popped entries in order, empty if nothing is available.
+        """
+        return self._poll(max_items)[0]
+
+    def _poll(
+        self, max_items: int
+    ) -> Tuple[List[AlchemicalEntry[Any]], Optional[datetime]]:
+        """Pop like `get_many`, also returning `next_ready_at` when nothing was popped."""
+        if max_items < 1:
+            return [], None
+
+        start = time.perf_counter()
+        try:
+            entries, next_ready = self._first._run(
+                _immediate_transaction, self._pop_or_next, max_items
+            )
+        finally:
+            # A poll of the group is a poll of each of its queues
+            elapsed = time.perf_counter() - start
+            for name in self._names:
+                self.metrics.observe("get_seconds", name, elapsed)
+        _count_pop(self.metrics, self._names, entries)
+        return entries, next_ready
+
+    def _pop_or_next(
+        self, conn: Connection, limit: int
+    ) -> Tuple[List[AlchemicalEntry[Any]], Optional[datetime]]:
+        entries = self._pop(conn, limit)
+        return entries, None if entries else self._first._scalar(conn, self._next_ready)
+
+    def _pop(
+        self, conn: Connection, limit: int, resolve: bool = False
+    ) -> List[AlchemicalEntry[Any]]:
+        for queue in self.queues.values():
+            queue._promote(conn)
+
+        ranks = self._ranks()
+        rows: Sequence[Any]
+        params: Dict[str, Any] = {"now": datetime.now(), "limit": limit}
+        params.update((f"rank_{i}", ranks[name]) for i, name in enumerate(self._names))
+
+        if self._first._delete_returning:
+            # RETURNING yields rows in no particular order
+            rows = sorted(
+                conn.execute(self._pop_ready, params),
+                key=lambda row: (
+                    ranks[row.queue_name],
+                    -row.priority,
+                    row.ready_at,
+                    row.entry_id,
+                ),
+            )
+        else:
+            rows = conn.execute(self._ready, params).all()
+            if rows:
+                conn.execute(
+                    self._first._stmts.delete_ids,
+                    {"entry_ids": [row.entry_id for row in rows]},
+                )
+
+        return [
+            AlchemicalEntry(
+                row,
+                load=self.queues[row.queue_name]._loader(
+                    conn if resolve else None, row
+                ),
+            )
+            for row in rows
+        ]
+
+    def get(
+        self,
+        block: bool = False,
+        timeout: Optional[float] = None,
+        wait: Optional[WaitStrategy] = None,
+    ) -> Union[AlchemicalEntry[Any], None]:
+        """Get the next entry out from the queues of the group, see [AlchemicalQueue.get][alchemical_queues.AlchemicalQueue.get]."""
+
+        return _blocking_get(self, block, timeout, wait)
+
+    def next_ready_at(self) -> Optional[datetime]:
+        """When the next entry of any of the queues can be popped, see
+        [AlchemicalQueue.next_ready_at][alchemical_queues.AlchemicalQueue.next_ready_at].
+
+        Returns:
+            (datetime | None): The time, in the past when an entry is ready now. None if the queues are empty.
+        """
+        return cast(
+            Optional[datetime],
+            self._first._run(Engine.connect, self._first._scalar, self._next_ready),
+        )
+
+    def wait_for_entries(self, timeout: float) -> bool:
+        """Sleep for up to `timeout` seconds, waking up early if the notifier signals that entries
+        were put on any of the queues. Without a notifier this just sleeps.
+
+        Args:
+            timeout (float): the maximum time to sleep in seconds.
+
+        Returns:
+            bool: wether a notification was received.
+        """
+
+        if self._first._notifier is None:
+            time.sleep(timeout)
+            return False
+
+        return self._first._notifier.wait(self._names, timeout)
+
+    def qsize(self) -> int:
+        """Return the approximate number of entries in all queues of the group.
+
+        Returns:
+            int: Total queue size.
+        """
+        return sum(queue.qsize() for queue in self.queues.values())
+
+    def reap(self, batch_size: int = 500) -> int:
+        """Delete the responses of the queues that are past their `cleanup_at`, see
+        [AlchemicalQueue.reap][alchemical_queues.AlchemicalQueue.reap].
+
+        Returns:
+            int: The number of responses deleted.
+        """
+        return sum(queue.reap(batch_size) for queue in self.queues.values())
@@ -1,71 +1,106 @@
 """Implementation of Alchemical Queues"""
 
-import pickle
-from datetime import datetime
-from typing import Dict, List, Any, Union, Type, cast, Generic, TypeVar
-
-from sqlalchemy import or_, event, DateTime, Integer, Text, Column, LargeBinary
-from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.engine import Engine
-from sqlalchemy.orm import registry
-from sqlalchemy.orm.decl_api import DeclarativeMeta
-
+import time
+from datetime import datetime, timedelta
+from functools import partial
+from types import SimpleNamespace
+from typing import (
+    Dict,
+    List,
+    Any,
+    Union,
+    Type,
+    cast,
+    Generic,
+    TypeVar,
+    Iterable,
+    Sequence,
+    Optional,
+    Callable,
+    Set,
+    Tuple,
+    ContextManager,
+)
+
+from sqlalchemy import (
+    event,
+    func,
+    inspect,
+    select,
+    update,
+    delete,
+    bindparam,
+    Integer,
+    Table,
+)
+from sqlalchemy.engine import Engine, Connection
+from sqlalchemy.sql import Select
+
+from .claimcheck import BlobStore, ClaimCheck
+from .entry import AlchemicalEntry, AlchemicalResponse
+from .schema import (
+    generate_tables,
+    add_column,
+    _Statements,
+    _insert_many,
+    _supports_delete_returning_pop,
+    _MAX_BOUND_PARAMETERS,
+)
+from .metrics import Metrics, _count_pop
+from .notify import Notifier
+from .sqlite import _begin_sqlite, _immediate_transaction, _own_engine
+from .stats import QueueStatistics, _estimate_rows, _statistics
+from .reaper import _reap
+from .retry import RetryPolicy
+from .serialize import Serializer, PickleSerializer
+from .wait import WaitStrategy, _blocking_get, _comparable
+from .wheel import TimingWheel
 
 T = TypeVar("T")
+V = TypeVar("V")
+R = TypeVar("R")
 
 
-def _generate_models(queue_tablename: str, response_tablename: str):
-    mapper_registry = registry()
-
-    class Base(metaclass=DeclarativeMeta):
-        """SQLAlchemy model base class"""
-
-        __abstract__ = True
-
-        registry = mapper_registry
-        metadata = mapper_registry.metadata
-
-        __init__ = mapper_registry.constructor
+def _is_ready(schedule_at: Optional[datetime], now: datetime) -> bool:
+    if schedule_at is None:
+        return True
+    return schedule_at <= _comparable(now, schedule_at)
 
-    class Entry(Base):
-        """SQLAlchemy model for a Queue Entry."""
 
-        __tablename__: str = queue_tablename
+def _broadcast(
+    value: Union[V, Sequence[V]], scalar: tuple, count: int, name: str
+) -> List[V]:
+    if value is None or isinstance(value, scalar):
+        return [cast(V, value)] * count
 
-        entry_id = Column(Integer, primary_key=True, nullable=False, autoincrement=True)
-        queue_name = Column(Text, nullable=False, index=True)
-
-        enqueued_at = Column(DateTime(timezone=True), nullable=False)
-        schedule_at = Column(DateTime(timezone=True), nullable=True)
-        priority = Column(Integer, nullable=False)
-        data = Column(LargeBinary)
-
-    class Response(Base):
-        """SQLAlchemy model for a Task Result."""
-
-        __tablename__: str = response_tablename
-
-        response_id = Column(
-            Integer, primary_key=True, nullable=False, autoincrement=True
+    values = list(cast(Sequence[V], value))
+    if len(values) != count:
+        raise ValueError(
+            f"{name} has {len(values)} values but {count} items were given"
         )
-        queue_name = Column(Text, nullable=False, index=True)
-        entry_id = Column(Integer, index=True, nullable=False)
-
-        delivered_at = Column(DateTime(timezone=True), nullable=False)
-        cleanup_at = Column(DateTime(timezone=True), nullable=True)
-        data = Column(LargeBinary)
+    return values
 
-    return Base, Entry, Response  # type: ignore
 
+class AlchemicalQueues:  # pylint: disable=R0902
+    """The core entrypoint to Alchemical Queues.
 
-class AlchemicalQueues:
-    """The core entrypoint to Alchemical Queues."""
+    Attributes:
+        retry (RetryPolicy): retries the transactions of all queues that conflicted with another one.
+        metrics (Metrics): receives the measurements of all queues.
+    """
 
-    def __init__(
+    def __init__(  # pylint: disable=R0913
         self,
         engine: Union[Engine, None] = None,
         queue_tablename: str = "AlchemicalQueue",
         response_tablename: str = "AlchemicalResult",
+        *,
+        notifier: Optional[Notifier] = None,
+        serializer: Optional[Serializer] = None,
+        claim_check: Optional[ClaimCheck] = None,
+        retry: Optional[RetryPolicy] = None,
+        timing_wheel: Optional[TimingWheel] = None,
+        metrics: Optional[Metrics] = None,
     ) -> None:
         """Create the main queue entrypoint object.
 
@@ -73,13 +108,31 @@ class AlchemicalQueues:
             engine (sqlalchemy.engine.Engine | None): The SQLAlchemy engine you want to use. May be left None and initialized later.
             queue_tablename (str): The name of the table AlchemicalQueues uses for queues.
             queue_tablename (str): The name of the table AlchemicalQueues uses for task results.
+            notifier (Notifier | None): Wakes up blocked consumers when entries are put, instead of waiting for the next poll.
+            serializer (Serializer | None): The default serializer of the queues, pickle if None.
+            claim_check (ClaimCheck | None): Store large payloads apart from the queue tables.
+            retry (RetryPolicy | None): When to retry transactions that failed on a lock conflict, a default `RetryPolicy` if None.
+            timing_wheel (TimingWheel | None): Keep entries scheduled far ahead out of the queue table until they are nearly due.
+            metrics (Metrics | None): Measure the operations of the queues, for example with a `MetricsRegistry`.
         """
 
-        self._engine = engine
+        self._engine = None if engine is None else _own_engine(engine)
+        self._notifier = notifier
+        self.retry = retry or RetryPolicy()
+        self.metrics = metrics or Metrics()
+        self._serializer = serializer or PickleSerializer()
         self._get_prepped = False
-        self._base, self._qmodel, self._rmodel = _generate_models(
-            queue_tablename, response_tablename
-        )
+        self._delete_returning = False
+        (
+            self._metadata,
+            self._qtable,
+            self._rtable,
+            self._btable,
+            self._dtable,
+        ) = generate_tables(queue_tablename, response_tablename)
+        self._timing_wheel = timing_wheel
+        self._claim_check = claim_check
+        self._blobs = claim_check.store(self._btable) if claim_check else None
         self._queues: Dict[str, "AlchemicalQueue"] = {}
 
     def set_engine(self, engine: Engine) -> None:
@@ -97,20 +150,151 @@ class AlchemicalQueues:
                 "Cannot set the engine on Alchemical Queues more than once!"
             )
 
-        self._engine = engine
+        self._engine = _own_engine(engine)
 
     def create_all(self) -> None:
         """Create the needed SQLAlchemy table. You would normally call this
         when you are also creating your own tables, e.g. db.create_all()."""
-        self._base.metadata.create_all(self._engine)
+        assert self._engine
+        self._metadata.create_all(self._engine)
+
+    def migrate(self) -> None:
+        """Upgrade tables created by an older version of Alchemical Queues in place.
+        Missing columns and indexes are added and missing tables are created. Columns
+        added this way are nullable, even where a new table would have them `NOT NULL`.
+        """
+
+        assert self._engine
+
+        with self._engine.begin() as conn:
+            inspector = inspect(conn)
+            added = set()
+
+            for table in self._metadata.sorted_tables:
+                if not inspector.has_table(table.name):
+                    continue
+
+                columns = {c["name"] for c in inspector.get_columns(table.name)}
+                for column in table.columns:
+                    if column.name not in columns:
+                        add_column(conn, table, column)
+                        added.add(column)
+
+                indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+                for index in table.indexes:
+                    if index.name not in indexes:
+                        index.create(conn)
+
+            qt = self._qtable.c
+            if qt.ready_at in added:
+                conn.execute(
+                    update(self._qtable)
+                    .where(qt.ready_at == None)  # pylint: disable=C0121
+                    .values(ready_at=func.coalesce(qt.schedule_at, qt.enqueued_at))
+                )
+
+        self._metadata.create_all(self._engine)
 
     def clear(self) -> None:
         """Clear all entries from all queues and task results. Might fail-silent an update call."""
 
-        with Session(self._engine) as session:
-            session.query(self._qmodel).delete()
-            session.query(self._rmodel).delete()
-            session.commit()
+        assert self._engine
+
+        def clear() -> None:
+            assert self._engine
+            with self._engine.begin() as conn:
+                conn.execute(delete(self._qtable))
+                conn.execute(delete(self._rtable))
+                conn.execute(delete(self._dtable))
+
+        self.retry.run(clear, self._engine.dialect)
+
+    def stats(
+        self, names: Optional[Iterable[str]] = None
+    ) -> Dict[str, QueueStatistics]:
+        """Take a snapshot of all queues with a single `GROUP BY` query, instead of a query per queue.
+
+        Args:
+            names (Iterable[str] | None, optional): Only these queues, all queues that have entries if None.
+
+        Returns:
+            Dict[str, QueueStatistics]: The statistics by queue name. Queues in `names` without entries have zeroes.
+        """
+
+        assert self._engine
+        engine = self._engine
+        selected = None if names is None else list(names)
+
+        def stats() -> Dict[str, QueueStatistics]:
+            with engine.connect() as conn:
+                return _statistics(conn, self._qtable, self._dtable, selected)
+
+        return self.retry.run(stats, engine.dialect)
+
+    def collect_blobs(self, grace: timedelta = timedelta(hours=1)) -> int:
+        """Remove payloads stored by the claim check that no entry or response refers to anymore.
+        Run it periodically when using a [ClaimCheck][alchemical_queues.ClaimCheck].
+
+        Args:
+            grace (timedelta, optional): Keep payloads stored more recently than this, as the
+                                         transaction storing them may not have committed yet.
+
+        Returns:
+            int: The number of payloads removed.
+        """
+
+        assert self._engine
+        if self._blobs is None:
+            return 0
+
+        def collect() -> int:
+            assert self._engine and self._blobs
+            with self._engine.begin() as conn:
+                return self._collect_blobs(conn, self._blobs, grace)
+
+        return self.retry.run(collect, self._engine.dialect)
+
+    def _collect_blobs(
+        self, conn: Connection, blobs: BlobStore, grace: timedelta
+    ) -> int:
+        before = datetime.now() - grace
+        candidates = blobs.keys(conn, before)
+        if not candidates:
+            return 0
+
+        referenced: Set[str] = set()
+        for table in (self._qtable, self._rtable, self._dtable):
+            referenced.update(
+                conn.execute(
+                    select(table.c.blob_key)
+                    .where(table.c.blob_key != None)  # pylint: disable=C0121
+                    .distinct()
+                ).scalars()
+            )
+
+        garbage = [key for key in candidates if key not in referenced]
+        return blobs.delete(conn, garbage, before)
+
+    def reap(self, batch_size: int = 500) -> int:
+        """Delete the responses of all queues that are past their `cleanup_at`. Expired responses
+        are not returned by lookups, but stay in the table until they are reaped. Run it
+        periodically, for example with `alchemical_worker reap`.
+
+        Args:
+            batch_size (int, optional): Delete this many responses per transaction.
+
+        Returns:
+            int: The number of responses deleted.
+        """
+
+        assert self._engine
+        rt = self._rtable.c
+        expired = (
+            select(rt.response_id)
+            .where(rt.cleanup_at < bindparam("now"))
+            .limit(bindparam("limit", type_=Integer))
+        )
+        return _reap(self._engine, expired, self._rtable, batch_size, retry=self.retry)
 
     def _prep_engine_for_get_transaction(self) -> None:
         if self._get_prepped:
@@ -120,18 +304,21 @@ class AlchemicalQueues:
             raise Exception("AlchemicalQueues SQLAlchemy engine was not initialized.")
 
         self._get_prepped = True
+        self._delete_returning = _supports_delete_returning_pop(self._engine.dialect)
 
-        if self._engine.driver == "pysqlite":
+        if self._engine.driver in ("pysqlite", "aiosqlite") and not event.contains(
+            self._engine, "begin", _begin_sqlite
+        ):
+            event.listen(self._engine, "begin", _begin_sqlite)
 
-            @event.listens_for(self._engine, "begin")
-            def do_begin(conn):
-                conn.exec_driver_sql("BEGIN EXCLUSIVE")
-
-    def get(self, key: str) -> "AlchemicalQueue[Any]":
+    def get(
+        self, key: str, serializer: Optional[Serializer] = None
+    ) -> "AlchemicalQueue[Any]":
         """Get a Queue instance
 
         Args:
             key (str): The name of the queue you wish to access.
+            serializer (Serializer | None): Use this serializer for the queue from now on, instead of the default.
 
         Returns:
             AlchemicalQueue
@@ -141,9 +328,24 @@ class AlchemicalQueues:
 
         if key not in self._queues:
             self._queues[key] = AlchemicalQueue(
-                self._engine, self._qmodel, self._rmodel, key
+                self._engine,
+                self._qtable,
+                self._rtable,
+                key,
+                delayed_table=self._dtable,
+                timing_wheel=self._timing_wheel,
+                delete_returning=self._delete_returning,
+                notifier=self._notifier,
+                serializer=self._serializer,
+                claim_check=self._claim_check,
+                blobs=self._blobs,
+                retry=self.retry,
+                metrics=self.metrics,
             )
 
+        if serializer is not None:
+            self._queues[key].serializer = serializer
+
         return self._queues[key]
 
     def get_typed(self, key: str, typeof: Type[T]) -> "AlchemicalQueue[T]":
@@ -160,108 +362,419 @@ class AlchemicalQueues:
         return cast(AlchemicalQueue[T], self.get(key))
 
 
-class AlchemicalQueue(Generic[T]):
+class AlchemicalQueue(Generic[T]):  # pylint: disable=R0902
     """An Alchemical Queue. It is not intended to be initialized by a user, go through
-    [AlchemicalQueues][alchemical_queues.AlchemicalQueues] instead."""
+    [AlchemicalQueues][alchemical_queues.AlchemicalQueues] instead.
+
+    Attributes:
+        serializer (Serializer): converts entries and responses to the bytes stored in the database.
+    """
 
-    def __init__(self, engine: Engine, model, response_model, name: str):
+    def __init__(  # pylint: disable=R0913
+        self,
+        engine: Engine,
+        table: Table,
+        response_table: Table,
+        name: str,
+        *,
+        delayed_table: Table,
+        timing_wheel: Optional[TimingWheel] = None,
+        delete_returning: bool = False,
+        notifier: Optional[Notifier] = None,
+        serializer: Optional[Serializer] = None,
+        claim_check: Optional[ClaimCheck] = None,
+        blobs: Optional[BlobStore] = None,
+        retry: Optional[RetryPolicy] = None,
+        metrics: Optional[Metrics] = None,
+    ):
         self._engine = engine
-        self._model = model
-        self._response_model = response_model
+        self._table = table
+        self._response_table = response_table
         self._name = name
-        self._session = sessionmaker(
-            engine,
-            autocommit=False,
-            autoflush=False,
-            expire_on_commit=False,
-            future=True,
-        )
+        self._delete_returning = delete_returning
+        self._notifier = notifier
+        self.serializer: Serializer = serializer or PickleSerializer()
+        self._claim_check = claim_check
+        self._blobs = blobs
+        self._retry = retry or RetryPolicy()
+        self._metrics = metrics or Metrics()
+        self._delayed_table = delayed_table
+        self._wheel = timing_wheel
+        # Unix timestamp from which the next pop promotes entries from the timing wheel
+        self._promote_at = 0.0
+        self._stmts = _Statements(table, response_table, delayed_table, name)
 
     @property
     def name(self) -> str:
         """The name of the queue"""
         return self._name
 
+    @property
+    def metrics(self) -> Metrics:
+        """Receives the measurements of this queue"""
+        return self._metrics
+
+    def _run(
+        self,
+        transaction: Callable[[Engine], ContextManager[Connection]],
+        operation: Callable[..., R],
+        *args: Any,
+    ) -> R:
+        """Run `operation(conn, *args)` in a transaction, retried when it conflicts with another one."""
+
+        def attempt() -> R:
+            with transaction(self._engine) as conn:
+                return operation(conn, *args)
+
+        return self._retry.run(attempt, self._engine.dialect, self._count_retry)
+
+    def _count_retry(self) -> None:
+        self._metrics.increment("retries", self._name)
+
     def put(
         self,
         item: T,
         *,
         schedule_at: Union[datetime, None] = None,
         priority: int = 0,
-    ) -> "AlchemicalEntry[T]":
+    ) -> AlchemicalEntry[T]:
         """Put an entry into the AlchemicalQueue
 
         Args:
-            item (Any): The item you wish to add to the queue. It must be pickle-able.
+            item (Any): The item you wish to add to the queue. It must be serializable by the `serializer` of the queue.
             schedule_at (datetime | None, optional): Earliest timestamp this entry may be popped of the queue.
             priority (int, optional): Entry priority. Entries are popped of first in order of priority and then
-                                      in order of adding to the queue.
+                                      in order of becoming available (`schedule_at`, or the time of adding).
 
         Returns:
             AlchemicalEntry[T]: The resultant queue entry.
         """
 
-        entry = self._model(
-            enqueued_at=datetime.now(),
-            schedule_at=schedule_at,
-            priority=priority,
-            queue_name=self._name,
-            data=pickle.dumps(item),
+        rows = self._entry_rows([item], schedule_at, priority)
+
+        with self._metrics.timer("put_seconds", self._name):
+            (entry_id,) = self._run(Engine.begin, self._insert, rows)
+        self._metrics.increment("entries_put", self._name)
+
+        self._notify(rows)
+        return AlchemicalEntry(SimpleNamespace(entry_id=entry_id, **rows[0]), item)
+
+    def put_many(
+        self,
+        items: Iterable[T],
+        *,
+        schedule_at: Union[datetime, None, Sequence[Optional[datetime]]] = None,
+        priority: Union[int, Sequence[int]] = 0,
+    ) -> List[int]:
+        """Put many entries into the AlchemicalQueue in a single transaction.
+
+        Args:
+            items (Iterable[Any]): The items you wish to add to the queue. They must be serializable by the `serializer` of the queue.
+            schedule_at (datetime | None | Sequence[datetime | None], optional): Earliest timestamp the entries may be
+                                      popped of the queue. Pass a sequence to set it per item.
+            priority (int | Sequence[int], optional): Entry priority. Pass a sequence to set it per item.
+
+        Returns:
+            List[int]: The entry ids of the new entries, in the order of `items`.
+        """
+
+        rows = self._entry_rows(items, schedule_at, priority)
+        if not rows:
+            return []
+
+        with self._metrics.timer("put_seconds", self._name):
+            entry_ids = self._run(Engine.begin, self._insert, rows)
+        self._metrics.increment("entries_put", self._name, len(rows))
+
+        self._notify(rows)
+        return entry_ids
+
+    def _entry_rows(
+        self,
+        items: Iterable[T],
+        schedule_at: Union[datetime, None, Sequence[Optional[datetime]]],
+        priority: Union[int, Sequence[int]],
+    ) -> List[Dict[str, Any]]:
+        datas = [self.serializer.dumps(item) for item in items]
+        schedules = _broadcast(schedule_at, (datetime,), len(datas), "schedule_at")
+        priorities = _broadcast(priority, (int,), len(datas), "priority")
+        now = datetime.now()
+
+        return [
+            {
+                "queue_name": self._name,
+                "enqueued_at": now,
+                "schedule_at": schedule,
+                "ready_at": schedule or now,
+                "priority": prio,
+                "data": data,
+                "blob_key": None,
+            }
+            for data, schedule, prio in zip(datas, schedules, priorities)
+        ]
+
+    def _check_in(
+        self, conn: Connection, rows: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Move the payloads of rows that reach the claim check threshold to the blob store.
+        The given rows are left as is, so a retried transaction can check them in again.
+        """
+        if self._claim_check is None or self._blobs is None:
+            return rows
+
+        now = datetime.now()
+        checked = []
+        for row in rows:
+            if len(row["data"]) >= self._claim_check.threshold:
+                key = ClaimCheck.key(row["data"])
+                self._blobs.put(conn, key, row["data"], now)
+                row = dict(row, data=None, blob_key=key)
+            checked.append(row)
+        return checked
+
+    def _fetch(self, key: str) -> Any:
+        assert self._blobs is not None
+        data = self._run(Engine.connect, self._blobs.get, key)
+        return self.serializer.loads(data)
+
+    def _loader(self, conn: Optional[Connection], row: Any) -> Callable[[], Any]:
+        """Decode the payload of a row on first use. Claim-checked payloads are fetched
+        right away when given a connection, or later with a connection of their own."""
+        if row.blob_key is None:
+            return partial(self.serializer.loads, row.data)
+        if conn is not None:
+            assert self._blobs is not None
+            return partial(self.serializer.loads, self._blobs.get(conn, row.blob_key))
+        return partial(self._fetch, row.blob_key)
+
+    def _insert(self, conn: Connection, rows: List[Dict[str, Any]]) -> List[int]:
+        self._notify(rows, conn)
+        rows = self._check_in(conn, rows)
+        wheel = self._wheel
+        later = [
+            wheel is not None and wheel.delays(row["ready_at"], row["enqueued_at"])
+            for row in rows
+        ]
+        if wheel is None or not any(later):
+            return self._insert_now(conn, rows)
+
+        now_ids = iter(
+            self._insert_now(conn, [row for row, l in zip(rows, later) if not l])
+        )
+        later_ids = iter(
+            _insert_many(
+                conn,
+                self._delayed_table,
+                [
+                    dict(row, slot=wheel.slot_of(row["ready_at"]))
+                    for row, l in zip(rows, later)
+                    if l
+                ],
+            )
         )
+        return [-next(later_ids) if l else next(now_ids) for l in later]
+
+    def _insert_now(self, conn: Connection, rows: List[Dict[str, Any]]) -> List[int]:
+        if not rows:
+            return []
+        if len(rows) == 1:
+            return [conn.execute(self._stmts.insert, rows[0]).inserted_primary_key[0]]
+        return _insert_many(conn, self._table, rows)
+
+    def promote(self) -> int:
+        """Move the entries of this queue that are nearly due from the timing wheel to the queue.
+        Pops already do this once per slot of the [TimingWheel][alchemical_queues.TimingWheel].
+
+        Returns:
+            int: The number of entries moved, 0 without a timing wheel.
+        """
+        if self._wheel is None:
+            return 0
+        return self._run(_immediate_transaction, self._wheel.promote, self._stmts)
 
-        with self._session() as session:
-            session.add(entry)
-            session.commit()
+    def _promote(self, conn: Connection) -> None:
+        # At most once per slot, so it costs the pops next to nothing
+        if self._wheel is None or time.time() < self._promote_at:
+            return
+        self._wheel.promote(conn, self._stmts)
+        self._promote_at = self._wheel.next_turn()
 
-            return AlchemicalEntry(entry, item)
+    def _notify(
+        self, rows: List[Dict[str, Any]], conn: Optional[Connection] = None
+    ) -> None:
+        if any(_is_ready(row["schedule_at"], row["enqueued_at"]) for row in rows):
+            self._signal(self._name, conn)
+
+    def _signal(self, channel: str, conn: Optional[Connection]) -> None:
+        # Transactional notifiers signal from within the insert with its connection,
+        # the others after it committed without one.
+        notifier = self._notifier
+        if notifier is None or notifier.transactional != (conn is not None):
+            return
+        if conn is None:
+            notifier.notify(channel)
+        else:
+            notifier.notify_in(conn, channel)
 
-    def get(self) -> Union["AlchemicalEntry[T]", None]:
+    def get(
+        self,
+        block: bool = False,
+        timeout: Optional[float] = None,
+        wait: Optional[WaitStrategy] = None,
+    ) -> Union[AlchemicalEntry[T], None]:
         """Get the highest priority entry out from the queue
 
+        Args:
+            block (bool, optional): wait until an entry is available instead of returning None right away.
+            timeout (float | None, optional): when blocking, give up after this many seconds. Waits forever if None.
+            wait (WaitStrategy | None, optional): how long to sleep between polls while blocking.
+                                                  Defaults to an [ExponentialBackoff][alchemical_queues.ExponentialBackoff].
+
         Returns:
             (AlchemicalEntry | None): The popped entry, or None if the queue is empty (or nothing is scheduled yet)
         """
 
-        timestamp = datetime.now()
-
-        with self._session() as session:
-            item = (
-                session.query(self._model)
-                .with_for_update(of=self._model, skip_locked=True)
-                .filter(
-                    self._model.queue_name == self._name,
-                    or_(
-                        self._model.schedule_at == None,  # pylint: disable=C0121
-                        self._model.schedule_at <= timestamp,  # type: ignore
-                    ),
-                )
-                .order_by(self._model.priority.desc(), self._model.entry_id.asc())  # type: ignore
-                .limit(1)
-                .first()
-            )
+        return _blocking_get(self, block, timeout, wait)
+
+    def next_ready_at(self) -> Optional[datetime]:
+        """When the next entry can be popped: the earliest `schedule_at` of the entries in the queue,
+        or the time an entry without one was put.
 
-            if item is None:
-                session.rollback()
-                return None
+        Returns:
+            (datetime | None): The time, in the past when an entry is ready now. None if the queue is empty.
+        """
+        return cast(
+            Optional[datetime],
+            self._run(Engine.connect, self._scalar, self._stmts.next_ready),
+        )
+
+    def wait_for_entries(self, timeout: float) -> bool:
+        """Sleep for up to `timeout` seconds, waking up early if the notifier of this
+        queue signals that new entries were put. Without a notifier this just sleeps.
+
+        Args:
+            timeout (float): the maximum time to sleep in seconds.
+
+        Returns:
+            bool: wether a notification was received.
+        """
+
+        if self._notifier is None:
+            time.sleep(timeout)
+            return False
+
+        return self._notifier.wait((self._name,), timeout)
+
+    def wait_for_responses(self, timeout: float) -> bool:
+        """Sleep for up to `timeout` seconds, waking up early if the notifier of this
+        queue signals that a response was sent. Without a notifier this just sleeps.
+
+        Args:
+            timeout (float): the maximum time to sleep in seconds.
+
+        Returns:
+            bool: wether a notification was received.
+        """
+
+        if self._notifier is None:
+            time.sleep(timeout)
+            return False
+
+        return self._notifier.wait((self._response_channel,), timeout)
+
+    @property
+    def _response_channel(self) -> str:
+        return f"{self._name}/responses"
+
+    def _notify_responses(self, conn: Optional[Connection] = None) -> None:
+        self._signal(self._response_channel, conn)
+
+    def get_many(self, max_items: int) -> List[AlchemicalEntry[T]]:
+        """Get up to `max_items` of the highest priority entries out from the queue
+        in a single transaction.
+
+        Args:
+            max_items (int): The maximum number of entries to pop.
+
+        Returns:
+            List[AlchemicalEntry]: The popped entries in queue order, empty if nothing is available.
+        """
+        return self._poll(max_items)[0]
+
+    def _poll(
+        self, max_items: int
+    ) -> Tuple[List[AlchemicalEntry[T]], Optional[datetime]]:
+        """Pop like `get_many`, also returning `next_ready_at` when nothing was popped."""
+        if max_items < 1:
+            return [], None
+
+        with self._metrics.timer("get_seconds", self._name):
+            entries, next_ready = self._run(
+                _immediate_transaction, self._pop_or_next, max_items
+            )
+        _count_pop(self._metrics, (self._name,), entries)
+        return entries, next_ready
+
+    def _pop_or_next(
+        self, conn: Connection, limit: int
+    ) -> Tuple[List[AlchemicalEntry[T]], Optional[datetime]]:
+        entries = self._pop(conn, limit)
+        # An empty poll learns when to poll again from the same transaction
+        return entries, None if entries else self._scalar(conn, self._stmts.next_ready)
+
+    def _pop(
+        self, conn: Connection, limit: int, resolve: bool = False
+    ) -> List[AlchemicalEntry[T]]:
+        self._promote(conn)
+        params = {"now": datetime.now(), "limit": limit}
+        rows: Sequence[Any]
+
+        if self._delete_returning:
+            # RETURNING yields rows in no particular order
+            rows = sorted(
+                conn.execute(self._stmts.pop, params),
+                key=lambda row: (-row.priority, row.ready_at, row.entry_id),
+            )
+        else:
+            rows = conn.execute(self._stmts.ready, params).all()
+            if rows:
+                conn.execute(
+                    self._stmts.delete_ids,
+                    {"entry_ids": [row.entry_id for row in rows]},
+                )
 
-            entry = AlchemicalEntry(item, pickle.loads(item.data))
-            session.delete(item)
-            session.commit()
+        return [
+            AlchemicalEntry(row, load=self._loader(conn if resolve else None, row))
+            for row in rows
+        ]
 
-        return entry
+    @staticmethod
+    def _scalar(conn: Connection, statement: Select) -> Any:
+        return conn.execute(statement).scalar()
 
-    def qsize(self) -> int:
+    def qsize(self, approximate: bool = False) -> int:
         """Return the approximate size of this queue.
 
+        Args:
+            approximate (bool, optional): On PostgreSQL, estimate the size from the planner statistics
+                                          instead of counting the entries. Exact on other databases.
+
         Returns:
             int: Queue size.
         """
-        with self._session() as session:
-            return (
-                session.query(self._model)
-                .where(self._model.queue_name == self._name)
-                .count()
-            )
+        return self._run(Engine.connect, self._size, approximate)
+
+    def _size(self, conn: Connection, approximate: bool = False) -> int:
+        if approximate and conn.dialect.name == "postgresql":
+            size = _estimate_rows(conn, self._stmts.entries)
+            if self._wheel is not None:
+                size += _estimate_rows(conn, self._stmts.delayed_entries)
+            return size
+
+        size = cast(int, self._scalar(conn, self._stmts.count))
+        if self._wheel is not None:
+            size += cast(int, self._scalar(conn, self._stmts.delayed_count))
+        return size
 
     def empty(self) -> bool:
         """Return `True` if the Queue is emtpy, `False` otherwise. More efficient than
@@ -270,143 +783,188 @@ class AlchemicalQueue(Generic[T]):
         Returns:
             bool: wether the Queue is empty.
         """
-        with self._session() as session:
-            return (
-                session.query(self._model)
-                .where(self._model.queue_name == self._name)
-                .limit(1)
-                .count()
-                == 0
-            )
+        return self._run(Engine.connect, self._empty)
+
+    def _empty(self, conn: Connection) -> bool:
+        if self._wheel is None:
+            return not self._scalar(conn, self._stmts.any)
+        return not self._scalar(conn, self._stmts.any_or_delayed)
 
     def clear(self) -> None:
         """Clear all entries from this queue. Might fail-silent an update call."""
 
-        with self._session() as session:
-            session.query(self._model).where(
-                self._model.queue_name == self._name
-            ).delete()
-            session.commit()
+        self._run(Engine.begin, self._clear)
+
+    def _clear(self, conn: Connection) -> None:
+        conn.execute(self._stmts.clear)
+        conn.execute(self._stmts.delayed_clear)
 
     def respond(
         self, entry_id: int, response: Any, cleanup_at: Union[datetime, None] = None
-    ) -> "AlchemicalResponse":
+    ) -> AlchemicalResponse:
         """Send a response to a queue entry. Used to implement task queues.
 
         Args:
             entry_id (int): The entry_id you wish to respond to.
             response (Any): The response data. Must be pickable.
-            cleanup_at (datetime, optional): The optional cleanup timestamp. After this time the response will be removed.
-                                             By default it is not automatically cleaned up.
+            cleanup_at (datetime, optional): The optional cleanup timestamp. After this time the response is no longer
+                                             returned, and removed by `reap`. By default it is not automatically cleaned up.
 
         Returns:
             AlchemicalResponse: the response as sent.
         """
 
-        if not isinstance(entry_id, int):
-            raise TypeError(f"entry_id={entry_id} should be integer")
+        row = self._response_row(entry_id, response, cleanup_at)
 
-        entry = self._response_model(
-            entry_id=entry_id,
-            delivered_at=datetime.now(),
-            cleanup_at=cleanup_at,
-            queue_name=self._name,
-            data=pickle.dumps(response),
-        )
+        with self._metrics.timer("respond_seconds", self._name):
+            (response_id,) = self._run(Engine.begin, self._insert_responses, [row])
+        self._metrics.increment("responses", self._name)
 
-        with self._session() as session:
-            session.add(entry)
-            session.commit()
+        self._notify_responses()
+        return AlchemicalResponse(
+            SimpleNamespace(response_id=response_id, **row), response
+        )
 
-            return AlchemicalResponse(entry, response)
+    def respond_many(
+        self, responses: Iterable[Tuple[int, Any, Union[datetime, None]]]
+    ) -> List[AlchemicalResponse]:
+        """Send many responses in a single transaction.
 
-    def responses(self, entry_id: int) -> List["AlchemicalResponse"]:
-        """Obtain the response(s) to a specific queue entry.
+        Args:
+            responses (Iterable[Tuple[int, Any, datetime | None]]): `(entry_id, response, cleanup_at)` tuples,
+                                                                    see [respond][alchemical_queues.AlchemicalQueue.respond].
 
         Returns:
-            List[AlchemicalResponse]: A list of responses
+            List[AlchemicalResponse]: the responses as sent, in the given order.
         """
+
+        responses = list(responses)
+        rows = [self._response_row(*response) for response in responses]
+        if not rows:
+            return []
+
+        with self._metrics.timer("respond_seconds", self._name):
+            response_ids = self._run(Engine.begin, self._insert_responses, rows)
+        self._metrics.increment("responses", self._name, len(rows))
+
+        self._notify_responses()
+        return [
+            AlchemicalResponse(SimpleNamespace(response_id=response_id, **row), data)
+            for response_id, row, (_, data, _) in zip(response_ids, rows, responses)
+        ]
+
+    def _response_row(
+        self, entry_id: int, response: Any, cleanup_at: Union[datetime, None]
+    ) -> Dict[str, Any]:
         if not isinstance(entry_id, int):
             raise TypeError(f"entry_id={entry_id} should be integer")
 
-        with self._session() as session:
-            now = datetime.now()
-
-            session.query(self._response_model).where(
-                self._response_model.cleanup_at != None,  # pylint: disable=C0121
-                self._response_model.cleanup_at < now,
-            ).delete()
-            entries = (
-                session.query(self._response_model)
-                .where(
-                    self._response_model.queue_name == self._name,
-                    self._response_model.entry_id == entry_id,
-                )
-                .all()
-            )
-            return [AlchemicalResponse(e, pickle.loads(e.data)) for e in entries]
+        return {
+            "entry_id": entry_id,
+            "delivered_at": datetime.now(),
+            "cleanup_at": cleanup_at,
+            "queue_name": self._name,
+            "data": self.serializer.dumps(response),
+            "blob_key": None,
+        }
+
+    def _insert_responses(
+        self, conn: Connection, rows: List[Dict[str, Any]]
+    ) -> List[int]:
+        self._notify_responses(conn)
+        rows = self._check_in(conn, rows)
+        if len(rows) == 1:
+            return [conn.execute(self._stmts.respond, rows[0]).inserted_primary_key[0]]
+        return _insert_many(conn, self._response_table, rows)
+
+    def responses(self, entry_id: int) -> List[AlchemicalResponse]:
+        """Obtain the response(s) to a specific queue entry. Responses past their `cleanup_at` are left out.
 
+        Returns:
+            List[AlchemicalResponse]: A list of responses, in the order they were sent.
+        """
+        return self._run(Engine.connect, self._responses, entry_id)
 
-class AlchemicalEntry(Generic[T]):
-    """An entry in a queue.
+    def response(self, entry_id: int) -> Union[AlchemicalResponse, None]:
+        """Obtain the first response to a specific queue entry, without fetching the others.
 
-    Attributes:
-        entry_id (int): the identifier of the entry. Guaranteed unique per [AlchemicalQueues][alchemical_queues.AlchemicalQueues] instance.
-        enqueued_at (datetime): when the entry was added to the queue.
-        schedule_at (datetime | None): do not remove the entry from the queue before this time.
-        priority (int): the priority of the entry.
-        data (T): the data stored in this entry.
-    """
+        Returns:
+            (AlchemicalResponse | None): The first response, or None if there is none.
+        """
+        responses = self._run(Engine.connect, self._responses, entry_id, True)
+        return responses[0] if responses else None
 
-    __slots__ = ("data", "entry_id", "enqueued_at", "schedule_at", "priority")
+    def responses_many(
+        self, entry_ids: Iterable[int]
+    ) -> Dict[int, List[AlchemicalResponse]]:
+        """Obtain the responses to many queue entries at once, in a few queries instead of one per entry.
 
-    def __init__(
-        self,
-        entry,
-        data: T,
-    ):
-        assert isinstance(entry.entry_id, int)
-
-        self.entry_id: int = entry.entry_id
-        self.enqueued_at: datetime = entry.enqueued_at
-        self.schedule_at: Union[datetime, None] = entry.schedule_at
-        self.priority: int = entry.priority
-        self.data: T = data
-
-    def __repr__(self):
-        return (
-            f"<{self.__class__.__module__}.{self.__class__.__name__} "
-            f"entry_id={self.entry_id} enqueued_at={self.enqueued_at} "
-            f"schedule_at={self.schedule_at} priority={self.priority}>"
-        )
+        Args:
+            entry_ids (Iterable[int]): The entries to look up.
+
+        Returns:
+            Dict[int, List[AlchemicalResponse]]: The responses per entry, in the order they were sent.
+                                                 Entries without responses are left out.
+        """
+        return self._run(Engine.connect, self._responses_many, list(entry_ids))
+
+    def _responses_many(
+        self, conn: Connection, entry_ids: Iterable[int], resolve: bool = False
+    ) -> Dict[int, List[AlchemicalResponse]]:
+        ids = list(entry_ids)
+        if not all(isinstance(entry_id, int) for entry_id in ids):
+            raise TypeError(f"entry_ids={ids} should be integers")
+
+        found: Dict[int, List[AlchemicalResponse]] = {}
+        now = datetime.now()
+
+        for start in range(0, len(ids), _MAX_BOUND_PARAMETERS):
+            rows = conn.execute(
+                self._stmts.responses_in,
+                {"entry_ids": ids[start : start + _MAX_BOUND_PARAMETERS], "now": now},
+            )
+            for row in rows:
+                found.setdefault(row.entry_id, []).append(
+                    AlchemicalResponse(
+                        row, load=self._loader(conn if resolve else None, row)
+                    )
+                )
 
+        return found
 
-class AlchemicalResponse:
-    """An response to a queue item. While you can use this as a user, it is probably most useful for the tasks submodule.
+    def reap(self, batch_size: int = 500) -> int:
+        """Delete the responses of this queue that are past their `cleanup_at`, see
+        [AlchemicalQueues.reap][alchemical_queues.AlchemicalQueues.reap].
 
-    Attributes:
-        response_id (int): the identifier of the response.
-        entry_id (int): the identifier of the associated entry.
-        delivered_at (datetime): when the response was submitted.
-        cleanup_at (datetime | None): autoremove this response after this time.
-        data (Any): Response data.
-    """
+        Args:
+            batch_size (int, optional): Delete this many responses per transaction.
 
-    __slots__ = [
-        "data",
-        "entry_id",
-        "response_id",
-        "delivered_at",
-        "cleanup_at",
-    ]
+        Returns:
+            int: The number of responses deleted.
+        """
+        return _reap(
+            self._engine,
+            self._stmts.expired,
+            self._response_table,
+            batch_size,
+            retry=self._retry,
+        )
 
-    def __init__(
+    def _responses(
         self,
-        response,
-        data: T,
-    ):
-        self.response_id = response.response_id
-        self.entry_id = response.entry_id
-        self.delivered_at = response.delivered_at
-        self.cleanup_at = response.cleanup_at
-        self.data = data
+        conn: Connection,
+        entry_id: int,
+        first: bool = False,
+        resolve: bool = False,
+    ) -> List[AlchemicalResponse]:
+        if not isinstance(entry_id, int):
+            raise TypeError(f"entry_id={entry_id} should be integer")
+
+        rows = conn.execute(
+            self._stmts.first_response if first else self._stmts.responses,
+            {"entry_id": entry_id, "now": datetime.now()},
+        ).all()
+        return [
+            AlchemicalResponse(row, load=self._loader(conn if resolve else None, row))
+            for row in rows
+        ]
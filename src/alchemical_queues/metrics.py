@@ -0,0 +1,234 @@
+"""Instrumentation hooks of queues and workers, and an in-memory registry that Prometheus can scrape."""
+
+import bisect
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+
+class Metrics:
+    """Receives the measurements of queues and workers. This base class ignores them: subclass it to
+    forward them to your monitoring system, or use a [MetricsRegistry][alchemical_queues.MetricsRegistry].
+    Methods are called from every thread that uses a queue, so they must be thread-safe.
+
+    Every measurement has a name and the name of the queue it concerns. Queues measure:
+
+    - `put_seconds`, `get_seconds`, `respond_seconds`: the duration of every `put`, `get` and `respond`
+      transaction, including their bulk variants and retries.
+    - `entries_put`, `entries_popped`, `responses`: the number of entries and responses written or popped.
+    - `empty_polls`: pops that found nothing to return.
+    - `retries`: transactions that conflicted with another one and were run again.
+
+    Workers measure:
+
+    - `task_seconds`: how long tasks ran, successful or not.
+    - `tasks_completed`, `tasks_failed`, `tasks_retried`: the outcomes of tasks.
+    """
+
+    def increment(self, name: str, queue: str, amount: float = 1.0) -> None:
+        """Add to a counter.
+
+        Args:
+            name (str): the name of the counter.
+            queue (str): the name of the queue.
+            amount (float, optional): how much to add.
+        """
+
+    def observe(self, name: str, queue: str, value: float) -> None:
+        """Record a value in a histogram, such as the duration of an operation.
+
+        Args:
+            name (str): the name of the histogram.
+            queue (str): the name of the queue.
+            value (float): the measured value.
+        """
+
+    @contextmanager
+    def timer(self, name: str, queue: str) -> Iterator[None]:
+        """Observe the duration of a block of code in seconds, also when it raises.
+
+        Args:
+            name (str): the name of the histogram.
+            queue (str): the name of the queue.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, queue, time.perf_counter() - start)
+
+
+def _count_pop(metrics: Metrics, names: Sequence[str], entries: Sequence[Any]) -> None:
+    """Count the entries a pop returned per queue, or an empty poll of every queue in `names`."""
+    if not entries:
+        for name in names:
+            metrics.increment("empty_polls", name)
+        return
+    for queue_name, popped in Counter(entry.queue_name for entry in entries).items():
+        metrics.increment("entries_popped", queue_name, popped)
+
+
+# Upper bounds of the histogram buckets in seconds, from a fast query to a long task
+_DEFAULT_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+
+class _Histogram:
+    __slots__ = ["counts", "sum", "count"]
+
+    def __init__(self, buckets: int) -> None:
+        self.counts = [0] * buckets
+        self.sum = 0.0
+        self.count = 0
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry(Metrics):
+    """Keeps all measurements in memory and renders them in the Prometheus text format.
+    Counters are exposed as `<prefix>_<name>_total` and histograms as `<prefix>_<name>`,
+    both with a `queue` label.
+
+    Attributes:
+        prefix (str): the prefix of all metric names.
+        buckets (Sequence[float]): the upper bounds of the histogram buckets, in increasing order.
+    """
+
+    def __init__(
+        self,
+        prefix: str = "alchemical_queues",
+        buckets: Sequence[float] = _DEFAULT_BUCKETS,
+    ) -> None:
+        self.prefix = prefix
+        self.buckets = sorted(buckets)
+        self._counters: Dict[Tuple[str, str], float] = {}
+        self._histograms: Dict[Tuple[str, str], _Histogram] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, queue: str, amount: float = 1.0) -> None:
+        with self._lock:
+            key = (name, queue)
+            self._counters[key] = self._counters.get(key, 0.0) + amount
+
+    def observe(self, name: str, queue: str, value: float) -> None:
+        with self._lock:
+            histogram = self._histograms.get((name, queue))
+            if histogram is None:
+                histogram = self._histograms[(name, queue)] = _Histogram(
+                    len(self.buckets)
+                )
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                histogram.counts[index] += 1
+            histogram.sum += value
+            histogram.count += 1
+
+    def counter(self, name: str, queue: str) -> float:
+        """The current value of a counter, 0 if it was never incremented."""
+        with self._lock:
+            return self._counters.get((name, queue), 0.0)
+
+    def observations(self, name: str, queue: str) -> int:
+        """The number of values recorded in a histogram."""
+        with self._lock:
+            histogram = self._histograms.get((name, queue))
+            return histogram.count if histogram is not None else 0
+
+    def render(self) -> str:
+        """All measurements in the Prometheus text exposition format.
+
+        Returns:
+            str: the metrics, one sample per line.
+        """
+        lines: List[str] = []
+
+        with self._lock:
+            for name in sorted({name for name, _ in self._counters}):
+                metric = f"{self.prefix}_{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                for (counter, queue), value in sorted(self._counters.items()):
+                    if counter == name:
+                        lines.append(f'{metric}{{queue="{_escape(queue)}"}} {value!r}')
+
+            for name in sorted({name for name, _ in self._histograms}):
+                metric = f"{self.prefix}_{name}"
+                lines.append(f"# TYPE {metric} histogram")
+                for (histogram, queue), data in sorted(
+                    self._histograms.items(), key=lambda item: item[0]
+                ):
+                    if histogram == name:
+                        lines.extend(self._render_histogram(metric, queue, data))
+
+        return "\n".join(lines) + "\n"
+
+    def _render_histogram(self, metric: str, queue: str, data: _Histogram) -> List[str]:
+        label = f'queue="{_escape(queue)}"'
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, data.counts):
+            cumulative += count
+            lines.append(f'{metric}_bucket{{{label},le="{bound!r}"}} {cumulative}')
+        lines.append(f'{metric}_bucket{{{label},le="+Inf"}} {data.count}')
+        lines.append(f"{metric}_sum{{{label}}} {data.sum!r}")
+        lines.append(f"{metric}_count{{{label}}} {data.count}")
+        return lines
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """Serve the metrics over HTTP at `/metrics`, from a daemon thread.
+
+        Args:
+            port (int): the port to listen on, 0 picks a free one.
+            host (str, optional): the address to listen on, only this machine by default.
+
+        Returns:
+            http.server.ThreadingHTTPServer: the running server, call `shutdown` on it to stop serving.
+        """
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """Answers scrapes of /metrics."""
+
+            def do_GET(self) -> None:  # pylint: disable=invalid-name
+                """Send the rendered metrics."""
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header(
+                    "Content-Type", "text/plain; version=0.0.4; charset=utf-8"
+                )
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(
+                self, *args: Any
+            ) -> None:  # pylint: disable=arguments-differ
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(
+            target=server.serve_forever, name="alchemical-metrics", daemon=True
+        ).start()
+        return server
@@ -0,0 +1,265 @@
+"""Wakeup notifiers, to let idle consumers know that new entries were put in a queue."""
+
+import os
+import select
+import socket
+import threading
+import time
+from typing import Any, Dict, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+
+class Notifier:
+    """Signals consumers waiting on a queue that new entries were put into it. Notifications are
+    a best-effort latency optimization: consumers keep polling the database as a safety net.
+
+    Attributes:
+        transactional (bool): signal with `notify_in` from within the transaction that puts the entries,
+                              instead of with `notify` after it.
+    """
+
+    transactional = False
+
+    def notify(self, queue_name: str) -> None:
+        """Signal that new entries are ready on a queue. Called after the entries were committed.
+
+        Args:
+            queue_name (str): the name of the queue.
+        """
+        raise NotImplementedError()
+
+    def notify_in(self, conn: Connection, queue_name: str) -> None:
+        """Signal that new entries are put on a queue from within the transaction that puts them,
+        so that the signal is sent when it commits. Only called on `transactional` notifiers,
+        the default calls `notify` right away.
+
+        Args:
+            conn (sqlalchemy.engine.Connection): the connection of the transaction.
+            queue_name (str): the name of the queue.
+        """
+        # pylint: disable=unused-argument
+        self.notify(queue_name)
+
+    def wait(self, queue_names: Sequence[str], timeout: float) -> bool:
+        """Block until one of the queues is notified or the timeout expires. Notifications
+        that arrived since the previous call from the same thread are not lost. Wakeups may be
+        spurious, the first call of a thread returns right away when it may have missed one.
+
+        Args:
+            queue_names (Sequence[str]): the names of the queues to wait on.
+            timeout (float): the maximum time to wait in seconds.
+
+        Returns:
+            bool: wether a notification for one of the queues was received.
+        """
+        raise NotImplementedError()
+
+    def close(self) -> None:
+        """Release the resources held by this notifier."""
+
+
+class InProcessNotifier(Notifier):
+    """Notifier for producers and consumers that run in the same process."""
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._generations: Dict[str, int] = {}
+        self._seen = threading.local()
+
+    def notify(self, queue_name: str) -> None:
+        with self._condition:
+            self._generations[queue_name] = self._generations.get(queue_name, 0) + 1
+            self._condition.notify_all()
+
+    def wait(self, queue_names: Sequence[str], timeout: float) -> bool:
+        seen: Dict[str, int] = self._seen.__dict__.setdefault("generations", {})
+
+        def notified() -> bool:
+            hit = False
+            for name in queue_names:
+                generation = self._generations.get(name, 0)
+                # A thread that never waited has seen none, so it does not miss earlier ones
+                if seen.get(name, 0) != generation:
+                    seen[name] = generation
+                    hit = True
+            return hit
+
+        with self._condition:
+            return self._condition.wait_for(notified, max(timeout, 0.0))
+
+
+class UnixSocketNotifier(Notifier):
+    """Notifier for processes on a single host, for example workers sharing a SQLite database.
+    Every waiting thread binds a Unix domain datagram socket in `directory` and `notify`
+    sends the queue name to all of them.
+
+    Attributes:
+        directory (str): the directory holding the sockets. All producers and consumers must use the same one.
+    """
+
+    def __init__(self, directory: str) -> None:
+        if not hasattr(socket, "AF_UNIX"):
+            raise RuntimeError("Unix domain sockets are not available on this platform")
+
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sender.setblocking(False)
+        self._local = threading.local()
+        self._receivers: Dict[str, socket.socket] = {}
+        self._lock = threading.Lock()
+
+    def notify(self, queue_name: str) -> None:
+        payload = queue_name.encode()
+
+        for name in os.listdir(self.directory):
+            if not name.endswith(".sock"):
+                continue
+
+            path = os.path.join(self.directory, name)
+            try:
+                self._sender.sendto(payload, path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # The owner of this socket exited without cleaning up
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+            except BlockingIOError:
+                # The receive buffer is full, so the receiver has wakeups pending anyway
+                pass
+
+    def _receiver(self) -> Tuple[socket.socket, bool]:
+        """The socket of this thread, and wether it was bound just now."""
+        pid = os.getpid()
+        receiver = getattr(self._local, "receiver", None)
+        if receiver is not None and self._local.pid == pid:
+            return receiver, False
+
+        path = os.path.join(self.directory, f"{pid}-{threading.get_ident()}.sock")
+        if os.path.exists(path):
+            os.unlink(path)
+
+        receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        receiver.setblocking(False)
+        receiver.bind(path)
+
+        self._local.receiver = receiver
+        self._local.pid = pid
+        with self._lock:
+            self._receivers[path] = receiver
+        return receiver, True
+
+    def wait(self, queue_names: Sequence[str], timeout: float) -> bool:
+        receiver, bound = self._receiver()
+        if bound:
+            # Notifications sent before the socket was bound are lost, so poll once more
+            return True
+        deadline = time.monotonic() + timeout
+
+        while True:
+            hit = False
+            while True:
+                try:
+                    payload = receiver.recv(4096)
+                except BlockingIOError:
+                    break
+                hit = hit or payload.decode() in queue_names
+
+            remaining = deadline - time.monotonic()
+            if hit or remaining <= 0:
+                return hit
+
+            select.select([receiver], [], [], remaining)
+
+    def close(self) -> None:
+        with self._lock:
+            for path, receiver in self._receivers.items():
+                receiver.close()
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+            self._receivers.clear()
+        self._sender.close()
+
+
+class PostgresNotifier(Notifier):
+    """Notifier on top of PostgreSQL `LISTEN`/`NOTIFY`, for consumers on any host. Requires the psycopg2 driver.
+    `NOTIFY` is transactional, so the queues notify from within the transactions that put entries or
+    responses, and the notifications are delivered when those commit.
+
+    Attributes:
+        channel (str): the notification channel used.
+    """
+
+    def __init__(self, engine: Engine, channel: str = "alchemical_queues") -> None:
+        if engine.dialect.name != "postgresql" or engine.driver != "psycopg2":
+            raise ValueError("PostgresNotifier requires a postgresql+psycopg2 engine")
+
+        self.channel = channel
+        self._engine = engine
+        self._local = threading.local()
+        self._listeners: Dict[int, Any] = {}
+        self._lock = threading.Lock()
+
+    transactional = True
+
+    def notify(self, queue_name: str) -> None:
+        with self._engine.begin() as conn:
+            self.notify_in(conn, queue_name)
+
+    def notify_in(self, conn: Connection, queue_name: str) -> None:
+        conn.execute(
+            text("SELECT pg_notify(:channel, :queue_name)"),
+            {"channel": self.channel, "queue_name": queue_name},
+        )
+
+    def _listener(self) -> Tuple[Any, bool]:
+        """The listening connection of this thread, and wether it started listening just now."""
+        listener = getattr(self._local, "listener", None)
+        if listener is not None:
+            return listener, False
+
+        # A dedicated connection outside of the pool, that stays in autocommit
+        # mode so notifications are delivered while it is idle.
+        raw = self._engine.raw_connection()
+        raw.detach()
+        listener = getattr(raw, "dbapi_connection", None) or getattr(raw, "connection")
+        listener.autocommit = True
+
+        quoted = self._engine.dialect.identifier_preparer.quote(self.channel)
+        with listener.cursor() as cursor:
+            cursor.execute(f"LISTEN {quoted}")
+
+        self._local.listener = listener
+        with self._lock:
+            self._listeners[threading.get_ident()] = listener
+        return listener, True
+
+    def wait(self, queue_names: Sequence[str], timeout: float) -> bool:
+        listener, started = self._listener()
+        if started:
+            # Notifications sent before LISTEN are lost, so poll once more
+            return True
+        deadline = time.monotonic() + timeout
+
+        while True:
+            listener.poll()
+            hit = False
+            while listener.notifies:
+                hit = hit or listener.notifies.pop(0).payload in queue_names
+
+            remaining = deadline - time.monotonic()
+            if hit or remaining <= 0:
+                return hit
+
+            select.select([listener], [], [], remaining)
+
+    def close(self) -> None:
+        with self._lock:
+            for listener in self._listeners.values():
+                listener.close()
+            self._listeners.clear()
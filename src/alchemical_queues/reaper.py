@@ -0,0 +1,41 @@
+"""Deleting expired rows in batches."""
+
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import bindparam, delete, Table
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql import Select
+
+from .retry import RetryPolicy
+
+
+def _reap(  # pylint: disable=R0913
+    engine: Engine,
+    expired: Select,
+    table: Table,
+    batch_size: int,
+    *,
+    retry: RetryPolicy,
+) -> int:
+    """Delete expired rows in batches of their own transaction, so locks are held briefly."""
+    (pkey,) = table.primary_key.columns
+    remove = delete(table).where(pkey.in_(bindparam("ids", expanding=True)))
+    total = 0
+
+    def batch() -> List[int]:
+        with engine.begin() as conn:
+            ids = list(
+                conn.execute(
+                    expired, {"now": datetime.now(), "limit": batch_size}
+                ).scalars()
+            )
+            if ids:
+                conn.execute(remove, {"ids": ids})
+            return ids
+
+    while True:
+        ids = retry.run(batch, engine.dialect)
+        total += len(ids)
+        if len(ids) < batch_size:
+            return total
@@ -0,0 +1,144 @@
+"""Retrying transactions that conflicted with concurrent transactions."""
+
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from sqlalchemy.engine import Dialect
+from sqlalchemy.exc import DBAPIError
+
+from .wait import ExponentialBackoff
+
+R = TypeVar("R")
+
+# Messages of SQLITE_BUSY and SQLITE_LOCKED
+_SQLITE_LOCKED = ("database is locked", "database table is locked")
+# serialization_failure and deadlock_detected
+_POSTGRES_CODES = ("40001", "40P01")
+# ER_LOCK_WAIT_TIMEOUT and ER_LOCK_DEADLOCK
+_MYSQL_CODES = (1205, 1213)
+
+
+class RetryPolicy:
+    """Runs transactions again when they failed on a conflict with a concurrent transaction:
+    "database is locked" on SQLite, serialization failures and deadlocks on PostgreSQL, lock wait
+    timeouts and deadlocks on MySQL. The failed transaction is rolled back as a whole, so it is
+    retried from the start after an exponential backoff with jitter. Other errors are raised right away.
+
+    Attributes:
+        attempts (int): the maximum number of times a transaction is run, 1 disables retrying.
+        backoff (ExponentialBackoff): a template for the delays between attempts, copied per transaction.
+        retries (int): the number of attempts that conflicted and were retried so far.
+        failures (int): the number of transactions that still conflicted after all attempts.
+    """
+
+    def __init__(
+        self,
+        attempts: int = 5,
+        backoff: Optional[ExponentialBackoff] = None,
+    ) -> None:
+        if attempts < 1:
+            raise ValueError(f"attempts={attempts} should be at least 1")
+
+        self.attempts = attempts
+        self.backoff = backoff or ExponentialBackoff(initial=0.01, maximum=0.5)
+        self.retries = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def retryable(self, error: DBAPIError, dialect: Dialect) -> bool:
+        """Whether an error is a transient conflict with another transaction.
+        Override it to retry other errors as well.
+
+        Args:
+            error (sqlalchemy.exc.DBAPIError): the error raised by the transaction.
+            dialect (sqlalchemy.engine.Dialect): the dialect of the engine that raised it.
+
+        Returns:
+            bool: whether running the transaction again may succeed.
+        """
+
+        orig: Any = error.orig
+        if dialect.name == "sqlite":
+            return any(message in str(orig) for message in _SQLITE_LOCKED)
+        if dialect.name == "postgresql":
+            code = getattr(orig, "pgcode", None) or getattr(orig, "sqlstate", None)
+            return code in _POSTGRES_CODES
+        if dialect.name in ("mysql", "mariadb"):
+            return bool(orig.args) and orig.args[0] in _MYSQL_CODES
+        return False
+
+    def _backoff(self) -> ExponentialBackoff:
+        return ExponentialBackoff(
+            self.backoff.initial,
+            self.backoff.maximum,
+            self.backoff.multiplier,
+            self.backoff.jitter,
+        )
+
+    def _retry(self, error: DBAPIError, dialect: Dialect, attempt: int) -> bool:
+        if not self.retryable(error, dialect):
+            return False
+
+        with self._lock:
+            if attempt < self.attempts:
+                self.retries += 1
+                return True
+            self.failures += 1
+            return False
+
+    def run(
+        self,
+        transaction: Callable[[], R],
+        dialect: Dialect,
+        on_retry: Optional[Callable[[], None]] = None,
+    ) -> R:
+        """Run a transaction, retrying it on conflicts.
+
+        Args:
+            transaction (Callable[[], R]): runs the whole transaction, from begin to commit.
+            dialect (sqlalchemy.engine.Dialect): the dialect of the engine it runs on.
+            on_retry (Callable[[], None] | None, optional): called before every retry.
+
+        Returns:
+            R: the return value of the transaction.
+        """
+
+        backoff = self._backoff()
+        attempt = 1
+
+        while True:
+            try:
+                return transaction()
+            except DBAPIError as e:
+                if not self._retry(e, dialect, attempt):
+                    raise
+                if on_retry is not None:
+                    on_retry()
+
+            attempt += 1
+            time.sleep(backoff.next_delay())
+
+    async def run_async(
+        self,
+        transaction: Callable[[], Awaitable[R]],
+        dialect: Dialect,
+        on_retry: Optional[Callable[[], None]] = None,
+    ) -> R:
+        """Run an asyncio transaction, retrying it on conflicts. See [run][alchemical_queues.RetryPolicy.run]."""
+
+        backoff = self._backoff()
+        attempt = 1
+
+        while True:
+            try:
+                return await transaction()
+            except DBAPIError as e:
+                if not self._retry(e, dialect, attempt):
+                    raise
+                if on_retry is not None:
+                    on_retry()
+
+            attempt += 1
+            await asyncio.sleep(backoff.next_delay())
@@ -0,0 +1,286 @@
+"""The tables of Alchemical Queues and the statements run on them."""
+
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import (
+    bindparam,
+    delete,
+    exists,
+    func,
+    insert,
+    or_,
+    select,
+    BigInteger,
+    DateTime,
+    Integer,
+    String,
+    Text,
+    Column,
+    LargeBinary,
+    MetaData,
+    Table,
+    Index,
+)
+from sqlalchemy.engine import Connection, Dialect
+
+# Upper bound on bound parameters in a single multi-row statement, safely below
+# the SQLite default of 999 for old library versions.
+_MAX_BOUND_PARAMETERS = 900
+
+
+def _supports_returning(dialect: Dialect, statement: str) -> bool:
+    # SQLAlchemy 2 exposes a flag per statement type (insert_returning,
+    # delete_returning), SQLAlchemy 1.4 only has full_returning.
+    flag = getattr(dialect, f"{statement}_returning", None)
+    if flag is None:
+        flag = getattr(dialect, "full_returning", False)
+    return bool(flag)
+
+
+def _supports_delete_returning_pop(dialect: Dialect) -> bool:
+    # MariaDB has DELETE ... RETURNING but refuses LIMIT inside an IN subquery.
+    return dialect.name in ("postgresql", "sqlite") and _supports_returning(
+        dialect, "delete"
+    )
+
+
+def _insert_many(
+    conn: Connection, table: Table, rows: List[Dict[str, Any]]
+) -> List[int]:
+    """Insert rows in as few statements as possible, returning the primary keys in row order."""
+    (pkey,) = table.primary_key.columns
+
+    if not (
+        conn.dialect.supports_multivalues_insert
+        and _supports_returning(conn.dialect, "insert")
+    ):
+        return [
+            conn.execute(insert(table), row).inserted_primary_key[0] for row in rows
+        ]
+
+    ids: List[int] = []
+    chunk_size = max(1, _MAX_BOUND_PARAMETERS // len(rows[0]))
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start : start + chunk_size]
+        result = conn.execute(insert(table).values(chunk).returning(pkey))
+        # RETURNING does not promise row order, but the autoincrement values
+        # of a single multi-row INSERT are handed out in VALUES order.
+        ids.extend(sorted(result.scalars()))
+    return ids
+
+
+def generate_tables(
+    queue_tablename: str, response_tablename: str
+) -> Tuple[MetaData, Table, Table, Table, Table]:
+    """Define the queue, response, claim check blob and timing wheel tables.
+
+    Args:
+        queue_tablename (str): the name of the queue table, the blob and timing wheel table names are derived from it.
+        response_tablename (str): the name of the response table.
+
+    Returns:
+        Tuple[MetaData, Table, Table, Table, Table]: the metadata holding the tables, and the queue, response,
+                                                     blob and timing wheel table.
+    """
+    metadata = MetaData()
+
+    entries = Table(
+        queue_tablename,
+        metadata,
+        Column(
+            "entry_id", Integer, primary_key=True, nullable=False, autoincrement=True
+        ),
+        Column("queue_name", Text, nullable=False),
+        Column("enqueued_at", DateTime(timezone=True), nullable=False),
+        Column("schedule_at", DateTime(timezone=True), nullable=True),
+        # schedule_at if set, enqueued_at otherwise, so get() can range scan on it
+        Column("ready_at", DateTime(timezone=True), nullable=False),
+        Column("priority", Integer, nullable=False),
+        Column("data", LargeBinary),
+        # set instead of data for payloads stored by a ClaimCheck
+        Column("blob_key", Text, nullable=True),
+    )
+    Index(
+        f"ix_{queue_tablename}_pop",
+        entries.c.queue_name,
+        entries.c.priority.desc(),
+        entries.c.ready_at,
+        entries.c.entry_id,
+    )
+    _blob_key_index(entries)
+
+    responses = Table(
+        response_tablename,
+        metadata,
+        Column(
+            "response_id", Integer, primary_key=True, nullable=False, autoincrement=True
+        ),
+        Column("queue_name", Text, nullable=False),
+        Column("entry_id", Integer, nullable=False),
+        Column("delivered_at", DateTime(timezone=True), nullable=False),
+        Column("cleanup_at", DateTime(timezone=True), nullable=True, index=True),
+        Column("data", LargeBinary),
+        Column("blob_key", Text, nullable=True),
+    )
+
+    Index(
+        f"ix_{response_tablename}_lookup",
+        responses.c.queue_name,
+        responses.c.entry_id,
+    )
+    _blob_key_index(responses)
+
+    blobs = Table(
+        f"{queue_tablename}Blob",
+        metadata,
+        Column("blob_key", String(64), primary_key=True, nullable=False),
+        Column("stored_at", DateTime(timezone=True), nullable=False),
+        Column("data", LargeBinary, nullable=False),
+    )
+
+    # Entries scheduled far ahead, until they are promoted to the queue table
+    delayed = Table(
+        f"{queue_tablename}Delayed",
+        metadata,
+        Column(
+            "delayed_id", Integer, primary_key=True, nullable=False, autoincrement=True
+        ),
+        Column("queue_name", Text, nullable=False),
+        # ready_at divided into the slots of the TimingWheel
+        Column("slot", BigInteger, nullable=False),
+        Column("enqueued_at", DateTime(timezone=True), nullable=False),
+        Column("schedule_at", DateTime(timezone=True), nullable=True),
+        Column("ready_at", DateTime(timezone=True), nullable=False),
+        Column("priority", Integer, nullable=False),
+        Column("data", LargeBinary),
+        Column("blob_key", Text, nullable=True),
+        # Entries keep their delayed_id as entry id after promotion, so ids must never be
+        # reused once the table is empty again, which SQLite does without AUTOINCREMENT.
+        sqlite_autoincrement=True,
+    )
+    Index(f"ix_{queue_tablename}Delayed_slot", delayed.c.queue_name, delayed.c.slot)
+    _blob_key_index(delayed)
+
+    return metadata, entries, responses, blobs, delayed
+
+
+def _blob_key_index(table: Table) -> Index:
+    """Index the claim-checked rows, so collect_blobs finds the referenced payloads without a table scan.
+    Partial where supported, as most rows hold their payload themselves."""
+    referenced = table.c.blob_key != None  # pylint: disable=C0121
+    return Index(
+        f"ix_{table.name}_blob_key",
+        table.c.blob_key,
+        postgresql_where=referenced,
+        sqlite_where=referenced,
+    )
+
+
+def add_column(conn: Connection, table: Table, column: Column) -> None:
+    """Add a column to an existing table."""
+    preparer = conn.dialect.identifier_preparer
+    conn.exec_driver_sql(
+        f"ALTER TABLE {preparer.format_table(table)} "
+        f"ADD COLUMN {preparer.format_column(column)} "
+        f"{column.type.compile(dialect=conn.dialect)}"
+    )
+
+
+class _Statements:  # pylint: disable=R0902
+    """The Core statements of a single queue. They are built once and per-call values are
+    passed as bound parameters, so SQLAlchemy can reuse the compiled form from its cache.
+    """
+
+    def __init__(
+        self, table: Table, response_table: Table, delayed_table: Table, name: str
+    ) -> None:
+        qt, rt, dt = table.c, response_table.c, delayed_table.c
+        self.ready = (
+            select(table)
+            .with_for_update(skip_locked=True)
+            .where(qt.queue_name == name, qt.ready_at <= bindparam("now"))
+            .order_by(qt.priority.desc(), qt.ready_at.asc(), qt.entry_id.asc())
+            .limit(bindparam("limit", type_=Integer))
+        )
+
+        self.insert = insert(table)
+        self.delete_ids = delete(table).where(
+            qt.entry_id.in_(bindparam("entry_ids", expanding=True))
+        )
+        self.pop = (
+            delete(table)
+            .where(qt.entry_id.in_(self.ready.with_only_columns(qt.entry_id)))
+            .returning(*table.c)
+        )
+        self.count = (
+            select(func.count()).select_from(table).where(qt.queue_name == name)
+        )
+        # The bare rows of the queue, for the planner to estimate how many there are
+        self.entries = select(qt.entry_id).where(qt.queue_name == name)
+        self.any = select(exists().where(qt.queue_name == name))
+        self.next_ready = select(func.min(qt.ready_at)).where(qt.queue_name == name)
+        self.clear = delete(table).where(qt.queue_name == name)
+        self.respond = insert(response_table)
+        live_responses = select(response_table).where(
+            rt.queue_name == name,
+            or_(
+                rt.cleanup_at == None,  # pylint: disable=C0121
+                rt.cleanup_at >= bindparam("now"),
+            ),
+        )
+        self.responses = live_responses.where(
+            rt.entry_id == bindparam("entry_id")
+        ).order_by(rt.response_id)
+        self.first_response = self.responses.limit(1)
+        self.responses_in = live_responses.where(
+            rt.entry_id.in_(bindparam("entry_ids", expanding=True))
+        ).order_by(rt.response_id)
+        self.expired = (
+            select(rt.response_id)
+            .where(rt.queue_name == name, rt.cleanup_at < bindparam("now"))
+            .limit(bindparam("limit", type_=Integer))
+        )
+
+        self.delayed_count = (
+            select(func.count()).select_from(delayed_table).where(dt.queue_name == name)
+        )
+        self.delayed_entries = select(dt.delayed_id).where(dt.queue_name == name)
+        self.any_or_delayed = select(
+            or_(
+                exists().where(qt.queue_name == name),
+                exists().where(dt.queue_name == name),
+            )
+        )
+        self.delayed_clear = delete(delayed_table).where(dt.queue_name == name)
+        self.delayed_due = (
+            select(dt.delayed_id)
+            .with_for_update(skip_locked=True)
+            .where(dt.queue_name == name, dt.slot <= bindparam("slot"))
+            .order_by(dt.slot)
+            .limit(bindparam("limit", type_=Integer))
+        )
+        delayed_ids = dt.delayed_id.in_(bindparam("delayed_ids", expanding=True))
+        # Promoted entries keep the negative entry id they got when they were put
+        self.promote = insert(table).from_select(
+            [
+                qt.entry_id,
+                qt.queue_name,
+                qt.enqueued_at,
+                qt.schedule_at,
+                qt.ready_at,
+                qt.priority,
+                qt.data,
+                qt.blob_key,
+            ],
+            select(
+                -dt.delayed_id,
+                dt.queue_name,
+                dt.enqueued_at,
+                dt.schedule_at,
+                dt.ready_at,
+                dt.priority,
+                dt.data,
+                dt.blob_key,
+            ).where(delayed_ids),
+        )
+        self.delayed_delete = delete(delayed_table).where(delayed_ids)
@@ -0,0 +1,235 @@
+"""Serializers, turning queue entries and responses into the bytes stored in the database."""
+
+import json
+import pickle
+import struct
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Tuple, cast
+
+
+class Serializer:
+    """Converts items to bytes and back. Producers and consumers of a queue must use the same serializer."""
+
+    def dumps(self, obj: Any) -> bytes:
+        """Serialize an item.
+
+        Args:
+            obj (Any): the item.
+
+        Returns:
+            bytes: the serialized item.
+        """
+        raise NotImplementedError()
+
+    def loads(self, data: bytes) -> Any:
+        """Deserialize an item.
+
+        Args:
+            data (bytes): the serialized item.
+
+        Returns:
+            Any: the item.
+        """
+        raise NotImplementedError()
+
+
+class PickleSerializer(Serializer):
+    """Serialize with pickle, the default. Can handle nearly any Python object.
+
+    Attributes:
+        protocol (int): the pickle protocol used for writing.
+    """
+
+    def __init__(self, protocol: int = pickle.HIGHEST_PROTOCOL) -> None:
+        self.protocol = protocol
+
+    def dumps(self, obj: Any) -> bytes:
+        return pickle.dumps(obj, protocol=self.protocol)
+
+    def loads(self, data: bytes) -> Any:
+        return pickle.loads(data)
+
+
+class PickleBufferSerializer(Serializer):
+    """Serialize with pickle protocol 5 and out-of-band buffers, for large binary data such as NumPy arrays.
+    The buffers are copied once, straight into the payload, instead of through the pickle stream. When
+    deserializing, objects are rebuilt over views of the fetched payload without copying, so NumPy
+    arrays come back read-only. Objects that do not support out-of-band pickling, notably `bytes`,
+    are pickled as usual: wrap them in a `pickle.PickleBuffer` to get a `memoryview` back instead.
+    Requires Python 3.8 or newer.
+    """
+
+    # Payload layout: number of buffers, the offset and length of the pickle stream and of every buffer,
+    # followed by the parts. Every part starts at a multiple of _ALIGNMENT from the start of the payload,
+    # so that arrays rebuilt over it are aligned for their element type.
+    _COUNT = struct.Struct("<I")
+    _PART = struct.Struct("<QQ")
+    _ALIGNMENT = 64
+
+    def __init__(self) -> None:
+        if pickle.HIGHEST_PROTOCOL < 5:
+            raise RuntimeError("PickleBufferSerializer requires pickle protocol 5")
+
+    def dumps(self, obj: Any) -> bytes:
+        buffers: List[memoryview] = []
+        stream = pickle.dumps(
+            obj,
+            protocol=5,
+            buffer_callback=lambda buffer: buffers.append(buffer.raw()),  # type: ignore
+        )
+
+        parts = [memoryview(stream)] + buffers
+        offsets = []
+        end = self._COUNT.size + self._PART.size * len(parts)
+        for part in parts:
+            offset = -(-end // self._ALIGNMENT) * self._ALIGNMENT
+            offsets.append(offset)
+            end = offset + part.nbytes
+
+        payload = bytearray(end)
+        view = memoryview(payload)
+        self._COUNT.pack_into(payload, 0, len(buffers))
+        for i, (part, offset) in enumerate(zip(parts, offsets)):
+            self._PART.pack_into(
+                payload, self._COUNT.size + self._PART.size * i, offset, part.nbytes
+            )
+            view[offset : offset + part.nbytes] = part
+
+        return payload  # type: ignore
+
+    def loads(self, data: bytes) -> Any:
+        view = memoryview(data)
+        (count,) = self._COUNT.unpack_from(view, 0)
+
+        parts = []
+        for i in range(count + 1):
+            offset, length = self._PART.unpack_from(
+                view, self._COUNT.size + self._PART.size * i
+            )
+            parts.append(view[offset : offset + length])
+
+        return pickle.loads(parts[0], buffers=parts[1:])  # type: ignore
+
+
+class JSONSerializer(Serializer):
+    """Serialize as compact UTF-8 JSON. Only handles what `json` does: tuples come back as lists."""
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(bytes(data))
+
+
+class MsgpackSerializer(Serializer):
+    """Serialize with MessagePack, a compact binary form of JSON. Requires the msgpack package."""
+
+    def __init__(self) -> None:
+        try:
+            import msgpack  # type: ignore # pylint: disable=import-outside-toplevel
+        except ImportError as e:
+            raise RuntimeError("MsgpackSerializer requires the msgpack package") from e
+
+        self._msgpack = msgpack
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._msgpack.packb(obj, use_bin_type=True)  # type: ignore
+
+    def loads(self, data: bytes) -> Any:
+        return self._msgpack.unpackb(data, raw=False)
+
+
+_Compress = Callable[[bytes, Optional[int]], bytes]
+_Decompress = Callable[[bytes], bytes]
+
+# Stored in front of every payload, so these numbers must never change
+_HEADERS = {"zlib": 1, "lz4": 2, "zstd": 3}
+_RAW = 0
+
+
+def _load_codec(codec: str) -> Tuple[_Compress, _Decompress]:
+    # lz4 and zstandard are optional, so they are imported on first use
+    # pylint: disable=import-outside-toplevel
+    if codec == "zlib":
+
+        def compress(data: bytes, level: Optional[int]) -> bytes:
+            return zlib.compress(data, -1 if level is None else level)
+
+        return compress, zlib.decompress
+
+    try:
+        if codec == "lz4":
+            import lz4.frame  # type: ignore
+
+            def compress_lz4(data: bytes, level: Optional[int]) -> bytes:
+                return cast(bytes, lz4.frame.compress(data, level or 0))
+
+            return compress_lz4, lz4.frame.decompress
+
+        import zstandard  # type: ignore
+
+        def compress_zstd(data: bytes, level: Optional[int]) -> bytes:
+            return cast(bytes, zstandard.ZstdCompressor(level or 3).compress(data))
+
+        def decompress_zstd(data: bytes) -> bytes:
+            return cast(bytes, zstandard.ZstdDecompressor().decompress(data))
+
+        return compress_zstd, decompress_zstd
+    except ImportError as e:
+        raise RuntimeError(f"The {codec} codec is not installed") from e
+
+
+class CompressedSerializer(Serializer):
+    """Compress the output of another serializer when it is larger than a threshold. A header byte
+    records the codec of every payload, so payloads written with other codecs or thresholds stay readable.
+
+    Attributes:
+        serializer (Serializer): the serializer that is wrapped.
+        codec (str): `"zlib"`, `"lz4"` (requires the lz4 package) or `"zstd"` (requires the zstandard package).
+        threshold (int): payloads of fewer bytes are stored uncompressed.
+        level (int | None): the compression level, None for the default of the codec.
+    """
+
+    def __init__(
+        self,
+        serializer: Serializer,
+        codec: str = "zlib",
+        threshold: int = 1024,
+        level: Optional[int] = None,
+    ) -> None:
+        if codec not in _HEADERS:
+            raise ValueError(f"codec={codec} should be one of {', '.join(_HEADERS)}")
+
+        self.serializer = serializer
+        self.codec = codec
+        self.threshold = threshold
+        self.level = level
+        self._header = _HEADERS[codec]
+        self._compress = _load_codec(codec)[0]
+        self._decompress: Dict[int, _Decompress] = {}
+
+    def dumps(self, obj: Any) -> bytes:
+        data = self.serializer.dumps(obj)
+
+        if len(data) >= self.threshold:
+            compressed = self._compress(data, self.level)
+            if len(compressed) < len(data):
+                return bytes((self._header,)) + compressed
+
+        return bytes((_RAW,)) + data
+
+    def _decompressor(self, header: int) -> _Decompress:
+        if header not in self._decompress:
+            for codec, codec_header in _HEADERS.items():
+                if codec_header == header:
+                    self._decompress[header] = _load_codec(codec)[1]
+                    break
+            else:
+                raise ValueError(f"Unknown compression header {header}")
+
+        return self._decompress[header]
+
+    def loads(self, data: bytes) -> Any:
+        if data[0] == _RAW:
+            return self.serializer.loads(data[1:])
+        return self.serializer.loads(self._decompressor(data[0])(data[1:]))
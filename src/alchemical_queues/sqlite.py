@@ -0,0 +1,90 @@
+"""Connection settings that let SQLite handle concurrent producers and consumers."""
+
+from contextlib import contextmanager
+from typing import Any, Iterator, TypeVar, Union
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# Execution option marking the connections of Alchemical Queues, holding how their transactions
+# begin on SQLite: DEFERRED, or IMMEDIATE to take the write lock up front
+_BEGIN = "alchemical_queues_begin"
+
+E = TypeVar("E", Engine, AsyncEngine)
+
+
+def _own_engine(engine: E) -> E:
+    """The engine that Alchemical Queues connects through, sharing the connection pool of `engine`."""
+    if engine.get_execution_options().get(_BEGIN):
+        return engine
+    return engine.execution_options(**{_BEGIN: "DEFERRED"})
+
+
+def _begin_sqlite(conn: Connection) -> None:
+    # Neither sqlite driver emits BEGIN itself before the first write. Pops read the entries
+    # they are about to delete, so they take the write lock right away: upgrading a read lock
+    # later fails when another pop got in between. Everything else begins deferred, so reads
+    # do not block writers. Transactions of other users of the engine are left to the driver.
+    mode = conn.get_execution_options().get(_BEGIN)
+    if mode is not None:
+        conn.exec_driver_sql(f"BEGIN {mode}")
+
+
+@contextmanager
+def _immediate_transaction(engine: Engine) -> Iterator[Connection]:
+    """A transaction that locks SQLite for writing from the start, plain on other databases."""
+    with engine.connect() as conn:
+        conn = conn.execution_options(**{_BEGIN: "IMMEDIATE"})
+        with conn.begin():
+            yield conn
+
+
+_JOURNAL_MODES = ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF")
+
+
+def configure_sqlite(
+    engine: Union[Engine, AsyncEngine],
+    journal_mode: str = "WAL",
+    busy_timeout: float = 5.0,
+) -> None:
+    """Configure every new connection of a SQLite engine for use by many processes. In WAL mode
+    readers and the writer no longer block each other, and with a busy timeout a connection
+    waits for the write lock instead of failing with "database is locked" right away.
+
+    Call it right after creating the engine, connections that are already open are left as is.
+    The journal mode is stored in the database file, so it does not apply to in-memory databases.
+
+    Args:
+        engine (sqlalchemy.engine.Engine | sqlalchemy.ext.asyncio.AsyncEngine): A SQLite engine.
+        journal_mode (str, optional): The journal mode, see the SQLite `PRAGMA journal_mode` documentation.
+        busy_timeout (float, optional): Seconds to wait for a lock before giving up.
+
+    Raises:
+        ValueError: when the engine is not a SQLite engine or the journal mode is unknown.
+    """
+
+    sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+    if sync_engine.dialect.name != "sqlite":
+        raise ValueError(
+            f"configure_sqlite needs a SQLite engine, not {sync_engine.dialect.name}"
+        )
+    if journal_mode.upper() not in _JOURNAL_MODES:
+        raise ValueError(
+            f"journal_mode={journal_mode} should be one of {', '.join(_JOURNAL_MODES)}"
+        )
+
+    pragmas = (
+        f"PRAGMA journal_mode={journal_mode.upper()}",
+        f"PRAGMA busy_timeout={int(busy_timeout * 1000)}",
+    )
+
+    @event.listens_for(sync_engine, "connect")
+    def configure(dbapi_connection: Any, connection_record: Any) -> None:
+        # pylint: disable=unused-argument
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
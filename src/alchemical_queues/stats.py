@@ -0,0 +1,115 @@
+"""Statistics of the queues, for monitoring them without counting every queue on its own."""
+
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import case, func, select, Integer, Table
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import Select
+
+from .wait import _comparable
+
+
+class QueueStatistics:
+    """A snapshot of a queue, returned by [AlchemicalQueues.stats][alchemical_queues.AlchemicalQueues.stats].
+
+    Attributes:
+        name (str): the name of the queue.
+        ready (int): the number of entries that can be popped now.
+        scheduled (int): the number of entries scheduled for later, including those in the timing wheel.
+        max_priority (int | None): the highest priority of the ready entries, None when there are none.
+        oldest_ready_age (timedelta | None): how long the longest waiting ready entry has been ready,
+                                             None when there are no ready entries.
+    """
+
+    __slots__ = ("name", "ready", "scheduled", "max_priority", "oldest_ready_age")
+
+    def __init__(
+        self,
+        name: str,
+        ready: int = 0,
+        scheduled: int = 0,
+        max_priority: Optional[int] = None,
+        oldest_ready_age: Optional[timedelta] = None,
+    ) -> None:
+        self.name = name
+        self.ready = ready
+        self.scheduled = scheduled
+        self.max_priority = max_priority
+        self.oldest_ready_age = oldest_ready_age
+
+    @property
+    def size(self) -> int:
+        """The number of entries in the queue, ready or not."""
+        return self.ready + self.scheduled
+
+    def __repr__(self) -> str:
+        return (
+            f"QueueStatistics(name={self.name!r}, ready={self.ready}, scheduled={self.scheduled}, "
+            f"max_priority={self.max_priority}, oldest_ready_age={self.oldest_ready_age})"
+        )
+
+
+def _statistics(
+    conn: Connection,
+    table: Table,
+    delayed_table: Table,
+    names: Optional[List[str]],
+) -> Dict[str, QueueStatistics]:
+    """Gather the statistics of all queues, or only of `names`, with a single GROUP BY per table."""
+    now = datetime.now()
+    qt = table.c
+    ready = qt.ready_at <= now
+    query = select(
+        qt.queue_name,
+        func.sum(case((ready, 1), else_=0), type_=Integer),
+        func.sum(case((ready, 0), else_=1), type_=Integer),
+        func.max(case((ready, qt.priority))),
+        func.min(case((ready, qt.ready_at))),
+    ).group_by(qt.queue_name)
+
+    stats: Dict[str, QueueStatistics] = {}
+    if names is not None:
+        stats = {name: QueueStatistics(name) for name in names}
+        query = query.where(qt.queue_name.in_(names))
+
+    for name, n_ready, n_scheduled, max_priority, oldest in conn.execute(query):
+        age = None if oldest is None else _comparable(now, oldest) - oldest
+        stats[name] = QueueStatistics(
+            name, int(n_ready or 0), int(n_scheduled or 0), max_priority, age
+        )
+
+    _count_delayed(conn, delayed_table, names, stats)
+    return stats
+
+
+def _count_delayed(
+    conn: Connection,
+    delayed_table: Table,
+    names: Optional[List[str]],
+    stats: Dict[str, QueueStatistics],
+) -> None:
+    dt = delayed_table.c
+    query = select(dt.queue_name, func.count()).group_by(dt.queue_name)
+    if names is not None:
+        query = query.where(dt.queue_name.in_(names))
+
+    for name, n_delayed in conn.execute(query):
+        stats.setdefault(name, QueueStatistics(name)).scheduled += n_delayed
+
+
+def _estimate_rows(conn: Connection, query: Select) -> int:
+    """The number of rows a query returns according to the PostgreSQL planner statistics."""
+    compiled = query.compile(
+        dialect=conn.dialect, compile_kwargs={"literal_binds": True}
+    )
+    plan: Any = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}").scalar()
+    return _plan_rows(plan)
+
+
+def _plan_rows(plan: Any) -> int:
+    # Drivers return the json column either parsed or as text
+    if isinstance(plan, (str, bytes)):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
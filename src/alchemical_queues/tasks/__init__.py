@@ -1,3 +1,14 @@
 """Alchemical Queues, tasks: queue tasks and execute them in a background worker without needing a broker like Redis or RabbitMQ."""
 
-from .main import task, Worker, Task, QueuedTask, TaskInfo, TaskException
+from .main import (
+    task,
+    Worker,
+    Task,
+    QueuedTask,
+    AsyncQueuedTask,
+    TaskInfo,
+    TaskException,
+    QueueStats,
+    gather,
+)
+from .supervisor import Supervisor
@@ -1,28 +1,214 @@
 """The command line interface `alchemical_worker`. """
 import argparse
+import importlib
+import sys
+import time
 from datetime import timedelta
+from logging import getLogger
+from typing import List, Optional, Tuple, Union
 from sqlalchemy.engine import create_engine
-from alchemical_queues import AlchemicalQueues
-from alchemical_queues.tasks import Worker
+from alchemical_queues import (
+    AlchemicalQueues,
+    AlchemicalQueue,
+    AlchemicalQueueGroup,
+    MetricsRegistry,
+)
+from alchemical_queues.tasks import Worker, Supervisor
+
+
+def _weight(value: str) -> Tuple[str, float]:
+    name, _, weight = value.rpartition("=")
+    try:
+        if name and float(weight) > 0:
+            return name, float(weight)
+    except ValueError:
+        pass
+    raise argparse.ArgumentTypeError(
+        f"{value} should be QUEUE=WEIGHT with a positive weight"
+    )
 
 
-parser = argparse.ArgumentParser()
-parser.add_argument("engine", type=str, help="The name of the queue to work on.")
-parser.add_argument("queue_name", type=str, help="The name of the queue to work on.")
-parser.add_argument(
+parser = argparse.ArgumentParser(
+    prog="alchemical_worker",
+    description="Without a command, `work` is assumed.",
+)
+commands = parser.add_subparsers(dest="command", metavar="{work,reap}")
+
+work_parser = commands.add_parser("work", help="Run the tasks of queues.")
+work_parser.add_argument("engine", type=str, help="The SQLAlchemy engine URL.")
+work_parser.add_argument(
+    "queue_names",
+    metavar="queue_name",
+    type=str,
+    nargs="+",
+    help="The names of the queues to work on, in order of precedence.",
+)
+work_parser.add_argument(
     "-p",
     "--poll-every",
     type=float,
     help="How often to poll for new tasks.",
     default=1.0,
 )
+work_parser.add_argument(
+    "-c",
+    "--concurrency",
+    type=int,
+    help="How many tasks to run at the same time.",
+    default=1,
+)
+work_parser.add_argument(
+    "--pool",
+    choices=["thread", "process"],
+    help="Run concurrent tasks in a thread pool or a process pool.",
+    default="thread",
+)
+work_parser.add_argument(
+    "--processes",
+    type=int,
+    help="Run this many worker processes under a supervisor, forked from a single parent.",
+    default=None,
+)
+work_parser.add_argument(
+    "-i",
+    "--import",
+    dest="preload",
+    action="append",
+    help="Import a module before starting workers, may be given multiple times.",
+    default=[],
+)
+work_parser.add_argument(
+    "--max-tasks-per-child",
+    type=int,
+    help="Restart a worker process after it completed this many tasks.",
+    default=None,
+)
+work_parser.add_argument(
+    "--max-memory-per-child",
+    type=int,
+    help="Restart a worker process once its peak resident memory exceeds this many KiB.",
+    default=None,
+)
+work_parser.add_argument(
+    "--reap-every",
+    type=float,
+    help="Delete expired responses of the queue every this many seconds.",
+    default=None,
+)
+work_parser.add_argument(
+    "-w",
+    "--weight",
+    dest="weights",
+    type=_weight,
+    action="append",
+    help="Serve multiple queues by weight instead of in order of precedence, "
+    "given as QUEUE=WEIGHT. Queues without a weight have weight 1.",
+    default=[],
+)
+work_parser.add_argument(
+    "--metrics-port",
+    type=int,
+    help="Serve metrics in the Prometheus text format on this port of localhost, at /metrics.",
+    default=None,
+)
 
+reap_parser = commands.add_parser(
+    "reap",
+    help="Delete expired responses.",
+    description="Delete the responses of all queues that are past their cleanup time.",
+)
+reap_parser.add_argument("engine", type=str, help="The SQLAlchemy engine URL.")
+reap_parser.add_argument(
+    "-b",
+    "--batch-size",
+    type=int,
+    help="How many responses to delete per transaction.",
+    default=500,
+)
+reap_parser.add_argument(
+    "-e",
+    "--every",
+    type=float,
+    help="Keep reaping every this many seconds, instead of once.",
+    default=None,
+)
+
+
+def _queue(
+    queues: AlchemicalQueues, namespace: argparse.Namespace
+) -> Union[AlchemicalQueue, AlchemicalQueueGroup]:
+    if len(namespace.queue_names) == 1 and not namespace.weights:
+        return queues.get(namespace.queue_names[0])
+
+    return AlchemicalQueueGroup(
+        [queues.get(name) for name in namespace.queue_names],
+        weights=dict(namespace.weights) if namespace.weights else None,
+    )
 
-def cli():
-    """The command line tool `alchemical_worker` runs this function."""
-    namespace = parser.parse_args()
 
+def _worker(queues: AlchemicalQueues, namespace: argparse.Namespace) -> Worker:
+    return Worker(
+        _queue(queues, namespace),
+        timedelta(seconds=namespace.poll_every),
+        concurrency=namespace.concurrency,
+        executor=namespace.pool,
+        max_tasks=namespace.max_tasks_per_child,
+        max_memory=namespace.max_memory_per_child,
+        reap_every=(
+            None
+            if namespace.reap_every is None
+            else timedelta(seconds=namespace.reap_every)
+        ),
+    )
+
+
+def reap(namespace: argparse.Namespace) -> None:
+    """The command `alchemical_worker reap` runs this function."""
+    logger = getLogger("alchemical_queues.tasks")
     queues = AlchemicalQueues(create_engine(namespace.engine))
+
+    while True:
+        reaped = queues.reap(namespace.batch_size)
+        logger.info("Reaped %d expired responses.", reaped)
+
+        if namespace.every is None:
+            return
+        time.sleep(namespace.every)
+
+
+def cli(args: Optional[List[str]] = None):
+    """The command line tool `alchemical_worker` runs this function."""
+    args = sys.argv[1:] if args is None else args
+    # `alchemical_worker ENGINE QUEUE` keeps working without the `work` command
+    if args and args[0] not in commands.choices and args[0] not in ("-h", "--help"):
+        args = ["work", *args]
+
+    namespace = parser.parse_args(args)
+    if namespace.command == "reap":
+        reap(namespace)
+        return
+    if namespace.command is None:
+        parser.error("the engine and queue names are required")
+    if namespace.metrics_port is not None and namespace.processes is not None:
+        work_parser.error("--metrics-port can not be combined with --processes")
+
+    metrics = None
+    if namespace.metrics_port is not None:
+        metrics = MetricsRegistry()
+        metrics.serve(namespace.metrics_port)
+
+    queues = AlchemicalQueues(create_engine(namespace.engine), metrics=metrics)
     queues.create_all()
-    queue = queues.get(namespace.queue_name)
-    Worker(queue, timedelta(seconds=namespace.poll_every)).work()
+
+    if namespace.processes is None:
+        for module in namespace.preload:
+            importlib.import_module(module)
+        _worker(queues, namespace).work()
+        return
+
+    def make_worker() -> Worker:
+        # Every child needs its own engine, pooled connections can not cross a fork
+        child_queues = AlchemicalQueues(create_engine(namespace.engine))
+        return _worker(child_queues, namespace)
+
+    Supervisor(make_worker, namespace.processes, preload=namespace.preload).run()
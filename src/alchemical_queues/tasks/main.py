@@ -1,12 +1,33 @@
 """Implementation of the Alchemical Task Queues"""
 
+import asyncio
+import sys
+import threading
 import time
+from concurrent import futures
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
 from logging import getLogger
 from pydoc import locate
-from typing import Callable, TypeVar, Union, Generic, Dict, cast, Any, NoReturn
-from typing_extensions import ParamSpec, Concatenate
-from ..main import AlchemicalQueue, AlchemicalEntry
+from typing import (
+    Callable,
+    TypeVar,
+    Union,
+    Generic,
+    Dict,
+    cast,
+    Any,
+    Optional,
+    Iterable,
+    List,
+    Tuple,
+)
+from typing_extensions import ParamSpec, Concatenate, Literal
+from ..main import AlchemicalQueue, AlchemicalEntry, AlchemicalResponse
+from ..aio import AsyncAlchemicalQueue
+from ..group import AlchemicalQueueGroup
+from ..metrics import Metrics
+from ..wait import WaitStrategy, ExponentialBackoff, _seconds_until
 
 
 class TaskInfo:
@@ -20,33 +41,123 @@ class TaskInfo:
         self.max_retries = max_retries
 
 
+class QueueStats:
+    """The tasks a [Worker][alchemical_queues.tasks.Worker] ran from a single queue.
+
+    Attributes:
+        completed (int): tasks that ran successfully.
+        failed (int): tasks that failed for good.
+        retried (int): failed tasks that were put back on the queue to be tried again.
+    """
+
+    __slots__ = ["completed", "failed", "retried", "_started"]
+
+    def __init__(self) -> None:
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+        self._started = time.monotonic()
+
+    @property
+    def throughput(self) -> float:
+        """Tasks run per second, successful or not, since the worker was created."""
+        elapsed = time.monotonic() - self._started
+        finished = self.completed + self.failed + self.retried
+        return finished / elapsed if elapsed > 0 else 0.0
+
+
 Param = ParamSpec("Param")
 RValue = TypeVar("RValue")
 
 
-class Worker:
+def _run_handler(
+    function_path: str, info: TaskInfo, args: tuple, kwargs: Dict[str, Any]
+) -> Any:
+    # Runs in pool processes, which look up the handler by its import path
+    tasker = cast("Tasker", locate(function_path))
+    return tasker.get_handler()(info, *args, **kwargs)
+
+
+class Worker:  # pylint: disable=R0902
     """Worker implementation that can take tasks from queues and execute them.
 
     Attributes:
-        queue (AlchemicalQueue): the queue this worker runs on
-        poll_every (timedelta): how often to poll for new tasks
+        queue (AlchemicalQueue | AlchemicalQueueGroup): the queue this worker runs on. Pass an
+                                                        [AlchemicalQueueGroup][alchemical_queues.AlchemicalQueueGroup]
+                                                        to serve many queues with a single worker.
+        poll_every (timedelta): the longest time between two polls for new tasks
+        wait (WaitStrategy): how long to wait between polls of an empty queue. By default
+                             the worker backs off exponentially up to `poll_every`. While only
+                             scheduled tasks are waiting, the worker instead sleeps until the
+                             first one is due, for at most `poll_every`.
+        concurrency (int): the maximum number of tasks `work` runs at the same time.
+        executor (str): run concurrent tasks in a pool of `"thread"`s or `"process"`es.
+        max_tasks (int | None): stop working after completing this many tasks.
+        max_memory (int | None): stop working once the peak resident memory of the process exceeds this many KiB.
+        reap_every (timedelta | None): delete expired responses of the queue this often, in a background thread.
+        completed (int): the number of tasks completed so far.
+        stats (Dict[str, QueueStats]): the tasks run so far per queue name.
+        metrics (Metrics): receives the outcome and duration of every task, the metrics of the queue by default.
     """
 
-    def __init__(
-        self, queue: AlchemicalQueue, poll_every: timedelta = timedelta(seconds=1)
+    def __init__(  # pylint: disable=R0913
+        self,
+        queue: Union[AlchemicalQueue, AlchemicalQueueGroup],
+        poll_every: timedelta = timedelta(seconds=1),
+        wait: Optional[WaitStrategy] = None,
+        concurrency: int = 1,
+        executor: Literal["thread", "process"] = "thread",
+        *,
+        max_tasks: Optional[int] = None,
+        max_memory: Optional[int] = None,
+        reap_every: Optional[timedelta] = None,
+        metrics: Optional[Metrics] = None,
     ):
+        if concurrency < 1:
+            raise ValueError(f"concurrency={concurrency} should be at least 1")
+        if executor not in ("thread", "process"):
+            raise ValueError(f"executor={executor} should be 'thread' or 'process'")
+
         self.queue = queue
         self.poll_every: timedelta = poll_every
+        self.wait: WaitStrategy = wait or ExponentialBackoff(
+            maximum=poll_every.total_seconds()
+        )
+        self.concurrency = concurrency
+        self.executor = executor
+        self.max_tasks = max_tasks
+        self.max_memory = max_memory
+        self.reap_every = reap_every
+        self.completed = 0
+        names = (
+            list(queue.queues)
+            if isinstance(queue, AlchemicalQueueGroup)
+            else [queue.name]
+        )
+        self.stats: Dict[str, QueueStats] = {name: QueueStats() for name in names}
+        self.metrics: Metrics = metrics or queue.metrics
+        self._stopping = threading.Event()
         self._handler_registry: Dict[str, "Tasker"] = {}
         self._logger = getLogger("alchemical_queues.tasks")
 
+    def _queue_of(self, task_entry: AlchemicalEntry) -> AlchemicalQueue:
+        return self._queue_of_name(task_entry.queue_name)
+
+    def _queue_of_name(self, name: str) -> AlchemicalQueue:
+        if isinstance(self.queue, AlchemicalQueueGroup):
+            return self.queue.queues[name]
+        return self.queue
+
     def _fail(
         self,
+        task_entry: AlchemicalEntry,
         entry_id: int,
-        data: Dict[str, Any],
         exception: Union[BaseException, None] = None,
         fatal: bool = False,
     ):
+        queue = self._queue_of(task_entry)
+        stats = self.stats[queue.name]
+        data = task_entry.data
         retries = data["retries"]
 
         if data.get("max_retries", 0) > retries and not fatal:
@@ -57,7 +168,9 @@ class Worker:
                 retry_at += data["retry_in"]
 
             data["entry_id"] = entry_id
-            new_entry = self.queue.put(data, schedule_at=retry_at)
+            new_entry = queue.put(data, schedule_at=retry_at)
+            stats.retried += 1
+            self.metrics.increment("tasks_retried", queue.name)
             self._logger.info(
                 "Retrying failed task %s as `%s`", entry_id, new_entry.entry_id
             )
@@ -65,58 +178,265 @@ class Worker:
 
         self._logger.warning("Failed to perform task %s", entry_id)
         self._logger.exception(exception)
-        self.queue.respond(entry_id, {"error": str(exception)})
+        queue.respond(entry_id, {"error": str(exception)})
+        stats.failed += 1
+        self.metrics.increment("tasks_failed", queue.name)
 
         return False
 
-    def _perform(self, task_entry: AlchemicalEntry):
-        data = task_entry.data
-        entry_id = task_entry.data.get("entry_id") or task_entry.entry_id
-        function_path = data["function"]
-        task_handler = self._handler_registry.get(function_path)
+    def _resolve(self, task_entry: AlchemicalEntry) -> Union["Tasker", None]:
+        function_path = task_entry.data["function"]
 
         if function_path not in self._handler_registry:
-            task_handler = self._handler_registry[function_path] = cast(
-                Tasker, locate(function_path)
-            )
+            self._handler_registry[function_path] = cast(Tasker, locate(function_path))
 
+        task_handler = self._handler_registry[function_path]
         if task_handler is None:
-            return self._fail(
-                entry_id,
-                data,
+            self._fail(
+                task_entry,
+                task_entry.data.get("entry_id") or task_entry.entry_id,
                 KeyError(
                     f"AlchemicalEntry handler `{function_path}` not found.",
                 ),
                 fatal=True,
             )
 
+        return task_handler
+
+    def _perform(self, task_entry: AlchemicalEntry):
+        data = task_entry.data
+        entry_id = task_entry.data.get("entry_id") or task_entry.entry_id
+        task_handler = self._resolve(task_entry)
+
+        if task_handler is None:
+            return False
+
         try:
             self._logger.info("Running task `%s`.", task_entry.entry_id)
             func = task_handler.get_handler()
-            result = func(
-                TaskInfo(task_entry.entry_id, data["retries"], data["max_retries"]),
-                *data["args"],
-                **data["kwargs"],
-            )
-            self.queue.respond(entry_id, {"result": result})
+            queue = self._queue_of(task_entry)
+            with self.metrics.timer("task_seconds", queue.name):
+                result = func(
+                    TaskInfo(task_entry.entry_id, data["retries"], data["max_retries"]),
+                    *data["args"],
+                    **data["kwargs"],
+                )
+            queue.respond(entry_id, {"result": result})
+            self.stats[queue.name].completed += 1
+            self.metrics.increment("tasks_completed", queue.name)
             return True
         except KeyboardInterrupt as interrupt:
             # Allow cancellation via interrupt signal
             raise interrupt
         except Exception as error:  # pylint: disable=broad-except
-            return self._fail(entry_id, data, error)
+            return self._fail(task_entry, entry_id, error)
 
-    def work(self) -> NoReturn:
-        """Run tasks forever."""
+    def _submit(
+        self, pool: futures.Executor, task_entry: AlchemicalEntry
+    ) -> Union["futures.Future[Any]", None]:
+        data = task_entry.data
+        task_handler = self._resolve(task_entry)
+
+        if task_handler is None:
+            return None
+
+        self._logger.info("Running task `%s`.", task_entry.entry_id)
+        info = TaskInfo(task_entry.entry_id, data["retries"], data["max_retries"])
+
+        if self.executor == "process":
+            future = pool.submit(
+                _run_handler, data["function"], info, data["args"], data["kwargs"]
+            )
+        else:
+            future = pool.submit(
+                task_handler.get_handler(), info, *data["args"], **data["kwargs"]
+            )
+
+        name, started = task_entry.queue_name, time.perf_counter()
+        future.add_done_callback(
+            lambda _: self.metrics.observe(
+                "task_seconds", name, time.perf_counter() - started
+            )
+        )
+        return future
+
+    def _complete(
+        self, finished: List[Tuple["futures.Future[Any]", AlchemicalEntry]]
+    ) -> None:
+        responses: Dict[str, List[Tuple[int, Any, None]]] = {}
+
+        for future, task_entry in finished:
+            entry_id = task_entry.data.get("entry_id") or task_entry.entry_id
+
+            try:
+                result = future.result()
+            except BaseException as error:  # pylint: disable=broad-except
+                # This includes interrupts of pool processes, not of this worker
+                self._fail(task_entry, entry_id, error)
+            else:
+                responses.setdefault(self._queue_of(task_entry).name, []).append(
+                    (entry_id, {"result": result}, None)
+                )
+
+        # The results of all tasks that finished in the same cycle are committed together
+        for name, queue_responses in responses.items():
+            queue = self._queue_of_name(name)
+            queue.respond_many(queue_responses)
+            self.stats[name].completed += len(queue_responses)
+            self.metrics.increment("tasks_completed", name, len(queue_responses))
+
+        for _ in finished:
+            self._done()
+
+    def _done(self) -> None:
+        self.completed += 1
+
+        if self.max_tasks is not None and self.completed >= self.max_tasks:
+            self._logger.info("Worker completed %d tasks, stopping.", self.completed)
+            self.stop()
+
+        if self.max_memory is not None:
+            import resource  # pylint: disable=import-outside-toplevel
+
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            if sys.platform == "darwin":
+                # Reported in bytes instead of KiB
+                peak //= 1024
+            if peak > self.max_memory:
+                self._logger.info("Worker uses %d KiB of memory, stopping.", peak)
+                self.stop()
+
+    def _poll(self, max_items: int) -> Tuple[List[AlchemicalEntry], Optional[datetime]]:
+        """Claim up to `max_items` tasks, or learn when the next one is due if there are none."""
+        # pylint: disable=protected-access
+        return self.queue._poll(max_items)
+
+    def _idle_delay(self, next_ready: Optional[datetime]) -> float:
+        """How long to wait after finding no task to run."""
+        delay = self.wait.next_delay()
+        # Sleep right up to the next scheduled task instead of polling for it
+        until = _seconds_until(next_ready)
+        if until is not None and until > 0:
+            delay = min(until, self.poll_every.total_seconds())
+        return delay
+
+    def stop(self) -> None:
+        """Make `work` return after the tasks that are running now are finished. Safe to call from
+        signal handlers and other threads. A stopped worker stays stopped."""
+        self._stopping.set()
+
+    def _pool(self) -> futures.Executor:
+        if self.executor == "process":
+            return futures.ProcessPoolExecutor(self.concurrency)
+        return futures.ThreadPoolExecutor(self.concurrency)
+
+    def _submit_claimed(
+        self, pool: futures.Executor, task_entry: AlchemicalEntry
+    ) -> Tuple[futures.Executor, Union["futures.Future[Any]", None]]:
+        """Submit a claimed task, replacing the pool when a task killed one of its processes.
+        Returns the pool to use from now on, and the future of the task unless it failed right away.
+        """
+        submitted: Union["futures.Future[Any]", None] = None
+        try:
+            submitted = self._submit(pool, task_entry)
+        except BrokenProcessPool:
+            # The tasks in flight fail with the pool and are completed as failures
+            self._logger.warning("A task broke the process pool, starting a new one.")
+            pool.shutdown(wait=False)
+            pool = self._pool()
+
+            try:
+                submitted = self._submit(pool, task_entry)
+            except BrokenProcessPool as error:
+                self._fail(
+                    task_entry,
+                    task_entry.data.get("entry_id") or task_entry.entry_id,
+                    error,
+                )
+
+        if submitted is None:
+            # A task that failed without running counts towards max_tasks, as it does in `work`
+            self._done()
+        return pool, submitted
+
+    def _work_concurrently(self) -> None:
+        pool = self._pool()
+        in_flight: Dict["futures.Future[Any]", AlchemicalEntry] = {}
+
+        try:
+            while not self._stopping.is_set():
+                self._complete(
+                    [(f, in_flight.pop(f)) for f in list(in_flight) if f.done()]
+                )
+
+                if self._stopping.is_set():
+                    break
+
+                free = self.concurrency - len(in_flight)
+                entries, next_ready = self._poll(free) if free else ([], None)
+
+                for task_entry in entries:
+                    pool, submitted = self._submit_claimed(pool, task_entry)
+                    if submitted is not None:
+                        in_flight[submitted] = task_entry
+
+                if len(in_flight) >= self.concurrency:
+                    futures.wait(in_flight, return_when=futures.FIRST_COMPLETED)
+                    continue
+
+                if entries:
+                    self.wait.reset()
+                    delay = self.wait.next_delay()
+                else:
+                    delay = self._idle_delay(next_ready)
+
+                if in_flight:
+                    futures.wait(
+                        in_flight, timeout=delay, return_when=futures.FIRST_COMPLETED
+                    )
+                else:
+                    self.queue.wait_for_entries(delay)
+        finally:
+            # Record the outcome of everything that was claimed before stopping
+            for future in futures.as_completed(in_flight):
+                self._complete([(future, in_flight[future])])
+            pool.shutdown()
+
+    def _reap(self, interval: float) -> None:
+        while not self._stopping.wait(interval):
+            try:
+                reaped = self.queue.reap()
+            except Exception:  # pylint: disable=broad-except
+                self._logger.exception("Reaping responses failed.")
+            else:
+                if reaped:
+                    self._logger.info("Reaped %d expired responses.", reaped)
+
+    def work(self) -> None:
+        """Run tasks until the worker is stopped, by `stop` or by reaching `max_tasks` or `max_memory`."""
         self._logger.info("Worker starting on queue `%s`.", self.queue.name)
 
-        while True:
-            task_entry = self.queue.get()
+        if self.reap_every is not None:
+            threading.Thread(
+                target=self._reap,
+                args=(self.reap_every.total_seconds(),),
+                name="alchemical-reaper",
+                daemon=True,
+            ).start()
+
+        if self.concurrency > 1:
+            self._work_concurrently()
+            return
+
+        while not self._stopping.is_set():
+            entries, next_ready = self._poll(1)
 
-            if task_entry is None:
-                time.sleep(self.poll_every.total_seconds())
+            if not entries:
+                self.queue.wait_for_entries(self._idle_delay(next_ready))
             else:
-                self._perform(task_entry)
+                self.wait.reset()
+                self._perform(entries[0])
+                self._done()
 
     def work_one(self, block: bool = True) -> None:
         """Run exactly one task.
@@ -126,14 +446,15 @@ class Worker:
         """
 
         while True:
-            task_entry = self.queue.get()
+            entries, next_ready = self._poll(1)
 
-            if task_entry is not None:
-                self._perform(task_entry)
+            if entries:
+                self.wait.reset()
+                self._perform(entries[0])
                 return
 
             if block:
-                time.sleep(self.poll_every.total_seconds())
+                self.queue.wait_for_entries(self._idle_delay(next_ready))
             else:
                 break
 
@@ -175,18 +496,152 @@ class QueuedTask(Generic[RValue]):
             None: the task has not completed.
         """
 
-        responses = self._queue.responses(self.entry_id)
+        return _task_result(self._queue.response(self.entry_id))
 
-        if not responses:
-            return None
+    def wait(
+        self, timeout: Optional[float] = None, poll: Optional[WaitStrategy] = None
+    ) -> Union[RValue, TaskException]:
+        """Wait for the task to complete. Between checks it sleeps, or waits for a response
+        notification when the queue has a [Notifier][alchemical_queues.Notifier].
+
+        Args:
+            timeout (float | None, optional): give up after this many seconds. Waits forever if None.
+            poll (WaitStrategy | None, optional): how long to wait between checks. Defaults to an
+                                                  [ExponentialBackoff][alchemical_queues.ExponentialBackoff].
 
-        response = responses[0]
-        data: dict = cast(dict, response.data)
+        Returns:
+            RValue: the value you return from the task handler.
+            TaskException: the task failed to execute.
 
-        if "error" in data:
-            return TaskException(data["error"])
+        Raises:
+            TimeoutError: the task did not complete within `timeout`.
+        """
 
-        return cast(RValue, data.get("result"))
+        delays = (poll or ExponentialBackoff()).delays(timeout)
+
+        while True:
+            response = self._queue.response(self.entry_id)
+            if response is not None:
+                return cast(Union[RValue, TaskException], _task_result(response))
+
+            delay = next(delays, None)
+            if delay is None:
+                raise TimeoutError(f"Task {self.entry_id} did not complete in time")
+
+            self._queue.wait_for_responses(delay)
+
+
+class AsyncQueuedTask(Generic[RValue]):
+    """Represent a task in an [AsyncAlchemicalQueue][alchemical_queues.AsyncAlchemicalQueue].
+
+    Attributes:
+        entry_id (int): The id of the entry into the queue that contains the task description.
+    """
+
+    def __init__(self, queue: AsyncAlchemicalQueue, entry_id: int, name: str):
+        self._queue = queue
+        self.entry_id = entry_id
+        self._name = name
+
+    async def result(self) -> Union[RValue, TaskException, None]:
+        """Obtain the result of a queued task, like [QueuedTask.result][alchemical_queues.tasks.QueuedTask.result].
+
+        Returns:
+            RValue: the value you return from the task handler.
+            TaskException: the task failed to execute.
+            None: the task has not completed.
+        """
+
+        return _task_result(await self._queue.response(self.entry_id))
+
+    async def wait(
+        self, timeout: Optional[float] = None, poll: Optional[WaitStrategy] = None
+    ) -> Union[RValue, TaskException]:
+        """Wait for the task to complete.
+
+        Args:
+            timeout (float | None, optional): give up after this many seconds. Waits forever if None.
+            poll (WaitStrategy | None, optional): how long to sleep between checks. Defaults to an
+                                                  [ExponentialBackoff][alchemical_queues.ExponentialBackoff].
+
+        Returns:
+            RValue: the value you return from the task handler.
+            TaskException: the task failed to execute.
+
+        Raises:
+            TimeoutError: the task did not complete within `timeout`.
+        """
+
+        delays = (poll or ExponentialBackoff()).delays(timeout)
+
+        while True:
+            response = await self._queue.response(self.entry_id)
+            if response is not None:
+                return cast(Union[RValue, TaskException], _task_result(response))
+
+            delay = next(delays, None)
+            if delay is None:
+                raise TimeoutError(f"Task {self.entry_id} did not complete in time")
+
+            await asyncio.sleep(delay)
+
+
+def _task_result(response: Optional[AlchemicalResponse]) -> Any:
+    if response is None:
+        return None
+
+    data: dict = cast(dict, response.data)
+
+    if "error" in data:
+        return TaskException(data["error"])
+
+    return data.get("result")
+
+
+def gather(
+    tasks: Iterable[QueuedTask[Any]], timeout: Optional[float] = None
+) -> List[Any]:
+    """Wait for many tasks to complete. Every poll looks up the results of the tasks that are still
+    outstanding with a few queries per queue, instead of one per task.
+
+    Args:
+        tasks (Iterable[QueuedTask]): the tasks to wait for.
+        timeout (float | None, optional): give up after this many seconds. Waits forever if None.
+
+    Returns:
+        List[Any]: the results of the tasks in the given order, a TaskException for tasks that failed.
+
+    Raises:
+        TimeoutError: not all tasks completed within `timeout`.
+    """
+
+    queued = list(tasks)
+    results: Dict[int, Any] = {}
+    delays = ExponentialBackoff().delays(timeout)
+
+    while True:
+        outstanding: Dict[AlchemicalQueue, List[int]] = {}
+        for index, queued_task in enumerate(queued):
+            if index not in results:
+                # pylint: disable=protected-access
+                outstanding.setdefault(queued_task._queue, []).append(index)
+
+        for queue, indexes in outstanding.items():
+            found = queue.responses_many({queued[i].entry_id for i in indexes})
+            for index in indexes:
+                if queued[index].entry_id in found:
+                    results[index] = _task_result(found[queued[index].entry_id][0])
+
+        if len(results) == len(queued):
+            return [results[index] for index in range(len(queued))]
+
+        delay = next(delays, None)
+        if delay is None:
+            raise TimeoutError(
+                f"{len(queued) - len(results)} of {len(queued)} tasks did not complete in time"
+            )
+
+        time.sleep(delay)
 
 
 class Task(Generic[Param, RValue]):
@@ -223,20 +678,47 @@ class Task(Generic[Param, RValue]):
             retry_in (timedelta, optional): the minimal timespan between two tries.
         """
 
-        name = f"{self._handler.__module__}.{self._handler.__qualname__}"
         entry = on_queue.put(
-            {
-                "function": name,
-                "args": self._args,
-                "kwargs": self._kwargs,
-                "retries": 0,
-                "retry_in": retry_in,
-                "max_retries": max_retries,
-            },
+            self._payload(max_retries, retry_in),
+            schedule_at=schedule_at,
+            priority=priority,
+        )
+        return QueuedTask(queue=on_queue, entry_id=entry.entry_id, name=self._name)
+
+    async def schedule_async(
+        self,
+        on_queue: AsyncAlchemicalQueue,
+        *,
+        schedule_at: Union[datetime, None] = None,
+        priority: int = 0,
+        max_retries: int = 0,
+        retry_in: Union[timedelta, None] = None,
+    ) -> AsyncQueuedTask[RValue]:
+        """Schedule a task on an asyncio queue to be executed. Takes the same arguments as
+        [schedule][alchemical_queues.tasks.Task.schedule]."""
+
+        entry = await on_queue.put(
+            self._payload(max_retries, retry_in),
             schedule_at=schedule_at,
             priority=priority,
         )
-        return QueuedTask(queue=on_queue, entry_id=entry.entry_id, name=name)
+        return AsyncQueuedTask(queue=on_queue, entry_id=entry.entry_id, name=self._name)
+
+    @property
+    def _name(self) -> str:
+        return f"{self._handler.__module__}.{self._handler.__qualname__}"
+
+    def _payload(
+        self, max_retries: int, retry_in: Union[timedelta, None]
+    ) -> Dict[str, Any]:
+        return {
+            "function": self._name,
+            "args": self._args,
+            "kwargs": self._kwargs,
+            "retries": 0,
+            "retry_in": retry_in,
+            "max_retries": max_retries,
+        }
 
 
 class Tasker(Generic[Param, RValue]):
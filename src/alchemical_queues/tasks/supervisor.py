@@ -0,0 +1,151 @@
+"""Prefork supervisor, running workers in child processes forked from a single parent."""
+
+import importlib
+import os
+import signal
+import time
+from logging import getLogger
+from types import FrameType
+from typing import Callable, Iterable, Optional, Set
+
+from .main import Worker
+
+
+class Supervisor:
+    """Keeps a fixed number of worker processes running. Task modules are imported once in the
+    parent, so forked children share the imported code copy-on-write and start instantly.
+    Children that exit, because they crashed or reached their `max_tasks`/`max_memory`, are
+    replaced by fresh ones. On SIGTERM or SIGINT the children finish their current tasks and
+    exit, a second signal kills them immediately.
+
+    Only available on platforms with `os.fork`.
+
+    Attributes:
+        worker_factory (Callable[[], Worker]): creates the worker in a freshly forked child. Create
+                                               the SQLAlchemy engine in here as well, connections
+                                               can not be shared with the parent.
+        processes (int): the number of child processes.
+        restart_delay (float): seconds to wait before replacing a child that crashed.
+    """
+
+    def __init__(
+        self,
+        worker_factory: Callable[[], Worker],
+        processes: int,
+        preload: Iterable[str] = (),
+        restart_delay: float = 1.0,
+    ) -> None:
+        """Create a supervisor.
+
+        Args:
+            worker_factory (Callable[[], Worker]): creates the worker in each child.
+            processes (int): the number of child processes.
+            preload (Iterable[str], optional): modules to import in the parent before forking, typically the ones defining your tasks.
+            restart_delay (float, optional): seconds to wait before replacing a child that crashed.
+        """
+        if processes < 1:
+            raise ValueError(f"processes={processes} should be at least 1")
+        if not hasattr(os, "fork"):
+            raise RuntimeError("Forking processes is not available on this platform")
+
+        self.worker_factory = worker_factory
+        self.processes = processes
+        self.restart_delay = restart_delay
+        self._children: Set[int] = set()
+        self._signals = 0
+        self._spawn_after = 0.0
+        self._logger = getLogger("alchemical_queues.tasks")
+
+        for module in preload:
+            importlib.import_module(module)
+
+    def _handle_signal(self, signum: int, frame: Optional[FrameType]) -> None:
+        # pylint: disable=unused-argument
+        self._signals += 1
+
+        if self._signals > 1:
+            self._logger.warning("Killing %d worker processes.", len(self._children))
+            self._broadcast(signal.SIGKILL)
+
+    def _broadcast(self, signum: int) -> None:
+        for pid in list(self._children):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    def _spawn(self) -> None:
+        pid = os.fork()
+
+        if pid == 0:  # pragma: no cover, runs in the child
+            os._exit(self._run_child())  # pylint: disable=protected-access
+
+        self._children.add(pid)
+
+    def _run_child(self) -> int:
+        # Until the worker exists there is nothing to drain
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+
+        try:
+            worker = self.worker_factory()
+
+            def stop(signum: int, frame: Optional[FrameType]) -> None:
+                # pylint: disable=unused-argument
+                worker.stop()
+
+            signal.signal(signal.SIGTERM, stop)
+            signal.signal(signal.SIGINT, stop)
+            worker.work()
+        except BaseException:  # pylint: disable=broad-except
+            self._logger.exception("Worker process %d crashed.", os.getpid())
+            return 1
+        return 0
+
+    def _reap(self, block: bool) -> None:
+        for child in list(self._children):
+            pid, status = os.waitpid(child, 0 if block else os.WNOHANG)
+            if pid == 0:
+                continue
+
+            self._children.discard(pid)
+            if os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0:
+                self._logger.info("Worker process %d exited.", pid)
+            else:
+                self._logger.warning(
+                    "Worker process %d died with status %d.", pid, status
+                )
+                self._spawn_after = time.monotonic() + self.restart_delay
+
+    def run(self) -> None:
+        """Run the worker processes until SIGTERM or SIGINT is received, then wait for them to finish.
+        Must be called from the main thread.
+        """
+        self._signals = 0
+        previous = {
+            signum: signal.signal(signum, self._handle_signal)
+            for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+        self._logger.info("Supervisor starting %d worker processes.", self.processes)
+
+        try:
+            while not self._signals:
+                self._reap(block=False)
+
+                while (
+                    len(self._children) < self.processes
+                    and time.monotonic() >= self._spawn_after
+                    and not self._signals
+                ):
+                    self._spawn()
+
+                time.sleep(0.1)
+
+            self._logger.info(
+                "Supervisor stopping %d worker processes.", len(self._children)
+            )
+            self._broadcast(signal.SIGTERM)
+            self._reap(block=True)
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
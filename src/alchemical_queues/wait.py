@@ -0,0 +1,141 @@
+"""Wait strategies for polling an empty queue."""
+
+import random
+import time
+from datetime import datetime
+from typing import Any, Iterator, Optional
+
+
+class WaitStrategy:
+    """Decides how long to sleep between polls of an empty queue. Strategies are stateful:
+    every call to `next_delay` is another failed poll, `reset` is called after a successful one.
+    """
+
+    def next_delay(self) -> float:
+        """The number of seconds to sleep before polling again.
+
+        Returns:
+            float: the delay in seconds.
+        """
+        raise NotImplementedError()
+
+    def reset(self) -> None:
+        """Called when a poll succeeded."""
+
+    def delays(self, timeout: Optional[float] = None) -> Iterator[float]:
+        """Iterate over the delays of this strategy, cut short so the last one ends `timeout` seconds from now.
+
+        Args:
+            timeout (float | None, optional): the total time to wait in seconds. Iterates forever if None.
+
+        Returns:
+            Iterator[float]: delays in seconds.
+        """
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            delay = self.next_delay()
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                delay = min(delay, remaining)
+            yield delay
+
+
+class FixedWait(WaitStrategy):
+    """Poll at a fixed interval.
+
+    Attributes:
+        interval (float): seconds between polls.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+
+    def next_delay(self) -> float:
+        return self.interval
+
+
+class ExponentialBackoff(WaitStrategy):
+    """Poll quickly at first and back off exponentially while the queue stays empty.
+
+    Attributes:
+        initial (float): seconds to wait after the first empty poll.
+        maximum (float): upper bound on the wait in seconds.
+        multiplier (float): growth factor of the wait per empty poll.
+        jitter (float): fraction of the wait that is randomized, so that many idle consumers
+                        do not poll in lockstep.
+    """
+
+    def __init__(
+        self,
+        initial: float = 0.01,
+        maximum: float = 1.0,
+        multiplier: float = 2.0,
+        jitter: float = 0.5,
+    ) -> None:
+        if not 0.0 <= jitter <= 1.0:
+            raise ValueError(f"jitter={jitter} should be between 0 and 1")
+
+        self.initial = initial
+        self.maximum = maximum
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self._current = min(initial, maximum)
+
+    def next_delay(self) -> float:
+        delay = self._current
+        self._current = min(self._current * self.multiplier, self.maximum)
+        return delay * (1.0 - self.jitter * random.random())
+
+    def reset(self) -> None:
+        self._current = min(self.initial, self.maximum)
+
+
+def _comparable(now: datetime, moment: datetime) -> datetime:
+    """The naive local time `now`, made comparable with `moment`, which may be timezone aware."""
+    # the naive local time of now() can not be compared with an aware datetime
+    return now.astimezone() if moment.tzinfo is not None else now
+
+
+def _seconds_until(moment: Optional[datetime]) -> Optional[float]:
+    if moment is None:
+        return None
+    return (moment - _comparable(datetime.now(), moment)).total_seconds()
+
+
+def _blocking_get(
+    queue: Any,
+    block: bool,
+    timeout: Optional[float],
+    wait: Optional[WaitStrategy],
+) -> Any:
+    """Pop a single entry of a queue or group, polling until one is available when blocking."""
+    # pylint: disable=protected-access
+    # An empty poll also returns when the next entry becomes ready
+    entries, next_ready = queue._poll(1)
+    if entries:
+        # Also after an immediate success, so no backoff is left over for the next call
+        if wait is not None:
+            wait.reset()
+        return entries[0]
+    if not block:
+        return None
+
+    wait = wait or ExponentialBackoff()
+
+    for delay in wait.delays(timeout):
+        # Wake up right when a scheduled entry becomes ready, instead of up to a poll later
+        until = _seconds_until(next_ready)
+        if until is not None and 0 < until < delay:
+            delay = until
+        queue.wait_for_entries(delay)
+
+        entries, next_ready = queue._poll(1)
+        if entries:
+            wait.reset()
+            return entries[0]
+
+    return None
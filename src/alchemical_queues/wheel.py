@@ -0,0 +1,88 @@
+"""Timing wheel, keeping entries scheduled far ahead out of the queue table until they are nearly due."""
+
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy.engine import Connection
+
+from .schema import _Statements
+from .wait import _comparable
+
+
+class TimingWheel:
+    """Keep entries whose `schedule_at` lies more than `horizon` ahead in a separate table, in
+    buckets of `slot`, instead of in the queue table that every pop searches. Entries are moved
+    back to the queue table in bulk, a bucket at a time, once their slot starts within `horizon`.
+    Pops do this once per slot, so entries are back well before they are due and
+    [get][alchemical_queues.AlchemicalQueue.get] behaves as without a timing wheel.
+
+    Entries put into the wheel get negative entry ids, which they keep when they are moved back.
+    Only queues configured with a timing wheel move entries back, so entries still in the wheel
+    wait there when the wheel is removed, until it is configured again. They do show in
+    [stats][alchemical_queues.AlchemicalQueues.stats] and are removed by `clear`.
+
+    Attributes:
+        horizon (timedelta): entries scheduled further ahead than this go into the wheel.
+        slot (timedelta): the width of a bucket, and how often the wheel turns. Must be shorter than `horizon`.
+        batch_size (int): move this many entries per statement.
+    """
+
+    def __init__(
+        self,
+        horizon: timedelta = timedelta(hours=1),
+        slot: timedelta = timedelta(minutes=1),
+        batch_size: int = 500,
+    ) -> None:
+        if not timedelta(0) < slot < horizon:
+            raise ValueError(f"slot={slot} should be positive and shorter than horizon")
+
+        self.horizon = horizon
+        self.slot = slot
+        self.batch_size = batch_size
+
+    def slot_of(self, moment: datetime) -> int:
+        """The bucket of a point in time.
+
+        Args:
+            moment (datetime): the point in time.
+
+        Returns:
+            int: the number of the bucket.
+        """
+        return int(moment.timestamp() // self.slot.total_seconds())
+
+    def delays(self, ready_at: datetime, now: datetime) -> bool:
+        """Whether an entry that becomes ready at `ready_at` goes into the wheel."""
+        return ready_at - _comparable(now, ready_at) > self.horizon
+
+    def next_turn(self) -> float:
+        """The time, as a Unix timestamp, at which the next slot starts."""
+        width = self.slot.total_seconds()
+        return (time.time() // width + 1) * width
+
+    def promote(self, conn: Connection, stmts: _Statements) -> int:
+        """Move the entries of a queue whose slot starts within the horizon back to the queue table.
+
+        Args:
+            conn (Connection): the connection of the transaction to move them in.
+            stmts (_Statements): the statements of the queue.
+
+        Returns:
+            int: the number of entries moved.
+        """
+        params = {"slot": self.slot_of(datetime.now() + self.horizon)}
+        total = 0
+
+        while True:
+            ids = list(
+                conn.execute(
+                    stmts.delayed_due, dict(params, limit=self.batch_size)
+                ).scalars()
+            )
+            if ids:
+                conn.execute(stmts.promote, {"delayed_ids": ids})
+                conn.execute(stmts.delayed_delete, {"delayed_ids": ids})
+
+            total += len(ids)
+            if len(ids) < self.batch_size:
+                return total
@@ -1,3 +1,5 @@
+import os
+
 from alchemical_queues.tasks import task, TaskInfo
 
 
@@ -21,3 +23,9 @@ def fail_once(info: TaskInfo, data: int) -> int:
 @task
 def fail_always(info: TaskInfo, data: int) -> int:
     raise Exception("Always fails")
+
+
+@task
+def exit_process(info: TaskInfo, data: int) -> int:
+    # Kills the pool process running it, without raising an exception
+    os._exit(1)
@@ -0,0 +1,158 @@
+import asyncio
+import pytest
+from sqlalchemy.engine import make_url
+from alchemical_queues import AlchemicalQueues, AsyncAlchemicalQueues, tasks
+
+from .mocktasks import increment, fail_always
+
+pytest.importorskip("aiosqlite")
+pytest.importorskip("greenlet")
+
+
+@pytest.fixture
+def async_engine(engine):
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = make_url(str(engine.url))
+    if url.get_backend_name() != "sqlite":
+        pytest.skip("Async tests run on SQLite with aiosqlite")
+
+    return create_async_engine(url.set(drivername="sqlite+aiosqlite"))
+
+
+@pytest.fixture
+def async_queue(async_engine, queue):
+    return AsyncAlchemicalQueues(async_engine)
+
+
+def test_async_put_get(async_engine, async_queue: AsyncAlchemicalQueues):
+    async def run():
+        q = async_queue.get("test")
+        assert q.name == "test"
+        assert await q.empty()
+
+        entry = await q.put(1)
+        assert await q.put_many([2, 3], priority=[0, 1]) == [entry.entry_id + 1, entry.entry_id + 2]
+        assert await q.qsize() == 3
+
+        e1 = await q.get()
+        rest = await q.get_many(5)
+        assert await q.get() is None
+
+        await async_engine.dispose()
+        return e1, rest
+
+    e1, rest = asyncio.run(run())
+    assert e1 and e1.data == 3
+    assert [e.data for e in rest] == [1, 2]
+
+
+def test_async_shared_with_sync(async_engine, async_queue: AsyncAlchemicalQueues, queue: AlchemicalQueues):
+    async def run():
+        await async_queue.get("test").put("hello")
+        await async_engine.dispose()
+
+    asyncio.run(run())
+    entry = queue.get("test").get()
+    assert entry and entry.data == "hello"
+
+
+def test_async_iterate(async_engine, async_queue: AsyncAlchemicalQueues):
+    async def produce(q):
+        for i in range(3):
+            await asyncio.sleep(0.05)
+            await q.put(i)
+
+    async def run():
+        q = async_queue.get("test")
+        producer = asyncio.ensure_future(produce(q))
+        out = []
+        async for entry in q:
+            out.append(entry.data)
+            if len(out) == 3:
+                break
+        await producer
+        assert await q.get(block=True, timeout=0.1) is None
+        await async_engine.dispose()
+        return out
+
+    assert asyncio.run(run()) == [0, 1, 2]
+
+
+def test_async_respond(async_engine, async_queue: AsyncAlchemicalQueues):
+    async def run():
+        q = async_queue.get("test")
+        entry = await q.put(1)
+        await q.respond(entry.entry_id, "test")
+        responses = await q.responses(entry.entry_id)
+        await async_engine.dispose()
+        return responses
+
+    responses = asyncio.run(run())
+    assert len(responses) == 1 and responses[0].data == "test"
+
+
+def test_async_task(async_engine, async_queue: AsyncAlchemicalQueues, queue: AlchemicalQueues):
+    async def run():
+        q = async_queue.get("tasks")
+        v = await increment(12).schedule_async(q)
+        f = await fail_always(1).schedule_async(q)
+        assert await v.result() is None
+
+        with pytest.raises(TimeoutError):
+            await v.wait(timeout=0.1)
+
+        loop = asyncio.get_event_loop()
+        worker = tasks.Worker(queue.get("tasks"))
+        await loop.run_in_executor(None, worker.work_one, False)
+        await loop.run_in_executor(None, worker.work_one, False)
+
+        result = await v.wait(timeout=5)
+        failure = await f.wait(timeout=5)
+        await async_engine.dispose()
+        return result, failure
+
+    result, failure = asyncio.run(run())
+    assert result == 13
+    assert isinstance(failure, tasks.TaskException)
+
+
+def test_async_claim_check(async_engine, queue):
+    from alchemical_queues import ClaimCheck
+
+    async def run():
+        aq = AsyncAlchemicalQueues(async_engine, claim_check=ClaimCheck(1000))
+        q = aq.get("claims")
+
+        entry = await q.put(b"x" * 10_000)
+        assert (await q.get()).data == b"x" * 10_000
+
+        await q.respond(entry.entry_id, b"y" * 10_000)
+        assert (await q.responses(entry.entry_id))[0].data == b"y" * 10_000
+
+    asyncio.run(run())
+
+
+def test_async_respond_many(async_engine, async_queue: AsyncAlchemicalQueues):
+    async def run():
+        q = async_queue.get("test")
+        sent = await q.respond_many([(1, "a", None), (2, "b", None)])
+        assert [r.data for r in sent] == ["a", "b"]
+
+        found = await q.responses_many([1, 2, 3])
+        assert {k: [r.data for r in v] for k, v in found.items()} == {1: ["a"], 2: ["b"]}
+
+    asyncio.run(run())
+
+
+def test_async_stats(async_engine, async_queue: AsyncAlchemicalQueues):
+    async def run():
+        q = async_queue.get("test")
+        await q.put_many([1, 2], priority=[3, 1])
+
+        stats = await async_queue.stats(["test"])
+        assert stats["test"].ready == 2
+        assert stats["test"].max_priority == 3
+        assert await q.qsize(approximate=True) == 2
+
+    asyncio.run(run())
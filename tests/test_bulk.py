@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+import pytest
+from alchemical_queues import AlchemicalQueues, main
+
+
+def test_put_many(queue: AlchemicalQueues):
+    q = queue.get("test")
+    ids = q.put_many(range(10))
+
+    assert len(ids) == 10
+    assert ids == sorted(ids)
+    assert q.qsize() == 10
+
+    for i, entry_id in enumerate(ids):
+        entry = q.get()
+        assert entry and entry.entry_id == entry_id and entry.data == i
+
+    assert q.get() is None
+
+
+def test_put_many_empty(queue: AlchemicalQueues):
+    q = queue.get("test")
+    assert q.put_many([]) == []
+    assert q.empty()
+
+
+def test_put_many_large(queue: AlchemicalQueues):
+    q = queue.get("test")
+    ids = q.put_many(range(2500))
+
+    assert len(set(ids)) == 2500
+    assert q.qsize() == 2500
+
+
+def test_put_many_overrides(queue: AlchemicalQueues):
+    q = queue.get("test")
+    later = datetime.now() + timedelta(hours=1)
+    q.put_many([1, 2, 3], priority=[1, 3, 2], schedule_at=[None, None, later])
+
+    e1 = q.get()
+    e2 = q.get()
+
+    assert e1 and e1.data == 2
+    assert e2 and e2.data == 1
+    assert q.get() is None
+    assert q.qsize() == 1
+
+
+def test_put_many_override_length(queue: AlchemicalQueues):
+    q = queue.get("test")
+
+    with pytest.raises(ValueError):
+        q.put_many([1, 2, 3], priority=[1, 2])
+
+
+def test_get_many(queue: AlchemicalQueues):
+    q = queue.get("test")
+    q.put_many(range(5))
+    q.put(5, priority=1)
+    q.put(6, schedule_at=datetime.now() + timedelta(hours=1))
+
+    entries = q.get_many(3)
+    assert [e.data for e in entries] == [5, 0, 1]
+
+    entries = q.get_many(10)
+    assert [e.data for e in entries] == [2, 3, 4]
+
+    assert q.get_many(10) == []
+    assert q.qsize() == 1
+
+
+def test_get_many_nothing(queue: AlchemicalQueues):
+    q = queue.get("test")
+    q.put(1)
+
+    assert q.get_many(0) == []
+    assert q.qsize() == 1
+
+
+@pytest.mark.parametrize("delete_returning", [True, False])
+def test_pop_modes(queue: AlchemicalQueues, monkeypatch, delete_returning: bool):
+    if delete_returning and not main._supports_delete_returning_pop(queue._engine.dialect):
+        pytest.skip("Engine does not support DELETE ... RETURNING")
+
+    monkeypatch.setattr(main, "_supports_delete_returning_pop", lambda dialect: delete_returning)
+    q = queue.get("test")
+    q.put_many(range(6), priority=[0, 2, 0, 1, 0, 2])
+
+    e = q.get()
+    assert e and e.data == 1
+    assert [e.data for e in q.get_many(3)] == [5, 3, 0]
+    assert [e.data for e in q.get_many(3)] == [2, 4]
+    assert q.get() is None
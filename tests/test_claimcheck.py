@@ -0,0 +1,134 @@
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, inspect, select
+from alchemical_queues import AlchemicalQueues, ClaimCheck
+from alchemical_queues.claimcheck import FileBlobStore
+
+
+@pytest.fixture(params=["table", "directory"])
+def claim_queues(request, engine, tmpdir):
+    directory = str(tmpdir / "blobs") if request.param == "directory" else None
+    queues = AlchemicalQueues(engine, claim_check=ClaimCheck(1000, directory))
+    queues.create_all()
+    return queues
+
+
+def count(queues, table):
+    with queues._engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(table)).scalar_one()
+
+
+def test_claim_check(claim_queues: AlchemicalQueues):
+    q = claim_queues.get("claims")
+    large = b"x" * 10_000
+
+    q.put(large)
+    q.put(large)
+    q.put(b"small")
+
+    with claim_queues._engine.connect() as conn:
+        rows = conn.execute(
+            select(claim_queues._qtable).order_by(claim_queues._qtable.c.entry_id)
+        ).all()
+    assert rows[0].data is None and rows[0].blob_key == rows[1].blob_key
+    assert rows[2].data is not None and rows[2].blob_key is None
+
+    entries = q.get_many(3)
+    assert [e.data for e in entries] == [large, large, b"small"]
+
+    q.respond(entries[0].entry_id, large)
+    assert q.responses(entries[0].entry_id)[0].data == large
+
+
+def test_claim_check_collect(claim_queues: AlchemicalQueues):
+    q = claim_queues.get("claims")
+    entry = q.put(b"x" * 10_000)
+
+    assert claim_queues.collect_blobs(timedelta(0)) == 0
+    assert claim_queues.collect_blobs() == 0
+
+    q.get()
+    q.respond(entry.entry_id, b"y" * 10_000)
+    assert claim_queues.collect_blobs(timedelta(0)) == 1
+    assert q.responses(entry.entry_id)[0].data == b"y" * 10_000
+
+    claim_queues.clear()
+    assert claim_queues.collect_blobs(timedelta(0)) == 1
+    if claim_queues._claim_check.directory is None:
+        assert count(claim_queues, claim_queues._btable) == 0
+
+
+def test_claim_check_collect_race(claim_queues: AlchemicalQueues):
+    q = claim_queues.get("claims")
+    large = b"x" * 10_000
+    q.put(large)
+    q.get()
+
+    blobs = claim_queues._blobs
+    before = datetime.now()
+    with claim_queues._engine.begin() as conn:
+        garbage = blobs.keys(conn, before)
+    assert len(garbage) == 1
+
+    # Stored again by a put between listing and deleting the garbage
+    q.put(large)
+    with claim_queues._engine.begin() as conn:
+        assert blobs.delete(conn, garbage, before) == 0
+
+    assert q.get().data == large
+    assert claim_queues.collect_blobs(timedelta(0)) == 1
+
+
+def test_claim_check_put_collected(claim_queues: AlchemicalQueues):
+    q = claim_queues.get("claims")
+    large = b"x" * 10_000
+    q.put(large)
+    q.get()
+    assert claim_queues.collect_blobs(timedelta(0)) == 1
+
+    # The payload is stored anew instead of touching the collected one
+    q.put(large)
+    assert q.get().data == large
+
+
+def test_file_blob_store_put_race(tmpdir, monkeypatch):
+    store = FileBlobStore(str(tmpdir))
+    key = ClaimCheck.key(b"payload")
+    store.put(None, key, b"payload", datetime.now())
+    utime = os.utime
+
+    def collected_first(path, times):
+        # Collected right before the put touches it
+        os.unlink(path)
+        monkeypatch.setattr(os, "utime", utime)
+        utime(path, times)
+
+    monkeypatch.setattr(os, "utime", collected_first)
+    store.put(None, key, b"payload", datetime.now())
+
+    assert store.get(None, key) == b"payload"
+
+
+def test_claim_check_indexes(claim_queues: AlchemicalQueues):
+    with claim_queues._engine.connect() as conn:
+        inspector = inspect(conn)
+        for table in (
+            claim_queues._qtable,
+            claim_queues._rtable,
+            claim_queues._dtable,
+        ):
+            columns = [i["column_names"] for i in inspector.get_indexes(table.name)]
+            assert ["blob_key"] in columns
+
+
+def test_claim_check_lazy(claim_queues: AlchemicalQueues):
+    q = claim_queues.get("claims")
+    q.put(b"x" * 10_000)
+    entry = q.get()
+
+    # The popped entry no longer refers to the payload, which is only fetched on access
+    assert claim_queues.collect_blobs(timedelta(0)) == 1
+    with pytest.raises(LookupError):
+        entry.data
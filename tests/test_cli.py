@@ -0,0 +1,31 @@
+import logging
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from alchemical_queues import AlchemicalQueues
+from alchemical_queues.tasks import cli
+
+
+def test_cli_reap(tmpdir, caplog):
+    url = f"sqlite:///{tmpdir / 'cli.db'}"
+    queues = AlchemicalQueues(create_engine(url))
+    queues.create_all()
+    queues.get("test").respond(1, "expired", datetime.now() - timedelta(seconds=1))
+
+    with caplog.at_level(logging.INFO, logger="alchemical_queues.tasks"):
+        cli.cli(["reap", url, "--batch-size", "10"])
+
+    assert "Reaped 1 expired responses." in caplog.messages
+
+
+def test_cli_work_is_default():
+    # Without a command the arguments are those of `work`, which rejects the concurrency
+    with pytest.raises(ValueError):
+        cli.cli(["-c", "0", "sqlite://", "test"])
+
+    with pytest.raises(ValueError):
+        cli.cli(["work", "sqlite://", "test", "-c", "0"])
+
+    with pytest.raises(SystemExit):
+        cli.cli([])
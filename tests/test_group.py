@@ -0,0 +1,102 @@
+from datetime import datetime
+
+import pytest
+from alchemical_queues import AlchemicalQueues, AlchemicalQueueGroup, tasks
+
+from .mocktasks import increment, fail_always
+
+
+def test_strict_precedence(queue: AlchemicalQueues) -> None:
+    low, high = queue.get("low"), queue.get("high")
+    low.put_many([1, 2])
+    high.put_many([3, 4])
+
+    group = AlchemicalQueueGroup([high, low])
+    entries = group.get_many(3)
+
+    assert [e.data for e in entries] == [3, 4, 1]
+    assert [e.queue_name for e in entries] == ["high", "high", "low"]
+    assert group.qsize() == 1
+
+    entry = group.get()
+    assert entry and entry.data == 2
+    assert group.get() is None
+
+
+def test_priority_within_queue(queue: AlchemicalQueues) -> None:
+    a, b = queue.get("a"), queue.get("b")
+    a.put(1)
+    a.put(2, priority=5)
+    b.put(3, priority=10)
+
+    group = AlchemicalQueueGroup([a, b])
+
+    assert [e.data for e in group.get_many(3)] == [2, 1, 3]
+
+
+def test_weights(queue: AlchemicalQueues) -> None:
+    a, b = queue.get("a"), queue.get("b")
+    a.put_many(["a"] * 200)
+    b.put_many(["b"] * 200)
+
+    group = AlchemicalQueueGroup([a, b], weights={"a": 3})
+    popped = [group.get().data for _ in range(200)]
+
+    # b has weight 1, so about a quarter of the entries come from it
+    assert 20 < popped.count("b") < 80
+
+
+def test_weights_validation(queue: AlchemicalQueues) -> None:
+    a = queue.get("a")
+
+    with pytest.raises(ValueError):
+        AlchemicalQueueGroup([a], weights={"other": 1})
+    with pytest.raises(ValueError):
+        AlchemicalQueueGroup([a], weights={"a": 0})
+    with pytest.raises(ValueError):
+        AlchemicalQueueGroup([a, AlchemicalQueues(queue._engine, "Other").get("b")])
+
+
+@pytest.mark.parametrize("concurrency", [1, 4])
+def test_worker(queue: AlchemicalQueues, concurrency: int) -> None:
+    a, b = queue.get("a"), queue.get("b")
+    first = increment(1).schedule(a)
+    second = increment(2).schedule(b)
+    failed = fail_always(3).schedule(b)
+
+    worker = tasks.Worker(
+        AlchemicalQueueGroup([a, b]), concurrency=concurrency, max_tasks=3
+    )
+    worker.work()
+
+    assert first.result == 2
+    assert second.result == 3
+    assert isinstance(failed.result, tasks.TaskException)
+    assert worker.stats["a"].completed == 1
+    assert worker.stats["b"].completed == 1
+    assert worker.stats["b"].failed == 1
+    assert worker.stats["b"].throughput > 0
+
+
+def test_pop_uses_index(queue: AlchemicalQueues) -> None:
+    if queue._engine.dialect.name != "sqlite":
+        pytest.skip("SQLite query plan")
+    group = AlchemicalQueueGroup([queue.get("a"), queue.get("b"), queue.get("c")])
+
+    compiled = group._ready.compile(queue._engine)
+    params = compiled.construct_params(
+        {"now": datetime.now(), "limit": 10, "rank_0": 0, "rank_1": 1, "rank_2": 2}
+    )
+    with queue._engine.connect() as conn:
+        plan = [
+            row[-1]
+            for row in conn.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {compiled}",
+                tuple(params[key] for key in compiled.positiontup),
+            )
+        ]
+
+    # Every queue is searched through the pop index, only their best entries are sorted
+    table = queue._qtable.name
+    assert sum(f"USING INDEX ix_{table}_pop" in step for step in plan) == 3
+    assert not [step for step in plan if step.startswith(f"SCAN {table}")]
@@ -0,0 +1,156 @@
+import sqlite3
+import urllib.request
+from datetime import timedelta
+
+import pytest
+from sqlalchemy.exc import OperationalError
+from alchemical_queues import (
+    AlchemicalQueues,
+    AlchemicalQueueGroup,
+    ExponentialBackoff,
+    Metrics,
+    MetricsRegistry,
+    RetryPolicy,
+    tasks,
+)
+
+from .mocktasks import increment, fail_always, fail_once
+
+
+@pytest.fixture
+def registry() -> MetricsRegistry:
+    return MetricsRegistry()
+
+
+@pytest.fixture
+def metered(engine, registry) -> AlchemicalQueues:
+    q = AlchemicalQueues(engine, metrics=registry)
+    q.create_all()
+    return q
+
+
+def test_default_metrics(queue: AlchemicalQueues):
+    assert type(queue.metrics) is Metrics
+    q = queue.get("test")
+    q.put(1)
+    assert q.get().data == 1
+
+
+def test_queue_metrics(metered: AlchemicalQueues, registry: MetricsRegistry):
+    q = metered.get("test")
+
+    q.put(1)
+    q.put_many([2, 3])
+    assert len(q.get_many(5)) == 3
+    assert q.get() is None
+    q.respond_many([(1, "a", None), (2, "b", None)])
+
+    assert registry.counter("entries_put", "test") == 3
+    assert registry.counter("entries_popped", "test") == 3
+    assert registry.counter("empty_polls", "test") == 1
+    assert registry.counter("responses", "test") == 2
+    assert registry.observations("put_seconds", "test") == 2
+    assert registry.observations("get_seconds", "test") == 2
+    assert registry.observations("respond_seconds", "test") == 1
+    assert registry.counter("retries", "test") == 0
+
+
+def test_group_metrics(metered: AlchemicalQueues, registry: MetricsRegistry):
+    a, b = metered.get("a"), metered.get("b")
+    a.put(1)
+    b.put_many([2, 3])
+
+    group = AlchemicalQueueGroup([a, b])
+    assert len(group.get_many(5)) == 3
+    assert group.get() is None
+
+    assert registry.counter("entries_popped", "a") == 1
+    assert registry.counter("entries_popped", "b") == 2
+    # A poll of the group is one of each of its queues, never of the group's joined name
+    for name in ("a", "b"):
+        assert registry.counter("empty_polls", name) == 1
+        assert registry.observations("get_seconds", name) == 2
+    assert group.name not in registry.render()
+
+
+def test_worker_metrics(metered: AlchemicalQueues, registry: MetricsRegistry):
+    q = metered.get("tasks")
+    increment(1).schedule(q)
+    fail_always(1).schedule(q)
+    fail_once(1).schedule(q, max_retries=1)
+
+    worker = tasks.Worker(q)
+    assert worker.metrics is registry
+    for _ in range(4):
+        worker.work_one(False)
+
+    assert registry.counter("tasks_completed", "tasks") == 2
+    assert registry.counter("tasks_failed", "tasks") == 1
+    assert registry.counter("tasks_retried", "tasks") == 1
+    # Failed runs are timed as well
+    assert registry.observations("task_seconds", "tasks") == 4
+
+
+def test_concurrent_worker_metrics(metered: AlchemicalQueues, registry: MetricsRegistry):
+    q = metered.get("tasks")
+    for i in range(4):
+        increment(i).schedule(q)
+
+    worker = tasks.Worker(q, timedelta(seconds=0.1), concurrency=2, max_tasks=4)
+    worker.work()
+
+    assert registry.counter("tasks_completed", "tasks") == 4
+    assert registry.observations("task_seconds", "tasks") == 4
+
+
+def test_retry_metrics(engine, registry: MetricsRegistry):
+    calls = []
+
+    def transaction() -> int:
+        calls.append(1)
+        if len(calls) < 3:
+            raise OperationalError("", {}, sqlite3.OperationalError("database is locked"))
+        return len(calls)
+
+    if engine.dialect.name != "sqlite":
+        pytest.skip("SQLite only")
+
+    policy = RetryPolicy(backoff=ExponentialBackoff(initial=0.001, maximum=0.001))
+    retried = []
+    assert policy.run(transaction, engine.dialect, lambda: retried.append(1)) == 3
+    assert len(retried) == 2
+
+
+def test_render(registry: MetricsRegistry):
+    registry.increment("entries_put", "a", 2)
+    registry.increment("entries_put", 'we"ird')
+    registry.observe("get_seconds", "a", 0.003)
+    registry.observe("get_seconds", "a", 100.0)
+
+    lines = registry.render().splitlines()
+
+    assert "# TYPE alchemical_queues_entries_put_total counter" in lines
+    assert 'alchemical_queues_entries_put_total{queue="a"} 2.0' in lines
+    assert 'alchemical_queues_entries_put_total{queue="we\\"ird"} 1.0' in lines
+    assert "# TYPE alchemical_queues_get_seconds histogram" in lines
+    assert 'alchemical_queues_get_seconds_bucket{queue="a",le="0.001"} 0' in lines
+    assert 'alchemical_queues_get_seconds_bucket{queue="a",le="0.005"} 1' in lines
+    assert 'alchemical_queues_get_seconds_bucket{queue="a",le="60.0"} 1' in lines
+    assert 'alchemical_queues_get_seconds_bucket{queue="a",le="+Inf"} 2' in lines
+    assert 'alchemical_queues_get_seconds_sum{queue="a"} 100.003' in lines
+    assert 'alchemical_queues_get_seconds_count{queue="a"} 2' in lines
+
+
+def test_serve(registry: MetricsRegistry):
+    registry.increment("entries_put", "a")
+    server = registry.serve(0)
+    try:
+        port = server.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+            assert response.headers["Content-Type"].startswith("text/plain")
+            body = response.read().decode()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert 'alchemical_queues_entries_put_total{queue="a"} 1.0' in body
@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, MetaData, Table, Text, inspect, insert
+import pickle
+from alchemical_queues import AlchemicalQueues
+
+
+def create_old_schema(engine):
+    metadata = MetaData()
+    old = Table(
+        "OldQueue",
+        metadata,
+        Column("entry_id", Integer, primary_key=True, nullable=False, autoincrement=True),
+        Column("queue_name", Text, nullable=False, index=True),
+        Column("enqueued_at", DateTime(timezone=True), nullable=False),
+        Column("schedule_at", DateTime(timezone=True), nullable=True),
+        Column("priority", Integer, nullable=False),
+        Column("data", LargeBinary),
+    )
+    metadata.create_all(engine)
+    return old
+
+
+def test_migrate(engine):
+    old = create_old_schema(engine)
+    now = datetime.now()
+
+    with engine.begin() as conn:
+        conn.execute(insert(old), [
+            {"queue_name": "test", "enqueued_at": now, "schedule_at": None, "priority": 0, "data": pickle.dumps(1)},
+            {"queue_name": "test", "enqueued_at": now, "schedule_at": now + timedelta(hours=1), "priority": 0, "data": pickle.dumps(2)},
+        ])
+
+    aq = AlchemicalQueues(engine, queue_tablename="OldQueue", response_tablename="OldResult")
+    aq.migrate()
+    aq.migrate()
+
+    inspector = inspect(engine)
+    assert "ready_at" in {c["name"] for c in inspector.get_columns("OldQueue")}
+    assert "ix_OldQueue_pop" in {i["name"] for i in inspector.get_indexes("OldQueue")}
+    assert inspector.has_table("OldResult")
+
+    q = aq.get("test")
+    entry = q.get()
+    assert entry and entry.data == 1
+    assert q.get() is None
+    assert q.qsize() == 1
+
+    aq._metadata.drop_all(engine)
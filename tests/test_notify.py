@@ -0,0 +1,114 @@
+import time
+from datetime import datetime, timedelta
+from threading import Thread
+from alchemical_queues import (
+    AlchemicalQueues,
+    FixedWait,
+    InProcessNotifier,
+    Notifier,
+    UnixSocketNotifier,
+)
+from alchemical_queues.tasks import Worker
+
+
+def test_in_process_notifier():
+    notifier = InProcessNotifier()
+
+    assert not notifier.wait(["a"], 0.01)
+    notifier.notify("b")
+    assert not notifier.wait(["a"], 0.01)
+
+    # Notifications between two waits are not lost
+    notifier.notify("a")
+    assert notifier.wait(["a", "b"], 0)
+    assert not notifier.wait(["a"], 0)
+
+    # Nor are those before the first wait of a thread
+    notifier.notify("c")
+    woken = []
+    t = Thread(target=lambda: woken.append(notifier.wait(["c"], 0)))
+    t.start()
+    t.join()
+    assert woken == [True]
+
+
+def test_unix_socket_notifier(tmpdir):
+    notifier = UnixSocketNotifier(str(tmpdir))
+
+    # Notifications before the socket of a thread is bound are missed, so its first wait wakes up
+    assert notifier.wait(["a"], 10)
+    assert not notifier.wait(["a"], 0.01)
+    notifier.notify("b")
+    assert not notifier.wait(["a"], 0.01)
+    notifier.notify("a")
+    assert notifier.wait(["a"], 0)
+
+    notifier.close()
+
+
+def notified_get(engine, notifier):
+    q = AlchemicalQueues(engine, notifier=notifier).get("test")
+
+    def put_later():
+        time.sleep(0.1)
+        q.put(1)
+
+    t = Thread(target=put_later)
+    t.start()
+    start = time.monotonic()
+    entry = q.get(block=True, timeout=10, wait=FixedWait(10))
+    t.join()
+
+    assert entry and entry.data == 1
+    assert time.monotonic() - start < 5
+
+
+def test_get_notified(engine):
+    notified_get(engine, InProcessNotifier())
+
+
+def test_get_notified_unix_socket(engine, tmpdir):
+    notifier = UnixSocketNotifier(str(tmpdir.mkdir("sockets")))
+    notified_get(engine, notifier)
+    notifier.close()
+
+
+def test_worker_notified(engine):
+    notifier = InProcessNotifier()
+    aq = AlchemicalQueues(engine, notifier=notifier)
+    q = aq.get("tasks")
+    worker = Worker(q, wait=FixedWait(10))
+
+    Thread(
+        target=lambda: (time.sleep(0.1), q.put({"function": "nothing", "retries": 0}))
+    ).start()
+
+    start = time.monotonic()
+    worker.work_one(True)
+    assert time.monotonic() - start < 5
+
+
+class TransactionalNotifier(Notifier):
+    transactional = True
+
+    def __init__(self):
+        self.signals = []
+
+    def notify(self, queue_name):
+        raise AssertionError("Transactional notifiers signal within the transaction")
+
+    def notify_in(self, conn, queue_name):
+        assert conn.in_transaction()
+        self.signals.append(queue_name)
+
+
+def test_transactional_notifier(engine):
+    notifier = TransactionalNotifier()
+    q = AlchemicalQueues(engine, notifier=notifier).get("test")
+
+    q.put(1)
+    q.put_many([2, 3])
+    q.put(4, schedule_at=datetime.now() + timedelta(hours=1))
+    q.respond_many([(1, "a", None), (2, "b", None)])
+
+    assert notifier.signals == ["test", "test", "test/responses"]
@@ -20,3 +20,108 @@ def test_respond(queue: AlchemicalQueues):
     assert response.delivered_at > job.enqueued_at
     assert response.cleanup_at is None
 
+
+
+def test_first_response(queue: AlchemicalQueues):
+    q = queue.get("test")
+    entry = q.put(1)
+
+    assert q.response(entry.entry_id) is None
+
+    q.respond(entry.entry_id, "first")
+    q.respond(entry.entry_id, "second")
+
+    assert q.response(entry.entry_id).data == "first"
+    assert [r.data for r in q.responses(entry.entry_id)] == ["first", "second"]
+
+
+def test_lazy_decoding(queue: AlchemicalQueues):
+    from alchemical_queues import PickleSerializer
+
+    class CountingSerializer(PickleSerializer):
+        loaded = 0
+
+        def loads(self, data):
+            CountingSerializer.loaded += 1
+            return super().loads(data)
+
+    q = queue.get("lazy", CountingSerializer())
+    q.put_many([1, 2])
+    entries = q.get_many(2)
+    q.respond(entries[0].entry_id, "test")
+    responses = q.responses(entries[0].entry_id)
+
+    assert [e.entry_id for e in entries] and responses[0].response_id
+    assert CountingSerializer.loaded == 0
+
+    assert entries[0].data == 1 and entries[0].data == 1
+    assert responses[0].data == "test"
+    assert CountingSerializer.loaded == 2
+
+
+def test_reap(queue: AlchemicalQueues):
+    from datetime import timedelta
+    from sqlalchemy import func, select
+
+    def stored():
+        with queue._engine.connect() as conn:
+            return conn.execute(select(func.count()).select_from(queue._rtable)).scalar_one()
+
+    q, other = queue.get("test"), queue.get("other")
+    past = datetime.now() - timedelta(minutes=1)
+    future = datetime.now() + timedelta(hours=1)
+
+    for i in range(5):
+        q.respond(i, "expired", cleanup_at=past)
+        other.respond(i, "expired", cleanup_at=past)
+    q.respond(0, "kept", cleanup_at=future)
+    q.respond(0, "forever")
+
+    # Expired responses are hidden, but only deleted by reaping
+    assert [r.data for r in q.responses(0)] == ["kept", "forever"]
+    assert q.response(1) is None
+    assert stored() == 12
+
+    assert q.reap(batch_size=2) == 5
+    assert stored() == 7
+    assert queue.reap(batch_size=2) == 5
+    assert queue.reap() == 0
+    assert stored() == 2
+
+
+def test_responses_many(queue: AlchemicalQueues, monkeypatch):
+    from alchemical_queues import main
+
+    monkeypatch.setattr(main, "_MAX_BOUND_PARAMETERS", 3)
+
+    q = queue.get("test")
+    for entry_id in range(10):
+        q.respond(entry_id, entry_id)
+    q.respond(4, "again")
+    queue.get("other").respond(5, "other")
+
+    found = q.responses_many(range(12))
+
+    assert sorted(found) == list(range(10))
+    assert [r.data for r in found[4]] == [4, "again"]
+    assert [r.data for r in found[5]] == [5]
+    assert q.responses_many([]) == {}
+
+
+def test_respond_many(queue: AlchemicalQueues):
+    from datetime import timedelta
+
+    q = queue.get("test")
+    ids = q.put_many([1, 2, 3])
+    past = datetime.now() - timedelta(minutes=1)
+
+    sent = q.respond_many([(ids[0], "a", None), (ids[1], "b", None), (ids[2], "c", past)])
+
+    assert [r.data for r in sent] == ["a", "b", "c"]
+    assert [r.entry_id for r in sent] == ids
+    assert len({r.response_id for r in sent}) == 3
+    assert {k: [r.data for r in v] for k, v in q.responses_many(ids).items()} == {
+        ids[0]: ["a"],
+        ids[1]: ["b"],
+    }
+    assert q.respond_many([]) == []
@@ -0,0 +1,73 @@
+import sqlite3
+import threading
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError, OperationalError
+from alchemical_queues import AlchemicalQueues, ExponentialBackoff, RetryPolicy
+
+
+@pytest.fixture
+def sqlite_engine(engine: Engine) -> Engine:
+    if engine.dialect.name != "sqlite":
+        pytest.skip("SQLite only")
+    # Fail on a locked database right away instead of waiting for the lock
+    return create_engine(engine.url, connect_args={"timeout": 0})
+
+
+def locked(engine: Engine, seconds: float) -> threading.Timer:
+    conn = sqlite3.connect(engine.url.database, check_same_thread=False)
+    conn.isolation_level = None
+    conn.execute("BEGIN EXCLUSIVE")
+    timer = threading.Timer(seconds, conn.close)
+    timer.start()
+    return timer
+
+
+def test_retryable(sqlite_engine: Engine) -> None:
+    policy = RetryPolicy()
+    dialect = sqlite_engine.dialect
+
+    assert policy.retryable(
+        OperationalError("", {}, sqlite3.OperationalError("database is locked")),
+        dialect,
+    )
+    assert not policy.retryable(
+        OperationalError("", {}, sqlite3.OperationalError("no such table: x")),
+        dialect,
+    )
+    assert not policy.retryable(
+        IntegrityError("", {}, sqlite3.IntegrityError("UNIQUE constraint failed")),
+        dialect,
+    )
+
+
+def test_retry_locked(sqlite_engine: Engine) -> None:
+    policy = RetryPolicy(20, ExponentialBackoff(initial=0.01, maximum=0.05))
+    queues = AlchemicalQueues(sqlite_engine, retry=policy)
+    q = queues.get("test")
+
+    timer = locked(sqlite_engine, 0.2)
+    q.put(1)
+    entry = q.get()
+    timer.join()
+
+    assert entry and entry.data == 1
+    assert policy.retries > 0
+    assert policy.failures == 0
+
+
+def test_retry_exhausted(sqlite_engine: Engine) -> None:
+    policy = RetryPolicy(attempts=2, backoff=ExponentialBackoff(initial=0.01))
+    queues = AlchemicalQueues(sqlite_engine, retry=policy)
+    q = queues.get("test")
+
+    timer = locked(sqlite_engine, 1.0)
+    with pytest.raises(OperationalError):
+        q.put(1)
+    timer.cancel()
+    timer.function()
+
+    assert policy.retries == 1
+    assert policy.failures == 1
@@ -0,0 +1,118 @@
+import pickle
+
+import pytest
+from alchemical_queues import (
+    AlchemicalQueues,
+    PickleSerializer,
+    PickleBufferSerializer,
+    JSONSerializer,
+    MsgpackSerializer,
+    CompressedSerializer,
+)
+
+
+payload = {"name": "test", "values": list(range(500)), "nested": {"a": [1.5, None]}}
+
+
+def msgpack():
+    pytest.importorskip("msgpack")
+    return MsgpackSerializer()
+
+
+def compressed(codec):
+    def factory():
+        pytest.importorskip({"zlib": "zlib", "lz4": "lz4", "zstd": "zstandard"}[codec])
+        return CompressedSerializer(JSONSerializer(), codec=codec, threshold=100)
+
+    return factory
+
+
+@pytest.mark.parametrize(
+    "factory",
+    [
+        PickleSerializer,
+        PickleBufferSerializer,
+        JSONSerializer,
+        msgpack,
+        compressed("zlib"),
+        compressed("lz4"),
+        compressed("zstd"),
+    ],
+)
+def test_serializer_roundtrip(queue: AlchemicalQueues, factory):
+    serializer = factory()
+    assert serializer.loads(serializer.dumps(payload)) == payload
+
+    q = queue.get("serialized", serializer)
+    entry = q.put(payload)
+    assert q.get().data == payload
+
+    q.respond(entry.entry_id, "small")
+    assert [r.data for r in q.responses(entry.entry_id)] == ["small"]
+
+
+def test_compressed_threshold():
+    serializer = CompressedSerializer(PickleSerializer(), threshold=100)
+
+    small = serializer.dumps("small")
+    assert small[0] == 0
+    assert serializer.loads(small) == "small"
+
+    large = serializer.dumps(payload)
+    assert large[0] != 0
+    assert len(large) < len(pickle.dumps(payload))
+
+
+def test_compressed_mixed_codecs():
+    pytest.importorskip("lz4")
+    written = CompressedSerializer(PickleSerializer(), codec="lz4", threshold=0)
+    reader = CompressedSerializer(PickleSerializer(), codec="zlib")
+
+    assert reader.loads(written.dumps(payload)) == payload
+
+    with pytest.raises(ValueError):
+        reader.loads(b"\xff")
+
+
+def test_serializer_default(engine):
+    queues = AlchemicalQueues(engine, serializer=JSONSerializer())
+    queues.create_all()
+
+    q = queues.get("default")
+    assert isinstance(q.serializer, JSONSerializer)
+    assert isinstance(queues.get("default", PickleSerializer()).serializer, PickleSerializer)
+
+    with pytest.raises(ValueError):
+        CompressedSerializer(PickleSerializer(), codec="brotli")
+
+
+def test_pickle_buffer_arrays(queue: AlchemicalQueues):
+    np = pytest.importorskip("numpy")
+    array = np.arange(100_000, dtype=np.float64)
+
+    q = queue.get("arrays", PickleBufferSerializer())
+    q.put({"array": array, "view": pickle.PickleBuffer(b"raw bytes")})
+    data = q.get().data
+
+    assert np.array_equal(data["array"], array)
+    assert not data["array"].flags.writeable
+    assert data["array"].flags.aligned
+    assert bytes(data["view"]) == b"raw bytes"
+
+
+def test_pickle_buffer_alignment():
+    np = pytest.importorskip("numpy")
+    serializer = PickleBufferSerializer()
+    # An odd sized buffer first, so the array would start unaligned if packed back to back
+    obj = {
+        "odd": pickle.PickleBuffer(b"x" * 13),
+        "array": np.arange(10, dtype=np.complex128),
+    }
+
+    payload = serializer.dumps(obj)
+    data = serializer.loads(payload)
+    start = np.frombuffer(payload, dtype=np.uint8).ctypes.data
+
+    assert np.array_equal(data["array"], obj["array"])
+    assert data["array"].flags.aligned
+    assert (data["array"].ctypes.data - start) % PickleBufferSerializer._ALIGNMENT == 0
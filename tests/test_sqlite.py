@@ -0,0 +1,65 @@
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from alchemical_queues import AlchemicalQueues, configure_sqlite
+
+
+@pytest.fixture
+def sqlite_engine(engine_factory) -> Engine:
+    engine = engine_factory()
+    if engine.dialect.name != "sqlite":
+        pytest.skip("SQLite only")
+    return engine
+
+
+def test_configure_sqlite(sqlite_engine: Engine) -> None:
+    configure_sqlite(sqlite_engine, busy_timeout=2.5)
+
+    with sqlite_engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 2500
+
+
+def test_configure_sqlite_journal_mode(sqlite_engine: Engine) -> None:
+    with pytest.raises(ValueError):
+        configure_sqlite(sqlite_engine, journal_mode="fast")
+
+
+def test_read_does_not_block_pop(sqlite_engine: Engine) -> None:
+    configure_sqlite(sqlite_engine, busy_timeout=0.1)
+    queues = AlchemicalQueues(sqlite_engine)
+    queues.create_all()
+    q = queues.get("test")
+    q.put(1)
+    q.put(2)
+
+    # A lookup in an open transaction holds no write lock
+    with sqlite_engine.connect() as conn, conn.begin():
+        conn.execute(q._stmts.count)
+
+        entry = q.get()
+        assert entry and entry.data == 1
+
+    assert q.qsize() == 1
+
+
+def test_begin_only_own_transactions(sqlite_engine: Engine) -> None:
+    queues = AlchemicalQueues(sqlite_engine)
+    queues.create_all()
+    q = queues.get("test")
+    statements = []
+
+    @event.listens_for(sqlite_engine, "before_cursor_execute")
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    q.put(1)
+    assert q.get().data == 1
+    assert "BEGIN DEFERRED" in statements
+    assert "BEGIN IMMEDIATE" in statements
+
+    # Transactions on the engine outside of the queues are left to the driver
+    statements.clear()
+    with sqlite_engine.begin() as conn:
+        conn.execute(text("SELECT 1"))
+    assert not [statement for statement in statements if "BEGIN" in statement]
@@ -0,0 +1,82 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+from alchemical_queues import AlchemicalQueues, TimingWheel
+from alchemical_queues.stats import _plan_rows
+
+
+def test_stats(queue: AlchemicalQueues):
+    a, b = queue.get("a"), queue.get("b")
+    a.put_many([1, 2, 3], priority=[0, 5, 2])
+    a.put(4, schedule_at=datetime.now() + timedelta(hours=1), priority=9)
+    b.put(5, schedule_at=datetime.now(timezone.utc) + timedelta(hours=1))
+
+    stats = queue.stats()
+
+    assert set(stats) == {"a", "b"}
+    assert stats["a"].ready == 3
+    assert stats["a"].scheduled == 1
+    assert stats["a"].size == a.qsize() == 4
+    assert stats["a"].max_priority == 5
+    assert stats["a"].oldest_ready_age is not None
+    assert timedelta(0) <= stats["a"].oldest_ready_age < timedelta(minutes=1)
+
+    assert stats["b"].ready == 0
+    assert stats["b"].scheduled == 1
+    assert stats["b"].max_priority is None
+    assert stats["b"].oldest_ready_age is None
+
+
+def test_stats_names(queue: AlchemicalQueues):
+    queue.get("a").put(1)
+    queue.get("b").put(2)
+
+    stats = queue.stats(name for name in ["a", "empty"])
+
+    assert set(stats) == {"a", "empty"}
+    assert stats["a"].ready == 1
+    assert stats["empty"].size == 0
+    assert stats["empty"].max_priority is None
+
+
+def test_stats_timing_wheel(engine):
+    queues = AlchemicalQueues(engine, timing_wheel=TimingWheel())
+    q = queues.get("wheel")
+    q.put(1)
+    q.put(2, schedule_at=datetime.now() + timedelta(days=1))
+    assert q.get().data == 1
+
+    stats = queues.stats()
+
+    assert stats["wheel"].ready == 0
+    assert stats["wheel"].scheduled == 1
+    assert not q.empty()
+
+    queues.clear()
+    assert q.empty()
+
+
+def test_empty(queue: AlchemicalQueues):
+    q = queue.get("empty")
+    assert q.empty()
+    q.put(1)
+    assert not q.empty()
+    assert queue.get("other").empty()
+
+
+def test_approximate_qsize(queue: AlchemicalQueues):
+    q = queue.get("approximate")
+    q.put_many(range(10))
+
+    # Only PostgreSQL has planner statistics, elsewhere the entries are counted
+    if queue._engine.dialect.name != "postgresql":
+        assert q.qsize(approximate=True) == 10
+    else:
+        assert q.qsize(approximate=True) >= 0
+
+
+def test_plan_rows():
+    plan = [{"Plan": {"Node Type": "Seq Scan", "Plan Rows": 42}}]
+
+    assert _plan_rows(plan) == 42
+    assert _plan_rows(json.dumps(plan)) == 42
@@ -30,6 +30,20 @@ def consumer(queue: Queue, queue_factory: Callable[[], AlchemicalQueues]):
     queue.put(set(out))
 
 
+def batch_consumer(queue: Queue, queue_factory: Callable[[], AlchemicalQueues]):
+    aq: AlchemicalQueues = queue_factory()
+    q = aq.get("test")
+    t = datetime.now() + timedelta(seconds=2)
+    out = []
+    while datetime.now() < t:
+        v = q.get_many(7)
+        if v:
+            out.extend(v)
+            t = datetime.now() + timedelta(seconds=2)
+
+    queue.put(set(out))
+
+
 numbers = [
     (1, 1, 1000),
     (2, 2, 100),
@@ -38,8 +52,9 @@ numbers = [
 ]
 
 
+@pytest.mark.parametrize("consumer", [consumer, batch_consumer])
 @pytest.mark.parametrize("num_producers,num_consumers,num_samples", numbers)
-def test_stress(queue_factory: Callable[[], AlchemicalQueues], num_producers: int, num_consumers: int, num_samples: int):
+def test_stress(queue_factory: Callable[[], AlchemicalQueues], num_producers: int, num_consumers: int, num_samples: int, consumer: Callable):
     # Prime the queue
     queue: AlchemicalQueues = queue_factory()
     q = queue.get("test")
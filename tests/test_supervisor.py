@@ -0,0 +1,43 @@
+import os
+import signal
+
+import pytest
+from alchemical_queues import AlchemicalQueues, tasks
+
+from .mocktasks import increment
+
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+
+
+def terminate(signum, stack):
+    os.kill(os.getpid(), signal.SIGTERM)
+
+
+def test_supervisor_recycles(queue: AlchemicalQueues, engine_factory):
+    q = queue.get("tasks")
+    todo = [increment(i).schedule(q) for i in range(20)]
+
+    def make_worker():
+        return tasks.Worker(
+            AlchemicalQueues(engine_factory()).get("tasks"), max_tasks=3
+        )
+
+    supervisor = tasks.Supervisor(make_worker, 2, preload=["json"])
+
+    h = signal.getsignal(signal.SIGALRM)
+    signal.signal(signal.SIGALRM, terminate)
+    signal.alarm(5)
+
+    try:
+        supervisor.run()
+    finally:
+        signal.signal(signal.SIGALRM, h)
+
+    assert [v.result for v in todo] == list(range(1, 21))
+    assert signal.getsignal(signal.SIGTERM) == signal.SIG_DFL
+
+
+def test_supervisor_invalid():
+    with pytest.raises(ValueError):
+        tasks.Supervisor(lambda: None, 0)
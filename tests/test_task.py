@@ -1,11 +1,12 @@
 from datetime import datetime, timedelta
+import pytest
 import time
 import signal
 import time
 from threading import Thread
 from alchemical_queues import AlchemicalQueues, AlchemicalQueue, tasks
 
-from .mocktasks import increment, fail_once, fail_always
+from .mocktasks import increment, fail_once, fail_always, exit_process
 
 
 def handler(signum, stack):
@@ -96,3 +97,160 @@ def test_task_work_delayed(queue: AlchemicalQueues):
         assert r['v'].result == 13
     finally:
         signal.signal(signal.SIGALRM, h)
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_task_work_concurrent(queue: AlchemicalQueues, executor: str):
+    q = queue.get("tasks")
+    todo = [increment(i).schedule(q) for i in range(20)]
+    failing = fail_always(1).schedule(q, max_retries=1)
+
+    h = signal.getsignal(signal.SIGALRM)
+    signal.signal(signal.SIGALRM, handler)
+    signal.alarm(3)
+
+    try:
+        tasks.Worker(q, concurrency=4, executor=executor).work()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        signal.signal(signal.SIGALRM, h)
+
+    assert [v.result for v in todo] == list(range(1, 21))
+    assert isinstance(failing.result, tasks.TaskException)
+
+
+def test_task_work_broken_pool(queue: AlchemicalQueues):
+    q = queue.get("tasks")
+    crashing = exit_process(1).schedule(q)
+    todo = [increment(i).schedule(q, max_retries=3) for i in range(7)]
+
+    h = signal.getsignal(signal.SIGALRM)
+    signal.signal(signal.SIGALRM, handler)
+    signal.alarm(5)
+
+    try:
+        tasks.Worker(
+            q, timedelta(seconds=0.1), concurrency=4, executor="process"
+        ).work()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        signal.signal(signal.SIGALRM, h)
+
+    # The tasks in flight with the crashing one fail and are retried on a new pool
+    assert isinstance(crashing.result, tasks.TaskException)
+    assert [v.result for v in todo] == list(range(1, 8))
+    assert q.empty()
+
+
+def test_task_work_concurrently_missing_handler(queue: AlchemicalQueues):
+    q = queue.get("tasks")
+    missing = {"function": "tests.mocktasks.missing", "args": (), "kwargs": {}}
+    q.put_many([dict(missing, retries=0, max_retries=0) for _ in range(3)])
+
+    h = signal.getsignal(signal.SIGALRM)
+    signal.signal(signal.SIGALRM, handler)
+    signal.alarm(5)
+
+    worker = tasks.Worker(q, timedelta(seconds=0.1), concurrency=4, max_tasks=3)
+    try:
+        worker.work()
+    finally:
+        signal.alarm(0)
+        signal.signal(signal.SIGALRM, h)
+
+    # Tasks that fail before running count towards max_tasks, as they do without concurrency
+    assert worker.completed == 3
+    assert q.empty()
+
+
+def test_worker_invalid():
+    with pytest.raises(ValueError):
+        tasks.Worker(None, concurrency=0)
+
+    with pytest.raises(ValueError):
+        tasks.Worker(None, executor="fiber")
+
+
+@pytest.mark.parametrize("concurrency", [1, 4])
+def test_worker_max_tasks(queue: AlchemicalQueues, concurrency: int):
+    q = queue.get("tasks")
+    todo = [increment(i).schedule(q) for i in range(10)]
+
+    worker = tasks.Worker(q, concurrency=concurrency, max_tasks=5)
+    worker.work()
+
+    assert 5 <= worker.completed < 10
+    assert q.qsize() == 10 - worker.completed
+
+
+def test_worker_stop(queue: AlchemicalQueues):
+    q = queue.get("tasks")
+    worker = tasks.Worker(q, poll_every=timedelta(seconds=0.1))
+
+    thread = Thread(target=worker.work)
+    thread.start()
+    increment(1).schedule(q)
+    time.sleep(0.5)
+    worker.stop()
+    thread.join(timeout=2)
+
+    assert not thread.is_alive()
+    assert worker.completed == 1
+
+
+def test_worker_reap(queue: AlchemicalQueues):
+    q = queue.get("tasks")
+    q.respond(1, "expired", cleanup_at=datetime.now() - timedelta(minutes=1))
+    worker = tasks.Worker(q, poll_every=timedelta(seconds=0.1), reap_every=timedelta(seconds=0.1))
+
+    thread = Thread(target=worker.work)
+    thread.start()
+    time.sleep(0.5)
+    worker.stop()
+    thread.join(timeout=2)
+
+    assert q.reap() == 0
+
+
+def test_gather(queue: AlchemicalQueues):
+    q, other = queue.get("tasks"), queue.get("other")
+    todo = [increment(i).schedule(q) for i in range(3)] + [increment(10).schedule(other)]
+
+    with pytest.raises(TimeoutError):
+        tasks.gather(todo, timeout=0.1)
+
+    for _ in range(3):
+        tasks.Worker(q).work_one(False)
+    tasks.Worker(other).work_one(False)
+
+    assert tasks.gather(todo, timeout=1) == [1, 2, 3, 11]
+    assert tasks.gather([]) == []
+
+
+def test_queued_task_wait(queue: AlchemicalQueues):
+    q = queue.get("tasks")
+    todo = increment(1).schedule(q)
+
+    with pytest.raises(TimeoutError):
+        todo.wait(timeout=0.1)
+
+    tasks.Worker(q).work_one(False)
+    assert todo.wait(timeout=1) == 2
+
+
+def test_queued_task_wait_notified(engine):
+    from alchemical_queues import InProcessNotifier, FixedWait
+
+    queues = AlchemicalQueues(engine, notifier=InProcessNotifier())
+    q = queues.get("tasks")
+    todo = increment(1).schedule(q)
+
+    thread = Thread(target=lambda: (time.sleep(0.2), tasks.Worker(q).work_one(False)))
+    thread.start()
+    start = time.monotonic()
+    # Without the notification this would only check again after 10 seconds
+    assert todo.wait(timeout=5, poll=FixedWait(10)) == 2
+    assert time.monotonic() - start < 2
+    thread.join()
@@ -0,0 +1,144 @@
+import time
+from datetime import datetime, timedelta
+from threading import Thread
+import pytest
+from alchemical_queues import (
+    AlchemicalQueueGroup,
+    AlchemicalQueues,
+    ExponentialBackoff,
+    FixedWait,
+    tasks,
+)
+
+from .mocktasks import increment
+
+
+def test_fixed_wait():
+    wait = FixedWait(0.5)
+    assert wait.next_delay() == 0.5
+    assert wait.next_delay() == 0.5
+
+
+def test_exponential_backoff():
+    wait = ExponentialBackoff(initial=0.1, maximum=0.5, multiplier=2.0, jitter=0.0)
+
+    assert [wait.next_delay() for _ in range(5)] == [0.1, 0.2, 0.4, 0.5, 0.5]
+    wait.reset()
+    assert wait.next_delay() == 0.1
+
+
+def test_exponential_backoff_jitter():
+    wait = ExponentialBackoff(initial=1.0, maximum=1.0, jitter=0.5)
+
+    for _ in range(100):
+        assert 0.5 <= wait.next_delay() <= 1.0
+
+    with pytest.raises(ValueError):
+        ExponentialBackoff(jitter=2)
+
+
+def test_get_block(queue: AlchemicalQueues):
+    q = queue.get("test")
+
+    def put_later():
+        time.sleep(0.3)
+        q.put(1)
+
+    t = Thread(target=put_later)
+    t.start()
+    entry = q.get(block=True, timeout=5)
+    t.join()
+
+    assert entry and entry.data == 1
+
+
+def test_get_block_timeout(queue: AlchemicalQueues):
+    q = queue.get("test")
+
+    start = time.monotonic()
+    assert q.get(block=True, timeout=0.3, wait=FixedWait(0.05)) is None
+    assert 0.3 <= time.monotonic() - start < 1.0
+
+
+def test_get_resets_wait(queue: AlchemicalQueues):
+    q = queue.get("test")
+    wait = ExponentialBackoff(initial=0.1, maximum=1.0, jitter=0.0)
+    wait.next_delay()
+    wait.next_delay()
+
+    q.put(1)
+    entry = q.get(block=True, timeout=5, wait=wait)
+
+    assert entry and entry.data == 1
+    assert wait.next_delay() == 0.1
+
+
+def test_next_ready_at(queue: AlchemicalQueues):
+    q = queue.get("test")
+    assert q.next_ready_at() is None
+
+    soon = datetime.now() + timedelta(seconds=30)
+    q.put(1, schedule_at=soon + timedelta(seconds=30))
+    q.put(2, schedule_at=soon)
+    assert q.next_ready_at() == soon
+
+    q.put(3)
+    assert q.next_ready_at() < soon
+
+
+def test_get_block_scheduled(queue: AlchemicalQueues):
+    q = queue.get("test")
+    due = datetime.now() + timedelta(seconds=0.3)
+    q.put(1, schedule_at=due)
+
+    def separate_query():
+        raise AssertionError("an empty poll returns when the next entry is ready")
+
+    # A fixed wait of a second would poll too late, the entry is due before that
+    q.next_ready_at = separate_query
+    entry = q.get(block=True, timeout=5, wait=FixedWait(1.0))
+
+    assert entry and entry.data == 1
+    assert datetime.now() - due < timedelta(seconds=0.2)
+
+
+def test_worker_sleeps_until_scheduled(queue: AlchemicalQueues):
+    q = queue.get("tasks")
+    due = datetime.now() + timedelta(seconds=0.5)
+    v = increment(1).schedule(q, schedule_at=due)
+
+    worker = tasks.Worker(q, poll_every=timedelta(seconds=5), max_tasks=1)
+    polls = []
+    poll = q._poll
+
+    def counting_poll(*args, **kwargs):
+        polls.append(datetime.now())
+        return poll(*args, **kwargs)
+
+    def separate_query():
+        raise AssertionError("an empty poll returns when the next task is due")
+
+    q._poll = counting_poll
+    q.next_ready_at = separate_query
+    try:
+        worker.work()
+    finally:
+        del q._poll
+        del q.next_ready_at
+
+    assert v.result == 2
+    # One empty poll, a single sleep until the task is due, and the poll that finds it
+    assert len(polls) == 2
+    assert polls[-1] - due < timedelta(seconds=0.2)
+
+
+def test_group_get_block_scheduled(queue: AlchemicalQueues):
+    second = queue.get("second")
+    group = AlchemicalQueueGroup([queue.get("first"), second])
+    due = datetime.now() + timedelta(seconds=0.3)
+    second.put(1, schedule_at=due)
+
+    entry = group.get(block=True, timeout=5, wait=FixedWait(1.0))
+
+    assert entry and entry.data == 1
+    assert datetime.now() - due < timedelta(seconds=0.2)
@@ -0,0 +1,153 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from alchemical_queues import AlchemicalQueues, AlchemicalQueueGroup, TimingWheel
+
+
+@pytest.fixture
+def wheel_queues(engine):
+    q = AlchemicalQueues(
+        engine=engine,
+        timing_wheel=TimingWheel(
+            horizon=timedelta(seconds=2), slot=timedelta(seconds=1)
+        ),
+    )
+    q.create_all()
+    yield q
+    q.clear()
+
+
+def test_wheel_validation():
+    with pytest.raises(ValueError):
+        TimingWheel(horizon=timedelta(minutes=1), slot=timedelta(minutes=1))
+    with pytest.raises(ValueError):
+        TimingWheel(slot=timedelta(0))
+
+
+def test_far_future_goes_to_wheel(wheel_queues: AlchemicalQueues):
+    q = wheel_queues.get("wheel")
+    now = datetime.now()
+
+    near = q.put(1, schedule_at=now + timedelta(seconds=1))
+    far = q.put(2, schedule_at=now + timedelta(hours=1))
+    ids = q.put_many(
+        [3, 4, 5],
+        schedule_at=[None, now + timedelta(days=1), now + timedelta(hours=2)],
+    )
+
+    assert near.entry_id > 0
+    assert far.entry_id < 0
+    assert ids[0] > 0 and ids[1] < 0 and ids[2] < 0
+    assert len(set(ids)) == 3
+    assert q.qsize() == 5
+    assert not q.empty()
+
+    assert q.get().data == 3
+    assert q.get() is None
+
+    q.clear()
+    assert q.qsize() == 0
+    assert q.empty()
+
+
+def test_promote_when_due(wheel_queues: AlchemicalQueues):
+    q = wheel_queues.get("wheel")
+    far = q.put(42, schedule_at=datetime.now() + timedelta(seconds=3.5))
+    assert far.entry_id < 0
+    assert q.promote() == 0
+
+    entry = q.get(block=True, timeout=6)
+
+    assert entry is not None
+    assert entry.data == 42
+    assert entry.entry_id == far.entry_id
+    assert datetime.now() >= far.schedule_at
+    assert q.empty()
+
+
+def test_promote_tz_aware(wheel_queues: AlchemicalQueues):
+    q = wheel_queues.get("wheel")
+    far = q.put(42, schedule_at=datetime.now(timezone.utc) + timedelta(seconds=2.5))
+    assert far.entry_id < 0
+
+    time.sleep(1.5)
+    assert q.promote() == 1
+    assert q.get() is None
+    assert q.next_ready_at() is not None
+
+    entry = q.get(block=True, timeout=3)
+    assert entry is not None and entry.data == 42
+
+
+def test_promote_only_own_queue(wheel_queues: AlchemicalQueues):
+    a, b = wheel_queues.get("a"), wheel_queues.get("b")
+    a.put(1, schedule_at=datetime.now() + timedelta(seconds=2.5))
+    b.put(2, schedule_at=datetime.now() + timedelta(seconds=2.5))
+
+    time.sleep(1.5)
+    assert a.promote() == 1
+    assert a.promote() == 0
+    assert b.promote() == 1
+
+
+def test_group_promotes(wheel_queues: AlchemicalQueues):
+    a, b = wheel_queues.get("a"), wheel_queues.get("b")
+    a.put(1, schedule_at=datetime.now() + timedelta(seconds=3))
+    b.put(2, schedule_at=datetime.now() + timedelta(seconds=3))
+
+    group = AlchemicalQueueGroup([a, b])
+    entries = []
+    while len(entries) < 2:
+        entry = group.get(block=True, timeout=6)
+        assert entry is not None
+        entries.append(entry.data)
+
+    assert sorted(entries) == [1, 2]
+
+
+def test_respond_to_delayed(wheel_queues: AlchemicalQueues):
+    q = wheel_queues.get("wheel")
+    far = q.put(42, schedule_at=datetime.now() + timedelta(hours=1))
+
+    q.respond(far.entry_id, "done")
+
+    response = q.response(far.entry_id)
+    assert response is not None and response.data == "done"
+
+
+def test_ids_not_reused(wheel_queues: AlchemicalQueues):
+    q = wheel_queues.get("wheel")
+    first = q.put(1, schedule_at=datetime.now() + timedelta(seconds=2.5))
+    time.sleep(1.5)
+    assert q.promote() == 1
+
+    second = q.put(2, schedule_at=datetime.now() + timedelta(seconds=2.5))
+    assert second.entry_id < 0
+    assert second.entry_id != first.entry_id
+    q.respond(first.entry_id, "first")
+    assert q.response(second.entry_id) is None
+
+    time.sleep(1.5)
+    assert q.promote() == 1
+
+    entries = []
+    while len(entries) < 2:
+        entry = q.get(block=True, timeout=3)
+        assert entry is not None
+        entries.append(entry.entry_id)
+    assert sorted(entries) == sorted([first.entry_id, second.entry_id])
+
+
+def test_wheel_removed(wheel_queues: AlchemicalQueues, engine):
+    wheel_queues.get("wheel").put(1, schedule_at=datetime.now() + timedelta(hours=1))
+
+    queues = AlchemicalQueues(engine)
+    assert queues.stats()["wheel"].scheduled == 1
+
+    queues.get("wheel").clear()
+    assert "wheel" not in queues.stats()
+
+    wheel_queues.get("wheel").put(2, schedule_at=datetime.now() + timedelta(hours=1))
+    queues.clear()
+    assert queues.stats() == {}